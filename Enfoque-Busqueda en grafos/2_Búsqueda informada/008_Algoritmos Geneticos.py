@@ -1,167 +1,661 @@
+import itertools  # Para generar la rejilla de configuraciones del barrido
+import os  # Para conocer el número de núcleos disponibles
 import random  # Importamos el módulo random para operaciones aleatorias
+from concurrent.futures import ProcessPoolExecutor  # Pool de procesos para evaluar en paralelo
+from dataclasses import dataclass, field, replace  # Configuración inmutable del algoritmo
+from typing import Callable, Optional  # Anotaciones de los parámetros
 
 
 #############################
 # CONFIGURACIÓN INICIAL
 #############################
+# Valores por defecto; cada ejecución lee sus parámetros de un GAConfig
 POBLACION_SIZE = 300  # Número de individuos en la población
 GENES = "01"  # Genes disponibles (para codificación binaria)
 TARGET = "1011011011010"  # Solución objetivo que se desea alcanzar
 MUTATION_RATE = 0.0000000001  # Probabilidad de mutación por gen
 CROSSOVER_RATE = 0.03  # Probabilidad de realizar cruce
 GENERATIONS = 1000  # Número máximo de generaciones
+TAM_LOTE = 64  # Individuos por lote enviado a cada proceso
+NUM_ISLAS = os.cpu_count() or 1  # Una isla por núcleo disponible
+INTERVALO_MIGRACION = 20  # Generaciones entre migraciones
+NUM_MIGRANTES = 5  # Individuos que emigran de cada isla
+
+
+@dataclass(frozen=True)
+class GAConfig:
+    """
+    Parámetros de una ejecución del algoritmo genético.
+
+    Atributos:
+        poblacion_size: Número de individuos en la población.
+        genes: Genes disponibles.
+        target: Solución objetivo.
+        mutation_rate: Probabilidad de mutación por gen.
+        crossover_rate: Probabilidad de realizar cruce.
+        generations: Número máximo de generaciones.
+        seleccion: Operador de selección ('ruleta', 'torneo', 'rango' o 'sus').
+        cruce: Operador de cruce ('un_punto', 'k_puntos' o 'uniforme').
+        tam_torneo: Participantes por torneo (selección 'torneo').
+        k_puntos: Puntos de corte (cruce 'k_puntos').
+        elitismo: Mejores individuos copiados sin cambios a la siguiente generación.
+        paciencia: Generaciones sin mejora antes de parar (None = sin parada temprana).
+        semilla: Semilla del generador aleatorio propio de la ejecución.
+        funcion_aptitud: Función f(individuo, target) -> aptitud a maximizar
+            (por defecto, fitness). Debe estar definida a nivel de módulo para
+            poder enviarse a los procesos trabajadores, y no ser negativa si
+            se usa la selección por ruleta o SUS.
+        aptitud_maxima: Aptitud con la que se considera resuelto el problema
+            (None = la del propio target, funcion_aptitud(target, target)).
+            Con un objetivo cuyo máximo no es el target hay que indicarla
+            (float('inf') para agotar siempre las generaciones).
+    """
+    poblacion_size: int = POBLACION_SIZE
+    genes: str = GENES
+    target: str = TARGET
+    mutation_rate: float = MUTATION_RATE
+    crossover_rate: float = CROSSOVER_RATE
+    generations: int = GENERATIONS
+    seleccion: str = 'ruleta'
+    cruce: str = 'un_punto'
+    tam_torneo: int = 3
+    k_puntos: int = 2
+    elitismo: int = 0
+    paciencia: Optional[int] = None
+    semilla: Optional[int] = None
+    funcion_aptitud: Callable[[str, str], float] = field(default_factory=lambda: fitness)
+    aptitud_maxima: Optional[float] = None
+
+    def optimo(self):
+        """Aptitud a partir de la cual la ejecución se detiene por haber resuelto el problema."""
+        if self.aptitud_maxima is not None:
+            return self.aptitud_maxima
+        return self.funcion_aptitud(self.target, self.target)
 
 
 #############################
 # FUNCIONES BASE
 #############################
-def crear_individuo(length):
+def crear_individuo(length, genes=GENES, rng=random):
     """
-    Crea un individuo aleatorio con una secuencia binaria de longitud 'length'.
+    Crea un individuo aleatorio con una secuencia de genes de longitud 'length'.
     """
-    return ''.join(random.choice(GENES) for _ in range(length))
+    return ''.join(rng.choice(genes) for _ in range(length))
 
 
-def crear_poblacion(size, length):
+def crear_poblacion(size, length, genes=GENES, rng=random):
     """
     Inicializa una población con individuos aleatorios.
 
     Args:
         size: Número de individuos.
         length: Longitud de cada individuo (basada en el TARGET).
+        genes: Genes disponibles.
+        rng: Generador aleatorio a utilizar.
     """
-    return [crear_individuo(length) for _ in range(size)]
+    return [crear_individuo(length, genes, rng) for _ in range(size)]
 
 
 #############################
 # FUNCIONES DE EVALUACIÓN
 #############################
-def fitness(individuo):
+def fitness(individuo, target=TARGET):
     """
     Calcula la aptitud de un individuo comparándolo con el objetivo.
     Retorna el número de bits correctos.
 
     Args:
         individuo: Cadena binaria.
+        target: Solución objetivo.
 
     Returns:
-        Número de coincidencias con TARGET.
+        Número de coincidencias con el objetivo.
     """
-    return sum(1 for i, j in zip(individuo, TARGET) if i == j)
+    return sum(1 for i, j in zip(individuo, target) if i == j)
 
 
-def evaluar_poblacion(poblacion):
+# Ejemplo de objetivo real: mochila 0/1 (un gen por objeto)
+MOCHILA_PESOS = (12, 7, 11, 8, 9, 6, 14, 5, 10, 13, 4, 9, 7, 8, 12, 6)
+MOCHILA_VALORES = (24, 13, 23, 15, 16, 11, 28, 8, 19, 26, 6, 17, 12, 15, 22, 10)
+MOCHILA_CAPACIDAD = 70
+
+
+def aptitud_mochila(individuo, target=None):
+    """
+    Valor total de los objetos elegidos (gen '1') o 0 si su peso supera
+    la capacidad. No depende del target: solo se usa su longitud.
+    """
+    peso = valor = 0
+    for gen, p, v in zip(individuo, MOCHILA_PESOS, MOCHILA_VALORES):
+        if gen == '1':
+            peso += p
+            valor += v
+    return valor if peso <= MOCHILA_CAPACIDAD else 0
+
+
+def evaluar_poblacion(poblacion, target=TARGET, funcion_aptitud=fitness):
     """
     Evalúa la aptitud de todos los individuos en la población.
 
     Args:
         poblacion: Lista de individuos.
+        target: Solución objetivo.
+        funcion_aptitud: Función f(individuo, target) a aplicar.
 
     Returns:
         Lista de valores de aptitud correspondientes.
     """
-    return [fitness(ind) for ind in poblacion]
+    return [funcion_aptitud(ind, target) for ind in poblacion]
+
+
+def evaluar_lote(lote, target=TARGET, funcion_aptitud=fitness):
+    """
+    Evalúa un lote de individuos dentro de un proceso trabajador.
+    Enviar lotes en lugar de individuos sueltos amortiza el coste de
+    comunicación entre procesos.
+
+    Args:
+        lote: Lista de individuos.
+        target: Solución objetivo.
+        funcion_aptitud: Función f(individuo, target) a aplicar.
+
+    Returns:
+        Lista de valores de aptitud del lote.
+    """
+    return [funcion_aptitud(ind, target) for ind in lote]
+
+
+def evaluar_poblacion_paralela(poblacion, executor, cache, tam_lote=TAM_LOTE, target=TARGET,
+                               funcion_aptitud=fitness):
+    """
+    Evalúa la población repartiendo lotes entre los procesos del pool.
+    Solo se evalúan los genomas que no están en la caché, y cada genoma
+    repetido se evalúa una sola vez.
+
+    Args:
+        poblacion: Lista de individuos.
+        executor: ProcessPoolExecutor ya creado.
+        cache: Diccionario {genoma: aptitud} compartido entre generaciones.
+        tam_lote: Número de individuos por lote.
+        target: Solución objetivo.
+        funcion_aptitud: Función f(individuo, target), que se envía a los
+            procesos junto con cada lote.
+
+    Returns:
+        Lista de valores de aptitud correspondientes.
+    """
+    # Genomas únicos aún no evaluados (el diccionario usa el hash del genoma)
+    pendientes = list(dict.fromkeys(ind for ind in poblacion if ind not in cache))
+    if pendientes:
+        lotes = [pendientes[i:i + tam_lote] for i in range(0, len(pendientes), tam_lote)]
+        resultados = executor.map(evaluar_lote, lotes, itertools.repeat(target), itertools.repeat(funcion_aptitud))
+        for lote, aptitudes in zip(lotes, resultados):
+            cache.update(zip(lote, aptitudes))
+    return [cache[ind] for ind in poblacion]
 
 
 #############################
-# OPERADORES GENÉTICOS
+# OPERADORES DE SELECCIÓN
 #############################
-def seleccion(poblacion, fitnesses):
+def seleccion(poblacion, fitnesses, k=2, rng=random):
     """
-    Selección por ruleta: selecciona dos individuos proporcionalmente a su aptitud.
+    Selección por ruleta: selecciona individuos proporcionalmente a su aptitud.
 
     Args:
         poblacion: Lista de individuos.
         fitnesses: Lista de valores de aptitud.
+        k: Número de individuos a seleccionar.
+        rng: Generador aleatorio a utilizar.
 
     Returns:
-        Dos individuos seleccionados como padres.
+        Lista con los k individuos seleccionados como padres.
     """
     total = sum(fitnesses)
     if total == 0:
         # En caso de que todos tengan aptitud cero, se selecciona aleatoriamente
-        return random.sample(poblacion, 2)
+        return rng.choices(poblacion, k=k)
     probs = [f / total for f in fitnesses]
-    return random.choices(poblacion, weights=probs, k=2)
+    return rng.choices(poblacion, weights=probs, k=k)
+
 
+def seleccion_torneo(poblacion, fitnesses, k=2, rng=random, tam_torneo=3):
+    """
+    Selección por torneo: cada padre es el mejor de 'tam_torneo' individuos
+    elegidos al azar.
+    """
+    padres = []
+    for _ in range(k):
+        participantes = rng.sample(range(len(poblacion)), min(tam_torneo, len(poblacion)))
+        ganador = max(participantes, key=lambda i: fitnesses[i])
+        padres.append(poblacion[ganador])
+    return padres
+
+
+def seleccion_rango(poblacion, fitnesses, k=2, rng=random):
+    """
+    Selección por rango: la probabilidad depende de la posición en el
+    ranking y no del valor absoluto de la aptitud.
+    """
+    orden = sorted(range(len(poblacion)), key=lambda i: fitnesses[i])
+    # El peor recibe peso 1 y el mejor peso N
+    return rng.choices([poblacion[i] for i in orden], weights=range(1, len(orden) + 1), k=k)
 
-def crossover(padre1, padre2):
+
+def seleccion_sus(poblacion, fitnesses, k=2, rng=random):
+    """
+    Muestreo Universal Estocástico (SUS): k punteros equiespaciados sobre
+    la ruleta, con menor varianza que k giros independientes.
+    """
+    total = sum(fitnesses)
+    if total == 0:
+        return rng.choices(poblacion, k=k)
+    paso = total / k
+    puntero = rng.uniform(0, paso)
+    padres = []
+    acumulado = 0
+    i = -1
+    for _ in range(k):
+        while acumulado <= puntero and i < len(poblacion) - 1:
+            i += 1
+            acumulado += fitnesses[i]
+        padres.append(poblacion[i])
+        puntero += paso
+    rng.shuffle(padres)  # Evita emparejar siempre individuos vecinos en la ruleta
+    return padres
+
+
+SELECCIONES = {
+    'ruleta': seleccion,
+    'torneo': seleccion_torneo,
+    'rango': seleccion_rango,
+    'sus': seleccion_sus,
+}
+
+
+#############################
+# OPERADORES DE CRUCE Y MUTACIÓN
+#############################
+def crossover(padre1, padre2, crossover_rate=CROSSOVER_RATE, rng=random):
     """
     Realiza cruce en un punto aleatorio con una cierta probabilidad.
 
     Args:
         padre1: Individuo padre.
         padre2: Individuo madre.
+        crossover_rate: Probabilidad de realizar cruce.
+        rng: Generador aleatorio a utilizar.
 
     Returns:
         Dos hijos (resultado del cruce o copia de padres).
     """
-    if random.random() < CROSSOVER_RATE:
-        punto = random.randint(1, len(TARGET) - 1)  # Punto de cruce no trivial
-        hijo1 = padre1[:punto] + padre2[punto:]
-        hijo2 = padre2[:punto] + padre1[punto:]
-        return hijo1, hijo2
-    return padre1, padre2  # Si no hay cruce, se devuelven los padres sin cambios
+    return crossover_k_puntos(padre1, padre2, crossover_rate, rng, k=1)
 
 
-def mutacion(individuo):
+def crossover_k_puntos(padre1, padre2, crossover_rate=CROSSOVER_RATE, rng=random, k=2):
+    """
+    Cruce en k puntos: los hijos alternan segmentos de cada padre entre
+    k puntos de corte distintos.
+    """
+    if rng.random() >= crossover_rate or len(padre1) < 2:
+        return padre1, padre2  # Si no hay cruce, se devuelven los padres sin cambios
+    # Puntos de corte no triviales, ordenados y sin repetir
+    puntos = sorted(rng.sample(range(1, len(padre1)), min(k, len(padre1) - 1)))
+    hijo1, hijo2 = [], []
+    inicio = 0
+    for n, punto in enumerate(puntos + [len(padre1)]):
+        a, b = (padre1, padre2) if n % 2 == 0 else (padre2, padre1)
+        hijo1.append(a[inicio:punto])
+        hijo2.append(b[inicio:punto])
+        inicio = punto
+    return ''.join(hijo1), ''.join(hijo2)
+
+
+def crossover_uniforme(padre1, padre2, crossover_rate=CROSSOVER_RATE, rng=random):
+    """
+    Cruce uniforme: cada gen se intercambia entre los padres con
+    probabilidad 1/2.
+    """
+    if rng.random() >= crossover_rate:
+        return padre1, padre2
+    hijo1, hijo2 = [], []
+    for g1, g2 in zip(padre1, padre2):
+        if rng.random() < 0.5:
+            g1, g2 = g2, g1
+        hijo1.append(g1)
+        hijo2.append(g2)
+    return ''.join(hijo1), ''.join(hijo2)
+
+
+CRUCES = {
+    'un_punto': crossover,
+    'k_puntos': crossover_k_puntos,
+    'uniforme': crossover_uniforme,
+}
+
+
+def mutacion(individuo, mutation_rate=MUTATION_RATE, genes=GENES, rng=random):
     """
     Aplica mutación aleatoria a un individuo con cierta probabilidad por gen.
 
     Args:
         individuo: Cadena binaria.
+        mutation_rate: Probabilidad de mutación por gen.
+        genes: Genes disponibles.
+        rng: Generador aleatorio a utilizar.
 
     Returns:
         Individuo mutado.
     """
     individuo = list(individuo)
     for i in range(len(individuo)):
-        if random.random() < MUTATION_RATE:
-            individuo[i] = random.choice(GENES)
+        if rng.random() < mutation_rate:
+            individuo[i] = rng.choice(genes)
     return ''.join(individuo)
 
 
 #############################
 # ALGORITMO PRINCIPAL
 #############################
-def algoritmo_genetico():
+class GeneticAlgorithm:
     """
-    Ejecuta el algoritmo genético completo:
-    - Inicializa la población
-    - Itera generaciones realizando selección, cruce y mutación
-    - Retorna el mejor individuo y su aptitud
+    Algoritmo genético configurable. Cada instancia tiene su propia
+    configuración y su propio generador aleatorio, por lo que varias
+    instancias pueden ejecutarse en el mismo proceso sin interferir.
     """
-    poblacion = crear_poblacion(POBLACION_SIZE, len(TARGET))  # Población inicial
-    mejor_aptitud = 0  # Almacena la mejor aptitud encontrada
-    mejor_individuo = ""  # Almacena el mejor individuo
 
-    for generacion in range(GENERATIONS):
-        fitnesses = evaluar_poblacion(poblacion)  # Evaluar aptitud
+    def __init__(self, config=None, cache=None):
+        self.config = config or GAConfig()
+        self.rng = random.Random(self.config.semilla)
+        # Aptitudes ya calculadas {genoma: aptitud}; se puede recibir una
+        # caché previa (las islas la conservan de una época a otra)
+        self.cache = cache if cache is not None else {}
+
+    def seleccionar(self, poblacion, fitnesses, k=2):
+        """Aplica el operador de selección configurado."""
+        operador = SELECCIONES[self.config.seleccion]
+        if self.config.seleccion == 'torneo':
+            return operador(poblacion, fitnesses, k, self.rng, self.config.tam_torneo)
+        return operador(poblacion, fitnesses, k, self.rng)
+
+    def cruzar(self, padre1, padre2):
+        """Aplica el operador de cruce configurado."""
+        operador = CRUCES[self.config.cruce]
+        if self.config.cruce == 'k_puntos':
+            return operador(padre1, padre2, self.config.crossover_rate, self.rng, self.config.k_puntos)
+        return operador(padre1, padre2, self.config.crossover_rate, self.rng)
+
+    def evaluar(self, poblacion, executor=None, tam_lote=TAM_LOTE):
+        """
+        Evalúa la población en serie o, si se pasa un executor, en paralelo
+        por lotes. En ambos casos se reutiliza la caché de aptitudes.
+        """
+        if executor is not None:
+            return evaluar_poblacion_paralela(poblacion, executor, self.cache, tam_lote, self.config.target,
+                                              self.config.funcion_aptitud)
+        for ind in poblacion:
+            if ind not in self.cache:
+                self.cache[ind] = self.config.funcion_aptitud(ind, self.config.target)
+        return [self.cache[ind] for ind in poblacion]
+
+    def siguiente_generacion(self, poblacion, fitnesses):
+        """
+        Genera una nueva población mediante elitismo, selección, cruce y mutación.
+
+        Args:
+            poblacion: Lista de individuos.
+            fitnesses: Lista de valores de aptitud.
+
+        Returns:
+            Nueva población del mismo tamaño.
+        """
+        cfg = self.config
+        # Los mejores individuos pasan directamente a la siguiente generación
+        elite = sorted(range(len(poblacion)), key=lambda i: fitnesses[i], reverse=True)[:cfg.elitismo]
+        nueva_poblacion = [poblacion[i] for i in elite]
+
+        while len(nueva_poblacion) < len(poblacion):
+            padres = self.seleccionar(poblacion, fitnesses)  # Selección de padres
+            hijos = self.cruzar(*padres)  # Cruce para generar hijos
+            hijos = [mutacion(h, cfg.mutation_rate, cfg.genes, self.rng) for h in hijos]
+            # Agregar los hijos generados (sin exceder el tamaño de población)
+            nueva_poblacion.extend(hijos[:len(poblacion) - len(nueva_poblacion)])
+
+        return nueva_poblacion
+
+    def ejecutar(self, executor=None, tam_lote=TAM_LOTE, poblacion=None, verbose=True):
+        """
+        Ejecuta el algoritmo genético completo:
+        - Inicializa la población (o parte de la recibida)
+        - Itera generaciones realizando selección, cruce y mutación
+        - Se detiene al alcanzar el objetivo, tras 'generations' generaciones
+          o tras 'paciencia' generaciones sin mejora
+
+        Returns:
+            El mejor individuo, su aptitud y el número de generaciones ejecutadas.
+        """
+        cfg = self.config
+        if poblacion is None:
+            poblacion = crear_poblacion(cfg.poblacion_size, len(cfg.target), cfg.genes, self.rng)
+        mejor_aptitud = float('-inf')  # Almacena la mejor aptitud encontrada
+        mejor_individuo = ""  # Almacena el mejor individuo
+        sin_mejora = 0  # Generaciones consecutivas sin mejorar
+        generacion = 0
+        optimo = cfg.optimo()
+
+        for generacion in range(cfg.generations):
+            fitnesses = self.evaluar(poblacion, executor, tam_lote)  # Evaluar aptitud
+
+            # Verificar y guardar el mejor individuo de la generación
+            max_fitness = max(fitnesses)
+            if max_fitness > mejor_aptitud:
+                mejor_aptitud = max_fitness
+                mejor_individuo = poblacion[fitnesses.index(max_fitness)]
+                sin_mejora = 0
+                if verbose:
+                    print(f"Gen {generacion}: Mejor = {mejor_individuo} Aptitud = {mejor_aptitud}")
+
+                # Si alcanzamos el objetivo perfecto, terminamos
+                if mejor_aptitud >= optimo:
+                    break
+            else:
+                sin_mejora += 1
+                if cfg.paciencia is not None and sin_mejora >= cfg.paciencia:
+                    break  # Estancamiento: parada temprana
+
+            poblacion = self.siguiente_generacion(poblacion, fitnesses)  # Reemplazar población
+
+        self.poblacion = poblacion  # Población final (la usa el modelo de islas)
+        return mejor_individuo, mejor_aptitud, generacion + 1
+
+
+def algoritmo_genetico(config=None):
+    """
+    Ejecuta el algoritmo genético con la configuración dada (o la por defecto).
+
+    Returns:
+        El mejor individuo y su aptitud.
+    """
+    mejor, aptitud, _ = GeneticAlgorithm(config).ejecutar()
+    return mejor, aptitud
 
-        # Verificar y guardar el mejor individuo de la generación
-        max_fitness = max(fitnesses)
-        if max_fitness > mejor_aptitud:
-            mejor_aptitud = max_fitness
-            idx = fitnesses.index(max_fitness)
-            mejor_individuo = poblacion[idx]
-            print(f"Gen {generacion}: Mejor = {mejor_individuo} Aptitud = {mejor_aptitud}")
 
-            # Si alcanzamos el objetivo perfecto, terminamos
-            if mejor_aptitud == len(TARGET):
+def algoritmo_genetico_paralelo(config=None, num_procesos=None, tam_lote=TAM_LOTE):
+    """
+    Igual que algoritmo_genetico, pero la aptitud se evalúa en un pool de
+    procesos por lotes y se guarda en caché por genoma. Útil cuando la
+    función de aptitud es costosa.
+
+    Args:
+        config: GAConfig de la ejecución.
+        num_procesos: Número de procesos del pool (None = todos los núcleos).
+        tam_lote: Número de individuos por lote.
+
+    Returns:
+        El mejor individuo y su aptitud.
+    """
+    with ProcessPoolExecutor(max_workers=num_procesos) as executor:
+        mejor, aptitud, _ = GeneticAlgorithm(config).ejecutar(executor, tam_lote)
+    return mejor, aptitud
+
+
+#############################
+# MODELO DE ISLAS
+#############################
+# Caché de aptitudes de cada proceso trabajador del modelo de islas. Se
+# crea al arrancar el proceso y dura lo que dura el pool: las épocas
+# sucesivas la reutilizan sin enviarla entre procesos. La comparten las
+# islas que evoluciona el mismo proceso (todas usan la misma función de
+# aptitud y el mismo target).
+_CACHE_ISLA = None
+
+
+def _iniciar_trabajador_isla():
+    """Inicializador del pool de islas: caché vacía en cada proceso."""
+    global _CACHE_ISLA
+    _CACHE_ISLA = {}
+
+
+def evolucionar_isla(config, poblacion, generaciones):
+    """
+    Evoluciona una isla (subpoblación) de forma aislada durante varias
+    generaciones. Se ejecuta dentro de un proceso trabajador y reutiliza
+    su caché de aptitudes (_CACHE_ISLA) de épocas anteriores.
+
+    Args:
+        config: GAConfig de la isla (incluye su propia semilla).
+        poblacion: Lista de individuos de la isla.
+        generaciones: Número máximo de generaciones a evolucionar.
+
+    Returns:
+        La población final de la isla, sus aptitudes y cuántas
+        generaciones ha avanzado la población devuelta (menos de
+        'generaciones' si la isla alcanza el objetivo antes).
+    """
+    ga = GeneticAlgorithm(replace(config, generations=generaciones, paciencia=None), _CACHE_ISLA)
+    _, aptitud, ejecutadas = ga.ejecutar(poblacion=poblacion, verbose=False)
+    # Al alcanzar el objetivo la población no se reemplaza tras la última evaluación
+    avance = ejecutadas - 1 if aptitud >= config.optimo() else ejecutadas
+    return ga.poblacion, ga.evaluar(ga.poblacion), avance
+
+
+def migrar(islas, num_migrantes=NUM_MIGRANTES):
+    """
+    Migración en anillo: los mejores individuos de cada isla sustituyen
+    a los peores de la isla siguiente.
+
+    Args:
+        islas: Lista de tuplas (poblacion, fitnesses).
+        num_migrantes: Número de individuos que emigran de cada isla.
+
+    Returns:
+        Lista con las nuevas poblaciones de cada isla.
+    """
+    # Índices de cada población ordenados de mejor a peor
+    ordenes = [sorted(range(len(pob)), key=lambda i: fit[i], reverse=True) for pob, fit in islas]
+    nuevas = [list(pob) for pob, _ in islas]
+
+    for origen, (pob, _) in enumerate(islas):
+        destino = (origen + 1) % len(islas)
+        mejores = [pob[i] for i in ordenes[origen][:num_migrantes]]
+        peores = ordenes[destino][-num_migrantes:] if num_migrantes else []
+        for idx, migrante in zip(peores, mejores):
+            nuevas[destino][idx] = migrante
+    return nuevas
+
+
+def algoritmo_genetico_islas(config=None, num_islas=NUM_ISLAS, intervalo=INTERVALO_MIGRACION,
+                             num_migrantes=NUM_MIGRANTES, verbose=True):
+    """
+    Modelo de islas: cada isla evoluciona en un proceso distinto y cada
+    'intervalo' generaciones se intercambian los mejores individuos.
+
+    Args:
+        config: GAConfig compartido por todas las islas.
+        num_islas: Número de islas (una por proceso).
+        intervalo: Generaciones entre migraciones.
+        num_migrantes: Individuos que emigran de cada isla en cada migración.
+        verbose: Mostrar cada mejora del mejor individuo global.
+
+    Returns:
+        El mejor individuo encontrado y su aptitud.
+    """
+    config = config or GAConfig()
+    rng = random.Random(config.semilla)
+    tam_isla = max(2, config.poblacion_size // num_islas)
+    poblaciones = [crear_poblacion(tam_isla, len(config.target), config.genes, rng)
+                   for _ in range(num_islas)]
+    mejor_aptitud = float('-inf')
+    mejor_individuo = ""
+    optimo = config.optimo()
+
+    with ProcessPoolExecutor(max_workers=num_islas, initializer=_iniciar_trabajador_isla) as executor:
+        for epoca in range(0, config.generations, intervalo):
+            # Cada isla recibe una semilla distinta en cada época; la última
+            # época se acorta para no pasar de config.generations
+            configs = [replace(config, semilla=rng.randrange(2 ** 32)) for _ in range(num_islas)]
+            generaciones = min(intervalo, config.generations - epoca)
+            resultados = list(executor.map(evolucionar_isla, configs, poblaciones,
+                                           itertools.repeat(generaciones)))
+            islas = [(pob, fit) for pob, fit, _ in resultados]
+
+            # Mejor individuo global tras la época
+            for pob, fit, avance in resultados:
+                max_fitness = max(fit)
+                if max_fitness > mejor_aptitud:
+                    mejor_aptitud = max_fitness
+                    mejor_individuo = pob[fit.index(max_fitness)]
+                    if verbose:
+                        print(f"Gen {epoca + avance}: Mejor = {mejor_individuo} Aptitud = {mejor_aptitud}")
+
+            if mejor_aptitud >= optimo:
                 break
 
-        nueva_poblacion = []  # Lista para almacenar la siguiente generación
+            poblaciones = migrar(islas, num_migrantes)
 
-        while len(nueva_poblacion) < POBLACION_SIZE:
-            padres = seleccion(poblacion, fitnesses)  # Selección de padres
-            hijos = crossover(*padres)  # Cruce para generar hijos
-            hijos = [mutacion(h) for h in hijos]  # Aplicar mutación a los hijos
-            # Agregar los hijos generados (sin exceder el tamaño de población)
-            nueva_poblacion.extend(hijos[:POBLACION_SIZE - len(nueva_poblacion)])
+    return mejor_individuo, mejor_aptitud
+
+
+#############################
+# BARRIDO DE PARÁMETROS
+#############################
+def ejecutar_configuracion(config):
+    """
+    Ejecuta un GA completo sin mensajes. Se ejecuta en un proceso trabajador.
+
+    Returns:
+        Tupla (config, mejor individuo, aptitud, generaciones ejecutadas).
+    """
+    mejor, aptitud, generaciones = GeneticAlgorithm(config).ejecutar(verbose=False)
+    return config, mejor, aptitud, generaciones
+
+
+def rejilla_configuraciones(base=None, **valores):
+    """
+    Genera todas las combinaciones de parámetros a partir de una configuración base.
+
+    Ejemplo:
+        rejilla_configuraciones(seleccion=['torneo', 'sus'], elitismo=[0, 2])
+    """
+    base = base or GAConfig()
+    nombres = list(valores)
+    return [replace(base, **dict(zip(nombres, combinacion)))
+            for combinacion in itertools.product(*valores.values())]
 
-        poblacion = nueva_poblacion  # Reemplazar población actual con la nueva
 
-    return mejor_individuo, mejor_aptitud  # Retornar la mejor solución
+def barrido_parametros(configs, num_procesos=None):
+    """
+    Evalúa varias configuraciones de forma concurrente, una por proceso.
+
+    Args:
+        configs: Lista de GAConfig.
+        num_procesos: Número de procesos del pool (None = todos los núcleos).
+
+    Returns:
+        Resultados ordenados de mejor a peor (más aptitud, menos generaciones).
+    """
+    with ProcessPoolExecutor(max_workers=num_procesos) as executor:
+        resultados = list(executor.map(ejecutar_configuracion, configs))
+    return sorted(resultados, key=lambda r: (-r[2], r[3]))
 
 
 #############################
@@ -171,3 +665,31 @@ if __name__ == "__main__":
     # Ejecutar el algoritmo y mostrar resultados finales
     mejor, aptitud = algoritmo_genetico()
     print(f"\nResultado Final:\nMejor Individuo: {mejor}\nAptitud: {aptitud}/{len(TARGET)}")
+
+    # Misma búsqueda evaluando la aptitud en paralelo por lotes
+    mejor, aptitud = algoritmo_genetico_paralelo()
+    print(f"\nResultado Paralelo:\nMejor Individuo: {mejor}\nAptitud: {aptitud}/{len(TARGET)}")
+
+    # Modelo de islas con migración periódica entre procesos
+    mejor, aptitud = algoritmo_genetico_islas()
+    print(f"\nResultado Islas:\nMejor Individuo: {mejor}\nAptitud: {aptitud}/{len(TARGET)}")
+
+    # Barrido de operadores y parámetros evaluado en paralelo
+    configs = rejilla_configuraciones(
+        GAConfig(target="1011011011010110110", mutation_rate=0.01, crossover_rate=0.8,
+                 generations=200, paciencia=50, semilla=0),
+        seleccion=['ruleta', 'torneo', 'rango', 'sus'],
+        cruce=['un_punto', 'k_puntos', 'uniforme'],
+        elitismo=[0, 2],
+    )
+    print("\nBarrido de parámetros (mejores 5):")
+    for cfg, mejor, aptitud, generaciones in barrido_parametros(configs)[:5]:
+        print(f"  {cfg.seleccion:6} {cfg.cruce:8} elitismo={cfg.elitismo}: "
+              f"aptitud {aptitud}/{cfg.optimo()} en {generaciones} generaciones")
+
+    # Objetivo propio (mochila 0/1) evaluado en paralelo: sin máximo conocido
+    mochila = GAConfig(target='0' * len(MOCHILA_PESOS), mutation_rate=0.02, crossover_rate=0.8,
+                       generations=150, seleccion='torneo', elitismo=2, semilla=0,
+                       funcion_aptitud=aptitud_mochila, aptitud_maxima=float('inf'))
+    mejor, aptitud = algoritmo_genetico_paralelo(mochila)
+    print(f"\nMochila: objetos {mejor} con valor {aptitud}")
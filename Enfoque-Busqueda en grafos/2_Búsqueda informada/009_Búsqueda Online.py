@@ -1,19 +1,30 @@
+import heapq
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
 import matplotlib.pyplot as plt
 import networkx as nx
 
+INF = float('inf')
+
 ###############################
 # CLASE DEL ENTORNO DINÁMICO
 ###############################
 class EntornoDinamico:
-    def __init__(self):
+    def __init__(self, grafo=None, objetivo='E'):
         """
         Simula un entorno dinámico con:
         - grafo: Diccionario que representa conexiones entre nodos y sus costos
         - objetivo: Nodo destino (en este caso 'E')
+        - suscriptores: Funciones avisadas cuando cambia el costo de una arista
         """
         # Representación de un grafo donde las claves son nodos y los valores son diccionarios
         # que indican los nodos vecinos y el costo para llegar a ellos.
-        self.grafo = {
+        self.grafo = grafo if grafo is not None else {
             'A': {'B': 1, 'C': 3},
             'B': {'A': 1, 'D': 2},
             'C': {'A': 3, 'D': 1},
@@ -21,7 +32,8 @@ class EntornoDinamico:
             'E': {'D': 4}  # Nodo objetivo
         }
         # El objetivo del agente es llegar al nodo 'E'
-        self.objetivo = 'E'
+        self.objetivo = objetivo
+        self.suscriptores = []
 
     def obtener_vecinos(self, nodo):
         """
@@ -36,6 +48,23 @@ class EntornoDinamico:
         # Verifica si el nodo proporcionado es el objetivo
         return nodo == self.objetivo
 
+    def suscribir(self, funcion):
+        """Registra una función f(u, v, costo_anterior, costo_nuevo) que se llama en cada cambio."""
+        self.suscriptores.append(funcion)
+
+    def cambiar_costo(self, u, v, costo):
+        """
+        Cambia el costo de la arista u-v (en ambos sentidos) y avisa a los
+        suscriptores. Un costo infinito equivale a bloquear la arista.
+        """
+        anterior = self.grafo[u].get(v, float('inf'))
+        if anterior == costo:
+            return
+        self.grafo[u][v] = costo
+        self.grafo[v][u] = costo
+        for funcion in self.suscriptores:
+            funcion(u, v, anterior, costo)
+
 
 ###############################
 # FUNCIÓN DE VISUALIZACIÓN
@@ -70,10 +99,50 @@ def dibujar_grafo(entorno, camino):
     plt.show()
 
 
+###############################
+# ALMACÉN DE HEURÍSTICAS APRENDIDAS
+###############################
+class AlmacenHeuristica:
+    def __init__(self, h=None):
+        """
+        Guarda las heurísticas aprendidas por LRTA* para reutilizarlas
+        entre ensayos (y entre ejecuciones del programa).
+        - h: Diccionario {nodo: valor heurístico aprendido}
+        """
+        self.h = dict(h) if h else {}
+
+    def guardar(self, ruta):
+        """
+        Guarda la tabla en un archivo JSON compacto como lista de pares
+        [nodo, valor]: las claves de un objeto JSON solo pueden ser texto,
+        y así los nodos enteros o en tupla (rejillas) se conservan.
+        """
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump([[nodo, valor] for nodo, valor in self.h.items()], f, separators=(',', ':'))
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga una tabla guardada previamente (vacía si el archivo no existe)."""
+        if not os.path.exists(ruta):
+            return cls()
+        with open(ruta, encoding='utf-8') as f:
+            pares = json.load(f)
+        if isinstance(pares, dict):
+            pares = pares.items()  # Formato anterior: objeto {nodo: valor}
+        return cls({_como_nodo(nodo): valor for nodo, valor in pares})
+
+
+def _como_nodo(valor):
+    """Reconstruye un nodo leído de JSON: las listas vuelven a ser tuplas."""
+    if isinstance(valor, list):
+        return tuple(_como_nodo(x) for x in valor)
+    return valor
+
+
 ###############################
 # ALGORITMO LRTA* MEJORADO
 ###############################
-def busqueda_online_lrta(entorno, inicio, max_iter=100):
+def busqueda_online_lrta(entorno, inicio, max_iter=100, h=None, traza=None, heuristica=None):
     """
     Implementación de LRTA* (Learning Real-Time A*):
     - Aprende heurísticas mientras explora
@@ -83,89 +152,520 @@ def busqueda_online_lrta(entorno, inicio, max_iter=100):
         entorno: Objeto que simula el entorno dinámico
         inicio: Nodo inicial (ej: 'A')
         max_iter: Límite de pasos para evitar bucles infinitos
+        h: Diccionario de heurísticas aprendidas en ensayos anteriores
+           (se actualiza en el sitio); None para empezar desde cero
+        traza: Lista opcional donde se añade un diccionario por evento
+        heuristica: Función h0(nodo, objetivo) para los nodos aún no
+                    aprendidos (0 si no se indica)
 
     Returns:
         camino: Lista de nodos visitados
         costo_total: Costo acumulado del camino
+        h: Heurísticas aprendidas
     """
+    h0 = heuristica or (lambda nodo, obj: 0)
     # Inicializa el camino con el nodo de inicio
     camino = [inicio]
     # Inicializa el costo total en 0
     costo_total = 0
     # Diccionario para almacenar las heurísticas de cada nodo
-    h = {}
+    if h is None:
+        h = {}
     # Nodo actual del agente
     nodo_actual = inicio
-    # Conjunto de nodos ya visitados para detectar bucles
-    visitados = set()
 
     for paso in range(max_iter):
-        # Imprime el estado actual del paso en la búsqueda
-        print(f"\nPaso {paso + 1}: Nodo actual = {nodo_actual}")
-
         # Si llegamos al objetivo, terminamos la búsqueda
         if entorno.es_objetivo(nodo_actual):
-            print("¡Objetivo alcanzado!")
-            break
-
-        # Inicializa la heurística para el nodo actual si no está definida
-        if nodo_actual not in h:
-            h[nodo_actual] = 0
-
-        # Obtiene los vecinos del nodo actual
-        vecinos = list(entorno.obtener_vecinos(nodo_actual))
-        if not vecinos:
-            # Si no hay vecinos, terminamos la búsqueda
-            print("No hay vecinos disponibles. Fin de búsqueda.")
+            if traza is not None:
+                traza.append({'evento': 'objetivo', 'paso': paso + 1, 'nodo': nodo_actual})
             break
 
-        # Selección del mejor vecino
+        # Selección del mejor vecino: f(n) = costo + heurística (h0 si no se conoce)
         mejor_vecino = None
         mejor_valor = float('inf')  # Comienza con un valor infinito
+        mejor_costo = 0  # Costo real de la transición al mejor vecino
 
-        for vecino, costo in vecinos:
-            # Si el vecino no tiene heurística, inicializa a 0
-            if vecino not in h:
-                h[vecino] = 0
-            # Calcula el valor f(n) = costo + heurística
-            valor = costo + h[vecino]
-            # Imprime la evaluación del vecino
-            print(f"Evaluando vecino {vecino}: costo = {costo}, h = {h[vecino]}, total = {valor}")
-            # Si es el mejor valor, selecciona el vecino
+        for vecino, costo in entorno.obtener_vecinos(nodo_actual):
+            valor = costo + (h[vecino] if vecino in h else h0(vecino, entorno.objetivo))
             if valor < mejor_valor:
                 mejor_valor = valor
                 mejor_vecino = vecino
+                mejor_costo = costo
+
+        if mejor_vecino is None:
+            # Si no hay vecinos, terminamos la búsqueda
+            if traza is not None:
+                traza.append({'evento': 'sin_vecinos', 'paso': paso + 1, 'nodo': nodo_actual})
+            break
 
-        # Imprime el mejor vecino seleccionado
-        print(f"Mejor vecino seleccionado: {mejor_vecino} con valor {mejor_valor}")
         # Actualiza la heurística del nodo actual
         h[nodo_actual] = mejor_valor
-        print(f"Heurística actualizada: h({nodo_actual}) = {h[nodo_actual]}")
+        if traza is not None:
+            traza.append({'evento': 'paso', 'paso': paso + 1, 'nodo': nodo_actual,
+                          'siguiente': mejor_vecino, 'costo': mejor_costo, 'h': mejor_valor})
 
-        # Calcula el costo real de la transición al mejor vecino
-        costo_real = next(c for (v, c) in vecinos if v == mejor_vecino)
-        # Acumula el costo total
-        costo_total += costo_real
-        # Mueve al agente al mejor vecino
+        # Acumula el costo total y mueve al agente al mejor vecino
+        costo_total += mejor_costo
         nodo_actual = mejor_vecino
-
-        # Detecta posibles repeticiones en el camino (bucle)
-        if nodo_actual in camino:
-            print("Advertencia: Se ha detectado una posible repetición en el camino.")
         # Añade el nuevo nodo al camino recorrido
         camino.append(nodo_actual)
 
     return camino, costo_total, h
 
 
+def imprimir_traza(traza):
+    """Muestra por pantalla los eventos registrados por busqueda_online_lrta."""
+    for evento in traza:
+        if evento['evento'] == 'paso':
+            print(f"Paso {evento['paso']}: {evento['nodo']} → {evento['siguiente']} "
+                  f"(costo = {evento['costo']}, h({evento['nodo']}) = {evento['h']})")
+        elif evento['evento'] == 'objetivo':
+            print(f"Paso {evento['paso']}: ¡Objetivo alcanzado en {evento['nodo']}!")
+        else:
+            print(f"Paso {evento['paso']}: No hay vecinos disponibles en {evento['nodo']}.")
+
+
+def lrta_ensayos(entorno, inicio, k=50, max_iter=100, almacen=None):
+    """
+    Ejecuta hasta k ensayos de LRTA* reutilizando la heurística aprendida,
+    y se detiene cuando un ensayo ya no modifica ningún valor de h
+    (la heurística ha convergido a lo largo del camino).
+
+    Args:
+        entorno: Objeto que simula el entorno dinámico
+        inicio: Nodo inicial
+        k: Número máximo de ensayos
+        max_iter: Límite de pasos por ensayo
+        almacen: AlmacenHeuristica a reutilizar y actualizar (None = nuevo)
+
+    Returns:
+        almacen: Heurísticas aprendidas
+        resultados: Lista de tuplas (camino, costo) de cada ensayo
+    """
+    if almacen is None:
+        almacen = AlmacenHeuristica()
+    resultados = []
+
+    for _ in range(k):
+        h_anterior = dict(almacen.h)
+        camino, costo, _ = busqueda_online_lrta(entorno, inicio, max_iter, almacen.h)
+        resultados.append((camino, costo))
+        if almacen.h == h_anterior:
+            break  # Convergencia: el ensayo no aprendió nada nuevo
+
+    return almacen, resultados
+
+
+###############################
+# BÚSQUEDA EN TIEMPO REAL CON ANTICIPACIÓN (LSS-LRTA* / RTAA*)
+###############################
+def busqueda_online_lss(entorno, inicio, heuristica=None, anticipacion=20, presupuesto_us=None,
+                        metodo='lss', max_iter=1000, h=None, traza=None):
+    """
+    Búsqueda en tiempo real con anticipación acotada. En cada paso:
+    1. Ejecuta un A* local desde el nodo actual que expande como mucho
+       'anticipacion' nodos (o hasta agotar 'presupuesto_us' microsegundos).
+    2. Actualiza h en todo el espacio de búsqueda local:
+       - 'lss': propagación tipo Dijkstra desde la frontera (LSS-LRTA*),
+         h(s) = min(c(s, s') + h(s')) con el costo de s hacia su sucesor
+       - 'rtaa': h(s) = f(mejor nodo de la frontera) - g(s) (RTAA*, más barata)
+    3. Mueve al agente hasta el mejor nodo de la frontera.
+
+    El presupuesto de tiempo cubre los pasos 1 y 2 y se comprueba tras cada
+    expansión del A* y cada extracción de la propagación de LSS. Si se agota
+    durante la propagación, los nodos aún sin valor definitivo reciben la
+    actualización de RTAA* (un recorrido lineal de los nodos expandidos,
+    también admisible). El movimiento del paso 3 no se cuenta: solo recorre
+    el tramo hasta el destino. Cada paso expande al menos un nodo, así que
+    puede exceder el presupuesto en el coste de una expansión.
+
+    Args:
+        entorno: Objeto que simula el entorno dinámico
+        inicio: Nodo inicial
+        heuristica: Función h0(nodo, objetivo) inicial (0 si no se indica)
+        anticipacion: Máximo de nodos expandidos por paso (al menos 1)
+        presupuesto_us: Tiempo máximo de planificación por paso en microsegundos
+        metodo: 'lss' o 'rtaa'
+        max_iter: Límite de pasos de planificación
+        h: Diccionario de heurísticas aprendidas (se actualiza en el sitio)
+        traza: Lista opcional donde se añade un diccionario por paso
+
+    Returns:
+        camino, costo_total, h (igual que busqueda_online_lrta)
+    """
+    if anticipacion < 1:
+        raise ValueError(f"La anticipación debe ser al menos 1 (se recibió {anticipacion})")
+    if h is None:
+        h = {}
+    objetivo = entorno.objetivo
+    h0 = heuristica or (lambda nodo, obj: 0)
+
+    def valor_h(nodo):
+        return h[nodo] if nodo in h else h0(nodo, objetivo)
+
+    camino = [inicio]
+    costo_total = 0
+    nodo_actual = inicio
+
+    for paso in range(max_iter):
+        if entorno.es_objetivo(nodo_actual):
+            break
+        t0 = time.perf_counter_ns()
+        limite_ns = presupuesto_us * 1000 if presupuesto_us is not None else None
+
+        # 1. A* local acotado
+        g = {nodo_actual: 0}
+        padre = {nodo_actual: None}
+        abiertos = [(valor_h(nodo_actual), 0, nodo_actual)]
+        cerrados = set()
+        while abiertos and len(cerrados) < anticipacion:
+            f, costo, nodo = abiertos[0]
+            if costo > g[nodo] or nodo in cerrados:
+                heapq.heappop(abiertos)  # Entrada obsoleta
+                continue
+            if entorno.es_objetivo(nodo):
+                break
+            heapq.heappop(abiertos)
+            cerrados.add(nodo)
+            for vecino, c in entorno.obtener_vecinos(nodo):
+                nuevo = costo + c
+                if vecino not in cerrados and nuevo < g.get(vecino, INF):
+                    g[vecino] = nuevo
+                    padre[vecino] = nodo
+                    heapq.heappush(abiertos, (nuevo + valor_h(vecino), nuevo, vecino))
+            if limite_ns is not None and time.perf_counter_ns() - t0 > limite_ns:
+                break  # Presupuesto de tiempo agotado: se actúa con lo explorado
+
+        # Frontera vigente (sin entradas obsoletas ni nodos cerrados)
+        frontera = {nodo: g[nodo] for _, costo, nodo in abiertos
+                    if nodo not in cerrados and costo == g[nodo]}
+        if not frontera:
+            break  # No quedan nodos alcanzables
+        destino = min(frontera, key=lambda n: g[n] + valor_h(n))
+        if destino == nodo_actual:
+            break  # Sin ninguna expansión el agente no puede avanzar
+
+        # 2. Aprendizaje sobre el espacio de búsqueda local
+        f_destino = g[destino] + valor_h(destino)
+        if metodo == 'rtaa':
+            for nodo in cerrados:
+                h[nodo] = f_destino - g[nodo]
+        else:
+            # Predecesores cerrados de cada nodo con el costo de la arista
+            # predecesor -> nodo (el grafo puede tener costos asimétricos)
+            predecesores = {}
+            for nodo in cerrados:
+                h[nodo] = INF
+                for vecino, c in entorno.obtener_vecinos(nodo):
+                    predecesores.setdefault(vecino, []).append((nodo, c))
+            fijados = set()  # Nodos cerrados con su valor ya definitivo
+            cola = [(valor_h(nodo), nodo) for nodo in frontera]
+            heapq.heapify(cola)
+            while cola:
+                if limite_ns is not None and time.perf_counter_ns() - t0 > limite_ns:
+                    # Presupuesto agotado: el resto recibe la actualización de RTAA*
+                    for nodo in cerrados - fijados:
+                        h[nodo] = f_destino - g[nodo]
+                    break
+                valor, nodo = heapq.heappop(cola)
+                if valor > valor_h(nodo):
+                    continue
+                if nodo in cerrados:
+                    fijados.add(nodo)
+                for previo, c in predecesores.get(nodo, ()):
+                    if c + valor < h[previo]:
+                        h[previo] = c + valor
+                        heapq.heappush(cola, (h[previo], previo))
+
+        # 3. Movimiento hasta el mejor nodo de la frontera
+        tramo = []
+        nodo = destino
+        while nodo != nodo_actual:
+            tramo.append(nodo)
+            nodo = padre[nodo]
+        tramo.reverse()
+        costo_total += g[destino]
+        camino.extend(tramo)
+        if traza is not None:
+            traza.append({'evento': 'paso', 'paso': paso + 1, 'nodo': nodo_actual,
+                          'siguiente': destino, 'costo': g[destino], 'h': valor_h(nodo_actual),
+                          'expandidos': len(cerrados), 'us': (time.perf_counter_ns() - t0) // 1000})
+        nodo_actual = destino
+
+    return camino, costo_total, h
+
+
+def comparar_anticipacion(n=30, ensayos=5, semilla=1):
+    """
+    Compara LRTA* (un paso de anticipación) con LSS-LRTA* y RTAA* en una
+    rejilla: costo del camino recorrido en los primeros ensayos sucesivos.
+    Los tres parten de la misma heurística inicial (Manhattan), así que la
+    diferencia se debe solo a la anticipación.
+    """
+    rng = random.Random(semilla)
+    entorno = EntornoDinamico(crear_rejilla(n, rng), objetivo=(n - 1, n - 1))
+    print(f"Rejilla {n}x{n}, costo recorrido en {ensayos} ensayos:")
+    configuraciones = [('LRTA*', None, None),
+                       ('LSS-LRTA* (50)', 'lss', 50),
+                       ('RTAA* (50)', 'rtaa', 50)]
+    for nombre, metodo, anticipacion in configuraciones:
+        h = {}
+        costos = []
+        for _ in range(ensayos):
+            if metodo is None:
+                _, costo, _ = busqueda_online_lrta(entorno, (0, 0), max_iter=10 ** 6, h=h, heuristica=manhattan)
+            else:
+                _, costo, _ = busqueda_online_lss(entorno, (0, 0), manhattan, anticipacion,
+                                                  presupuesto_us=5000, metodo=metodo,
+                                                  max_iter=10 ** 6, h=h)
+            costos.append(costo)
+        print(f"  {nombre:15}: {costos}")
+
+
+###############################
+# REPLANIFICACIÓN INCREMENTAL: D* LITE
+###############################
+class DStarLite:
+    def __init__(self, entorno, inicio, heuristica=None):
+        """
+        D* Lite: busca desde el objetivo hacia el agente y, cuando cambian
+        costos de aristas, repara el plan actualizando solo los nodos
+        afectados en lugar de replanificar desde cero.
+        - entorno: EntornoDinamico al que se suscribe para recibir cambios
+        - inicio: Posición actual del agente
+        - heuristica: Función h(a, b) consistente (0 si no se indica)
+        """
+        self.entorno = entorno
+        self.inicio = inicio
+        self.ultimo = inicio  # Posición en la última replanificación
+        self.h = heuristica or (lambda a, b: 0)
+        self.g = {}
+        self.rhs = {entorno.objetivo: 0}
+        self.km = 0  # Corrección acumulada de claves al moverse el agente
+        self.cola = []  # Montículo con entradas (clave, nodo); las obsoletas se descartan
+        self.en_cola = {}  # {nodo: clave vigente}
+        self.cambios = []  # Aristas cambiadas pendientes de procesar
+        self.expansiones = 0  # Nodos expandidos (para medir el trabajo)
+        self._insertar(entorno.objetivo)
+        entorno.suscribir(self._notificar_cambio)
+
+    def _clave(self, nodo):
+        minimo = min(self.g.get(nodo, INF), self.rhs.get(nodo, INF))
+        return (minimo + self.h(self.inicio, nodo) + self.km, minimo)
+
+    def _insertar(self, nodo):
+        clave = self._clave(nodo)
+        self.en_cola[nodo] = clave
+        heapq.heappush(self.cola, (clave, nodo))
+
+    def _tope(self):
+        """Descarta entradas obsoletas y devuelve la clave mínima vigente."""
+        while self.cola:
+            clave, nodo = self.cola[0]
+            if self.en_cola.get(nodo) == clave:
+                return clave, nodo
+            heapq.heappop(self.cola)
+        return (INF, INF), None
+
+    def _recalcular_rhs(self, nodo):
+        """rhs(nodo) = min sobre sucesores de c(nodo, s) + g(s)."""
+        if nodo != self.entorno.objetivo:
+            self.rhs[nodo] = min((costo + self.g.get(vecino, INF)
+                                  for vecino, costo in self.entorno.obtener_vecinos(nodo)), default=INF)
+
+    def _actualizar_cola(self, nodo):
+        """Deja el nodo en la cola solo si es localmente inconsistente."""
+        self.en_cola.pop(nodo, None)  # Borrado perezoso de la cola
+        if self.g.get(nodo, INF) != self.rhs.get(nodo, INF):
+            self._insertar(nodo)
+
+    def _notificar_cambio(self, u, v, anterior, nuevo):
+        self.cambios.append((u, v, anterior, nuevo))
+
+    def calcular_ruta(self):
+        """Expande nodos hasta que el valor del inicio es consistente."""
+        objetivo = self.entorno.objetivo
+        while True:
+            clave, nodo = self._tope()
+            g_inicio = self.g.get(self.inicio, INF)
+            if not (clave < self._clave(self.inicio) or self.rhs.get(self.inicio, INF) != g_inicio):
+                break
+            self.expansiones += 1
+            nueva = self._clave(nodo)
+            g_nodo = self.g.get(nodo, INF)
+            if clave < nueva:
+                self._insertar(nodo)  # La clave quedó desfasada por km
+            elif g_nodo > self.rhs[nodo]:
+                # Nodo sobreconsistente: se fija su valor y solo puede mejorar a sus vecinos
+                g_nodo = self.g[nodo] = self.rhs[nodo]
+                del self.en_cola[nodo]
+                for vecino, costo in self.entorno.obtener_vecinos(nodo):
+                    if vecino != objetivo and costo + g_nodo < self.rhs.get(vecino, INF):
+                        self.rhs[vecino] = costo + g_nodo
+                        self._actualizar_cola(vecino)
+            else:
+                # Nodo subconsistente: se invalida y se recalculan los vecinos que dependían de él
+                self.g[nodo] = INF
+                for vecino, costo in list(self.entorno.obtener_vecinos(nodo)) + [(nodo, 0)]:
+                    if self.rhs.get(vecino, INF) == costo + g_nodo or vecino == nodo:
+                        self._recalcular_rhs(vecino)
+                    self._actualizar_cola(vecino)
+
+    def replanificar(self):
+        """Procesa los cambios de costo recibidos y repara el plan."""
+        if self.cambios:
+            self.km += self.h(self.ultimo, self.inicio)
+            self.ultimo = self.inicio
+            for u, v, anterior, nuevo in self.cambios:
+                # La arista es no dirigida: afecta a rhs(u) vía v y a rhs(v) vía u
+                for a, b in ((u, v), (v, u)):
+                    if a == self.entorno.objetivo:
+                        continue
+                    g_b = self.g.get(b, INF)
+                    if nuevo < anterior:
+                        self.rhs[a] = min(self.rhs.get(a, INF), nuevo + g_b)
+                    elif self.rhs.get(a, INF) == anterior + g_b:
+                        self._recalcular_rhs(a)  # Su mejor sucesor se ha encarecido
+                    self._actualizar_cola(a)
+            self.cambios = []
+        self.calcular_ruta()
+
+    def mover(self, nodo):
+        """Actualiza la posición del agente (no requiere replanificar)."""
+        self.inicio = nodo
+
+    def camino(self):
+        """Extrae el plan actual siguiendo el vecino de menor costo + g."""
+        if self.g.get(self.inicio, INF) == INF:
+            return None, INF
+        camino, costo, nodo = [self.inicio], 0, self.inicio
+        while nodo != self.entorno.objetivo:
+            nodo_sig, c = min(self.entorno.obtener_vecinos(nodo),
+                              key=lambda vc: vc[1] + self.g.get(vc[0], INF))
+            camino.append(nodo_sig)
+            costo += c
+            nodo = nodo_sig
+        return camino, costo
+
+
+def a_star(grafo, inicio, objetivo, heuristica):
+    """
+    A* de referencia que recalcula el camino desde cero.
+
+    Returns:
+        camino, costo (None, inf si no hay camino)
+    """
+    cola = [(heuristica(inicio, objetivo), 0, inicio)]
+    g = {inicio: 0}
+    padre = {inicio: None}
+    cerrados = set()
+    while cola:
+        _, costo, nodo = heapq.heappop(cola)
+        if nodo == objetivo:
+            camino = []
+            while nodo is not None:
+                camino.append(nodo)
+                nodo = padre[nodo]
+            return camino[::-1], costo
+        if nodo in cerrados:
+            continue
+        cerrados.add(nodo)
+        for vecino, c in grafo[nodo].items():
+            nuevo = costo + c
+            if nuevo < g.get(vecino, INF):
+                g[vecino] = nuevo
+                padre[vecino] = nodo
+                heapq.heappush(cola, (nuevo + heuristica(vecino, objetivo), nuevo, vecino))
+    return None, INF
+
+
+def crear_rejilla(n, rng, costo_max=10):
+    """Grafo en rejilla n x n con nodos (fila, columna) y costos aleatorios."""
+    grafo = {(f, c): {} for f in range(n) for c in range(n)}
+    for f in range(n):
+        for c in range(n):
+            for vecino in ((f + 1, c), (f, c + 1)):
+                if vecino in grafo:
+                    costo = rng.randint(1, costo_max)
+                    grafo[(f, c)][vecino] = costo
+                    grafo[vecino][(f, c)] = costo
+    return grafo
+
+
+def manhattan(a, b):
+    """Distancia Manhattan: admisible si el costo mínimo de arista es 1."""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def comparar_replanificacion(n=80, rondas=30, cambios_por_ronda=10, semilla=0):
+    """
+    Benchmark: tiempo de replanificación de D* Lite frente a recalcular A*
+    desde cero. En cada ronda el agente avanza un paso por su plan y se
+    perturba aleatoriamente el costo de algunas aristas.
+    """
+    rng = random.Random(semilla)
+    entorno = EntornoDinamico(crear_rejilla(n, rng), objetivo=(n - 1, n - 1))
+    dstar = DStarLite(entorno, (0, 0), manhattan)
+    dstar.replanificar()
+    aristas = [(u, v) for u in entorno.grafo for v in entorno.grafo[u] if u < v]
+    tiempo_dstar = tiempo_astar = 0
+    expansiones_iniciales = dstar.expansiones
+
+    for _ in range(rondas):
+        camino, _ = dstar.camino()
+        if len(camino) < 2:
+            break
+        dstar.mover(camino[1])  # El agente avanza un paso
+        for u, v in rng.sample(aristas, cambios_por_ronda):
+            entorno.cambiar_costo(u, v, rng.randint(1, 10))
+
+        t0 = time.perf_counter()
+        dstar.replanificar()
+        _, costo_dstar = dstar.camino()
+        t1 = time.perf_counter()
+        _, costo_astar = a_star(entorno.grafo, dstar.inicio, entorno.objetivo, manhattan)
+        t2 = time.perf_counter()
+
+        assert costo_dstar == costo_astar, "D* Lite y A* deben coincidir en el costo óptimo"
+        tiempo_dstar += t1 - t0
+        tiempo_astar += t2 - t1
+
+    print(f"Rejilla {n}x{n}, {rondas} rondas de {cambios_por_ronda} cambios:")
+    print(f"  D* Lite (incremental): {tiempo_dstar * 1000:.1f} ms, "
+          f"{dstar.expansiones - expansiones_iniciales} expansiones tras el plan inicial")
+    print(f"  A* desde cero:         {tiempo_astar * 1000:.1f} ms")
+    return tiempo_dstar, tiempo_astar
+
+
+def comprobar_almacen(n=10, semilla=2):
+    """
+    Ida y vuelta de un AlmacenHeuristica por disco en una rejilla (nodos
+    en tupla): la tabla leída debe ser idéntica, y un nuevo ensayo debe
+    partir de lo aprendido en lugar de volver a empezar.
+    """
+    entorno = EntornoDinamico(crear_rejilla(n, random.Random(semilla)), objetivo=(n - 1, n - 1))
+    almacen, resultados = lrta_ensayos(entorno, (0, 0), k=3, max_iter=10 ** 5)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'heuristica.json')
+        almacen.guardar(ruta)
+        leido = AlmacenHeuristica.cargar(ruta)
+    assert leido.h == almacen.h, "La heurística leída debe coincidir con la guardada"
+    _, costo, _ = busqueda_online_lrta(entorno, (0, 0), 10 ** 5, leido.h)
+    print(f"Rejilla {n}x{n}: {len(leido.h)} valores de h guardados y leídos; costo del primer ensayo"
+          f" {resultados[0][1]}, con la heurística leída {costo}")
+
+
 ###############################
 # EJEMPLO DE USO
 ###############################
 if __name__ == "__main__":
     # Crear el entorno dinámico
     entorno = EntornoDinamico()
-    # Ejecutar la búsqueda LRTA* desde el nodo 'A'
-    camino, costo, heuristica = busqueda_online_lrta(entorno, 'A')
+    # Ejecutar la búsqueda LRTA* desde el nodo 'A' registrando la traza
+    traza = []
+    camino, costo, heuristica = busqueda_online_lrta(entorno, 'A', traza=traza)
+    imprimir_traza(traza)
 
     # Mostrar el resultado de la búsqueda
     print("\n==========================")
@@ -175,5 +675,27 @@ if __name__ == "__main__":
     for nodo in heuristica:
         print(f"  h({nodo}) = {heuristica[nodo]}")
 
+    # Ensayos repetidos hasta que la heurística converge, partiendo de lo
+    # aprendido en ejecuciones anteriores si existe el archivo (junto al
+    # programa o en el directorio indicado como primer argumento)
+    directorio = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    ruta_heuristica = os.path.join(directorio, 'heuristica_lrta.json')
+    almacen = AlmacenHeuristica.cargar(ruta_heuristica)
+    almacen, resultados = lrta_ensayos(entorno, 'A', almacen=almacen)
+    for n, (camino_ensayo, costo_ensayo) in enumerate(resultados, 1):
+        print(f"Ensayo {n}: {' → '.join(camino_ensayo)} (costo {costo_ensayo})")
+    almacen.guardar(ruta_heuristica)  # Persistir para próximas ejecuciones
+
+    # Replanificación incremental con D* Lite ante un cambio de costo
+    dstar = DStarLite(entorno, 'A')
+    dstar.replanificar()
+    print(f"\nPlan D* Lite: {' → '.join(dstar.camino()[0])}")
+    entorno.cambiar_costo('B', 'D', 10)  # Se encarece el paso B-D
+    dstar.replanificar()
+    print(f"Plan D* Lite tras encarecer B-D: {' → '.join(dstar.camino()[0])}")
+    comparar_replanificacion()
+    comparar_anticipacion()
+    comprobar_almacen()
+
     # Visualizar el camino sobre el grafo
     dibujar_grafo(entorno, camino)
@@ -1,25 +1,4 @@
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
-
-        Args:
-            variables: Lista de variables (ej: ['A', 'B', 'C'])
-            dominios: Diccionario {variable: lista_de_valores}
-            restricciones: Diccionario {(var1, var2): función_restricción}
-        """
-        self.variables = variables
-        self.dominios = dominios
-        self.restricciones = restricciones
-
-    def es_consistente(self, asignacion):
-        """Verifica si una asignación parcial cumple todas las restricciones."""
-        for (var1, var2), restriccion in self.restricciones.items():
-            if var1 in asignacion and var2 in asignacion:
-                if not restriccion(asignacion[var1], asignacion[var2]):
-                    return False
-        return True
-
+from nucleo_csp import CSP, resolver
 
 # Ejemplo: Problema de colorear Australia (3 colores)
 variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
@@ -39,37 +18,34 @@ restricciones = {
 problema = CSP(variables, dominios, restricciones)
 
 
-def backtracking_csp(csp, asignacion={}):
+def backtracking_csp(csp, asignacion=None, reinicios=None, semilla=None):
     """
-    Resuelve un CSP usando backtracking recursivo.
+    Resuelve un CSP usando backtracking (sin inferencia).
+    La búsqueda la realiza el núcleo común (nucleo_csp), que solo comprueba
+    las restricciones de la variable recién asignada, deshace los cambios
+    en lugar de copiar la asignación y recorre el árbol con una pila
+    explícita en vez de recursión.
+
+    Con reinicios ('luby' o 'geometrico') las variables se eligen por
+    dom/wdeg con desempate aleatorio y cada reinicio conserva los pesos
+    y los nogoods aprendidos, lo que acota las ejecuciones muy largas.
 
     Args:
         csp: Objeto CSP definido previamente.
-        asignacion: Asignación parcial actual (inicia vacía).
+        asignacion: Asignación parcial inicial (opcional).
+        reinicios: None, 'luby' o 'geometrico' (opcional).
+        semilla: Semilla de los desempates aleatorios (opcional).
 
     Returns:
         Asignación completa o None si no hay solución.
     """
-    # Caso base: asignación completa
-    if len(asignacion) == len(csp.variables):
-        return asignacion
-
-    # Seleccionar variable no asignada (heurística: MRV)
-    var_no_asignadas = [v for v in csp.variables if v not in asignacion]
-    var = min(var_no_asignadas, key=lambda v: len(csp.dominios[v]))
-
-    for valor in csp.dominios[var]:
-        asignacion_actual = asignacion.copy()
-        asignacion_actual[var] = valor
-
-        if csp.es_consistente(asignacion_actual):
-            resultado = backtracking_csp(csp, asignacion_actual)
-            if resultado is not None:
-                return resultado
-
-    return None  # No se encontró solución
+    if reinicios is not None:
+        return resolver(csp, inferencia='ninguna', asignacion=asignacion,
+                        variables='dom/wdeg', reinicios=reinicios, semilla=semilla)
+    return resolver(csp, inferencia='ninguna', asignacion=asignacion, semilla=semilla)
 
 
 # Ejecución
 solucion = backtracking_csp(problema)
-print("Solución CSP (colores):", solucion)
\ No newline at end of file
+print("Solución CSP (colores):", solucion)
+print("Con reinicios de Luby:", backtracking_csp(problema, reinicios='luby', semilla=0))
\ No newline at end of file
@@ -1,116 +1,162 @@
-class CSP:
-    """
-    CLASE PRINCIPAL PARA DEFINIR UN PROBLEMA CSP
+import random
+import time
+
+from nucleo_csp import CSP, Solucionador, generar_coloreo, generar_modelo_b, resolver, soluciones
 
-    Atributos:
-        variables: Lista de variables del problema
-        dominios: Diccionario con valores posibles para cada variable
-        restricciones: Diccionario con restricciones entre pares de variables
-    """
 
-    def __init__(self, variables, dominios, restricciones):
-        # Inicialización de las componentes básicas del CSP
-        self.variables = variables  # Ej: ['WA', 'NT', 'SA', ...]
-        self.dominios = dominios  # Ej: {'WA': ['Rojo', 'Verde', 'Azul'], ...}
-        self.restricciones = restricciones  # Ej: {('WA','NT'): lambda a,b: a!=b, ...}
-
-    def es_consistente(self, variable, valor, asignacion):
-        """
-        VERIFICADOR DE CONSISTENCIA PARA ASIGNACIONES PARCIALES
-
-        Args:
-            variable: Variable que se quiere asignar
-            valor: Valor propuesto para la variable
-            asignacion: Diccionario con asignaciones actuales
-
-        Returns:
-            True si la asignación es consistente, False si viola restricciones
-        """
-        # Revisa todas las restricciones que involucran a la variable
-        for (var1, var2), restriccion in self.restricciones.items():
-            # Caso donde var1 es la variable actual y var2 ya está asignada
-            if var1 == variable and var2 in asignacion:
-                if not restriccion(valor, asignacion[var2]):
-                    return False
-            # Caso donde var2 es la variable actual y var1 ya está asignada
-            elif var2 == variable and var1 in asignacion:
-                if not restriccion(asignacion[var1], valor):
-                    return False
-        return True
+def valores_legales(csp, variable, asignacion):
+    """Valores del dominio de la variable consistentes con la asignación actual."""
+    return [valor for valor in csp.dominios[variable] if csp.es_consistente(variable, valor, asignacion)]
 
 
 def seleccionar_variable_no_asignada(csp, asignacion):
     """
     HEURÍSTICA MRV (MÍNIMOS VALORES RESTANTES)
 
-    Selecciona la variable con menos valores posibles en su dominio,
-    para reducir el factor de ramificación.
+    Selecciona la variable no asignada con menos valores legales (los
+    compatibles con las variables ya asignadas; los dominios no se podan),
+    desempatando por grado, para reducir el factor de ramificación.
+    Es el criterio que sigue el núcleo en backtracking().
     """
-    # Filtra variables no asignadas
-    variables_no_asignadas = [v for v in csp.variables if v not in asignacion]
-    # Elige la variable con el dominio más pequeño
-    return min(variables_no_asignadas, key=lambda v: len(csp.dominios[v]))
+    no_asignadas = [v for v in csp.variables if v not in asignacion]
+    return min(no_asignadas, key=lambda v: (len(valores_legales(csp, v, asignacion)),
+                                            -len(csp.vecinos[v])))
 
 
 def ordenar_valores(csp, variable, asignacion):
     """
     HEURÍSTICA LCV (VALOR QUE MENOS RESTRINGE)
 
-    Ordena los valores del dominio de la variable según cuánto
-    limitan las opciones de las variables vecinas no asignadas.
+    Ordena los valores legales de la variable según cuántos valores
+    legales eliminarían a sus vecinas no asignadas.
     """
+    vecinas = [v for v in csp.grafo[variable] if v not in asignacion]
+    legales = {v: valores_legales(csp, v, asignacion) for v in vecinas}
 
-    def contar_conflictos(valor):
-        # Cuenta cuántas restricciones violaría este valor
-        return sum(1 for (var1, var2), restriccion in csp.restricciones.items()
-                   if (var1 == variable and var2 not in asignacion and
-                       not restriccion(valor, csp.dominios[var2][0])))
+    def eliminados(valor):
+        prueba = {**asignacion, variable: valor}
+        return sum(1 for v in vecinas for otro in legales[v] if not csp.es_consistente(v, otro, prueba))
 
-    # Ordena valores de menos a más conflictivos
-    return sorted(csp.dominios[variable], key=contar_conflictos)
+    return sorted(valores_legales(csp, variable, asignacion), key=eliminados)
 
 
-def backtracking(csp, asignacion=None):
+def backtracking(csp, asignacion=None, reinicios=None, semilla=None):
     """
     ALGORITMO PRINCIPAL DE BACKTRACKING
 
+    Delegado en el núcleo común (nucleo_csp), sin inferencia: cada valor
+    se comprueba contra las variables ya asignadas al elegirlo.
+    1. Selección de variable con MRV sobre los valores legales, los
+       compatibles con la asignación actual (ver
+       seleccionar_variable_no_asignada), desempatando por grado. El núcleo
+       lleva la cuenta aparte, sin podar los dominios, y obtiene la
+       variable de un montículo indexado en O(log n)
+    2. Ordenación de valores con LCV: primero el que elimina menos valores
+       legales de los vecinos no asignados (ver ordenar_valores)
+    3. Asignación, llamada recursiva y vuelta atrás deshaciendo cambios
+
+    Con reinicios ('luby' o 'geometrico') se usa el modo para instancias
+    difíciles: variables por dom/wdeg (las restricciones que más fallan
+    pesan más), desempates aleatorios, reinicios con cuota creciente de
+    retrocesos y nogoods aprendidos del camino abandonado en cada reinicio.
+
     Args:
         csp: Objeto CSP con el problema a resolver
-        asignacion: Asignación parcial actual (inicia vacía)
+        asignacion: Asignación parcial inicial (opcional)
+        reinicios: None, 'luby' o 'geometrico'
+        semilla: Semilla de los desempates aleatorios (opcional)
 
     Returns:
         Asignación completa solución o None si no hay solución
     """
-    # Inicialización para primera llamada recursiva
-    if asignacion is None:
-        asignacion = {}
-
-    # CASO BASE: solución completa encontrada
-    if len(asignacion) == len(csp.variables):
-        return asignacion
+    if reinicios is not None:
+        return resolver(csp, inferencia='ninguna', asignacion=asignacion, variables='dom/wdeg',
+                        valores='lcv', reinicios=reinicios, semilla=semilla)
+    return resolver(csp, inferencia='ninguna', asignacion=asignacion, variables='mrv',
+                    valores='lcv', semilla=semilla)
 
-    # 1. SELECCIÓN DE VARIABLE (usando MRV)
-    variable = seleccionar_variable_no_asignada(csp, asignacion)
 
-    # 2. ORDENACIÓN DE VALORES (usando LCV)
-    for valor in ordenar_valores(csp, variable, asignacion):
-        # 3. VERIFICACIÓN DE CONSISTENCIA
-        if csp.es_consistente(variable, valor, asignacion):
-            # 4. ASIGNACIÓN TEMPORAL
-            asignacion[variable] = valor
-
-            # 5. LLAMADA RECURSIVA
-            resultado = backtracking(csp, asignacion)
+def backtracking_soluciones(csp, asignacion=None, maximo=None, simetria=None):
+    """
+    Versión generadora de backtracking: en lugar de parar en la primera
+    solución, la búsqueda se suspende en cada una y continúa con el
+    siguiente valor cuando se pide otra. No se guarda ninguna lista.
 
-            # 6. VERIFICACIÓN DE SOLUCIÓN
-            if resultado is not None:
-                return resultado
+    Args:
+        csp: Objeto CSP con el problema a resolver
+        asignacion: Asignación parcial inicial (opcional)
+        maximo: Número máximo de soluciones (None = todas)
+        simetria: 'valores' para dar una sola solución por cada clase de
+                  soluciones que solo difieren en una permutación de
+                  valores (los colores de un mapa)
+
+    Yields:
+        Asignaciones completas, una por solución
+    """
+    yield from soluciones(csp, inferencia='ninguna', asignacion=asignacion, variables='mrv',
+                          valores='lcv', simetria=simetria, maximo=maximo)
 
-            # 7. BACKTRACK (eliminar asignación si no llevó a solución)
-            del asignacion[variable]
 
-    # 8. RETORNO SIN SOLUCIÓN (para esta rama)
-    return None
+def comparar_enumeracion(n=24, colores=3, semilla=3):
+    """
+    Recuento de todos los coloreos de un grafo aleatorio: generando un
+    diccionario por solución, solo contando y contando con ruptura de
+    simetría de colores (una clase por cada grupo de colores permutados).
+    """
+    problema = CSP(*generar_coloreo(n, colores, grado_medio=3, rng=random.Random(semilla)))
+    print(f"\nTodas las soluciones de un coloreo aleatorio (n={n}, {colores} colores):")
+    modos = (
+        ("diccionarios", lambda: sum(1 for _ in backtracking_soluciones(problema))),
+        ("solo recuento", lambda: Solucionador(problema, 'ninguna', 'mrv', 'lcv').contar()),
+        ("con simetría", lambda: Solucionador(problema, 'ninguna', 'mrv', 'lcv').contar(simetria='valores')),
+    )
+    for nombre, contar in modos:
+        inicio = time.perf_counter()
+        total = contar()
+        print(f"  {nombre:<14} {total:>10} en {time.perf_counter() - inicio:7.3f} s")
+
+
+def problema_con_nucleo_dificil(n=27, tamano_nucleo=12, semilla=1):
+    """
+    Instancia de cola pesada: un coloreo fácil de n nodos (3 colores, con
+    solución plantada) enlazado a un pequeño núcleo aleatorio del modelo B
+    sobrerrestringido y sin solución. MRV colorea primero la parte fácil
+    (dominios más pequeños) y luego repite el fallo del núcleo para cada
+    combinación de colores.
+    """
+    rng = random.Random(semilla)
+    variables, dominios, restricciones = generar_coloreo(n, colores=3, grado_medio=4, rng=rng)
+    nucleo, dominios_nucleo, restricciones_nucleo = generar_modelo_b(tamano_nucleo, 5, 0.6, 0.45, rng)
+    nombre = {v: f'K{v}' for v in nucleo}
+    variables += [nombre[v] for v in nucleo]
+    dominios.update({nombre[v]: d for v, d in dominios_nucleo.items()})
+    restricciones.update({(nombre[a], nombre[b]): f for (a, b), f in restricciones_nucleo.items()})
+    # Enlaces sin efecto entre el núcleo y la parte fácil: un solo problema conexo
+    for v, k in zip(variables, nucleo):
+        restricciones[(v, nombre[k])] = lambda a, b: True
+    return CSP(variables, dominios, restricciones)
+
+
+def comparar_reinicios(semillas=5):
+    """
+    Compara MRV cronológico con dom/wdeg sin y con reinicios (Luby y
+    geométricos) sobre la instancia con núcleo difícil, variando la
+    semilla del desempate aleatorio. Muestra el peor caso de cada modo.
+    """
+    problema = problema_con_nucleo_dificil()
+    print(f"\n{'Modo':<22} {'Nodos (máx)':>12} {'Tiempo máx (s)':>15} {'Reinicios':>10}")
+    for variables, reinicios in (('mrv', None), ('dom/wdeg', None),
+                                 ('dom/wdeg', 'luby'), ('dom/wdeg', 'geometrico')):
+        nodos, tiempo, total_reinicios = 0, 0.0, 0
+        for semilla in range(semillas):
+            inicio = time.perf_counter()
+            solucionador = Solucionador(problema, 'ninguna', variables, reinicios=reinicios, semilla=semilla)
+            solucionador.resolver()
+            tiempo = max(tiempo, time.perf_counter() - inicio)
+            nodos = max(nodos, solucionador.estadisticas.nodos)
+            total_reinicios += solucionador.estadisticas.reinicios
+        modo = variables + (f' + {reinicios}' if reinicios else '')
+        print(f"{modo:<22} {nodos:>12} {tiempo:>15.3f} {total_reinicios:>10}")
 
 
 # =============================================================================
@@ -139,15 +185,26 @@ restricciones = {
 # =============================================================================
 # EJECUCIÓN PRINCIPAL
 # =============================================================================
-
-# 1. Crear instancia del problema CSP
-problema = CSP(variables, dominios, restricciones)
-
-# 2. Resolver usando backtracking
-solucion = backtracking(problema)
-
-# 3. Mostrar resultados
-print("\nSOLUCIÓN ENCONTRADA:")
-for variable, valor in solucion.items():
-    print(f"{variable}: {valor}")
-print("\nNota: Los colores pueden variar entre ejecuciones por el orden de exploración")
\ No newline at end of file
+if __name__ == "__main__":
+    # 1. Crear instancia del problema CSP
+    problema = CSP(variables, dominios, restricciones)
+
+    # 2. Resolver usando backtracking
+    solucion = backtracking(problema)
+
+    # 3. Mostrar resultados
+    print("\nSOLUCIÓN ENCONTRADA:")
+    for variable, valor in solucion.items():
+        print(f"{variable}: {valor}")
+    print("\nNota: Los colores pueden variar entre ejecuciones por el orden de exploración")
+
+    # 3b. Las primeras soluciones, generadas bajo demanda, y todas salvo permutación de colores
+    print("\nPrimeras 3 soluciones:")
+    for otra in backtracking_soluciones(problema, maximo=3):
+        print(" ", otra)
+    print(f"Total: {sum(1 for _ in backtracking_soluciones(problema))} coloreos, "
+          f"{sum(1 for _ in backtracking_soluciones(problema, simetria='valores'))} salvo permutación de colores")
+    comparar_enumeracion()
+
+    # 4. Instancia con un núcleo sin solución escondido: peor caso de cada modo
+    comparar_reinicios()
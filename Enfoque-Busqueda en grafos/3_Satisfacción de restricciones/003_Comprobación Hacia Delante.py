@@ -1,32 +1,14 @@
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
-
-        Args:
-            variables: Lista de variables (ej: ['A', 'B', 'C'])
-            dominios: Diccionario {variable: lista_de_valores}
-            restricciones: Diccionario {(var1, var2): función_restricción}
-        """
-        self.variables = variables
-        self.dominios = dominios.copy()  # Copia para no modificar el original
-        self.restricciones = restricciones
-
-    def es_consistente(self, var, valor, asignacion):
-        """Verifica si una asignación es consistente"""
-        for (v1, v2), restriccion in self.restricciones.items():
-            if v1 == var and v2 in asignacion:
-                if not restriccion(valor, asignacion[v2]):
-                    return False
-            elif v2 == var and v1 in asignacion:
-                if not restriccion(asignacion[v1], valor):
-                    return False
-        return True
+import random
+import time
+
+from nucleo_csp import CSP, contar_busqueda, generar_coloreo, resolver, soluciones
 
 
 def forward_checking(csp, asignacion, var, valor):
     """
     Realiza la comprobación hacia delante después de asignar un valor.
+    Solo recorre los arcos de var, así que el coste depende de su número
+    de vecinos y no del tamaño del problema.
 
     Args:
         csp: Instancia del problema CSP
@@ -35,38 +17,31 @@ def forward_checking(csp, asignacion, var, valor):
         valor: Valor asignado a la variable
 
     Returns:
-        dominios_actualizados: Dominios reducidos o None si se detecta inconsistencia
+        dominios_actualizados: Dominios reducidos de los vecinos no asignados
+        de var (los de las demás variables no cambian) o None si se detecta
+        inconsistencia
     """
-    dominios_actualizados = {v: list(csp.dominios[v]) for v in csp.variables if v not in asignacion}
-
-    # Corrección clave: Obtener vecinos correctamente
-    vecinos = []
-    for (v1, v2) in csp.restricciones:
-        if v1 == var and v2 not in asignacion:
-            vecinos.append(v2)
-        elif v2 == var and v1 not in asignacion:
-            vecinos.append(v1)
-
-    for vecino in vecinos:
-        for val_vecino in list(dominios_actualizados[vecino]):
-            # Verificar compatibilidad con la nueva asignación
-            if (var, vecino) in csp.restricciones:
-                if not csp.restricciones[(var, vecino)](valor, val_vecino):
-                    dominios_actualizados[vecino].remove(val_vecino)
-            elif (vecino, var) in csp.restricciones:
-                if not csp.restricciones[(vecino, var)](val_vecino, valor):
-                    dominios_actualizados[vecino].remove(val_vecino)
-
-            # Si un dominio queda vacío, la asignación es inválida
-            if not dominios_actualizados[vecino]:
-                return None
-    return dominios_actualizados
+    actualizados = {}
+    for arco in csp.arcos[csp.indice[var]]:
+        vecino = csp.variables[arco.destino]
+        if vecino in asignacion or vecino == var:
+            continue
+        dominio = actualizados.get(vecino, csp.dominios[vecino])
+        podado = [y for y in dominio if csp.satisface(arco, valor, y)]
+        if not podado:
+            return None
+        actualizados[vecino] = podado
+    return actualizados
 
 
 def backtracking_con_fc(csp, asignacion=None):
     """
     Backtracking con Forward Checking.
 
+    Delegado en el núcleo común (nucleo_csp): tras cada asignación se podan
+    los dominios de los vecinos no asignados y, al volver atrás, se
+    restauran desde el rastro sin copiar dominios.
+
     Args:
         csp: Instancia del CSP
         asignacion: Asignación parcial (inicia vacía)
@@ -74,64 +49,127 @@ def backtracking_con_fc(csp, asignacion=None):
     Returns:
         Solución completa o None si no hay solución
     """
-    if asignacion is None:
-        asignacion = {}
+    return resolver(csp, inferencia='fc', asignacion=asignacion)
 
-    # Caso base: solución completa
-    if len(asignacion) == len(csp.variables):
-        return asignacion
 
-    # Selección de variable (MRV)
-    var = min([v for v in csp.variables if v not in asignacion],
-              key=lambda v: len(csp.dominios[v]))
+def fc_soluciones(csp, asignacion=None, maximo=None, simetria=None):
+    """
+    Generador de las soluciones de backtracking_con_fc, una a una.
 
-    for valor in list(csp.dominios[var]):
-        if csp.es_consistente(var, valor, asignacion):
-            # Hacer asignación temporal
-            asignacion[var] = valor
+    Args:
+        csp: Instancia del CSP
+        asignacion: Asignación parcial (inicia vacía)
+        maximo: Número máximo de soluciones (None = todas)
+        simetria: 'valores' para romper la simetría de valores intercambiables
 
-            # Guardar estado anterior de dominios
-            dominios_originales = {v: list(csp.dominios[v]) for v in csp.variables}
+    Yields:
+        Soluciones completas
+    """
+    yield from soluciones(csp, inferencia='fc', asignacion=asignacion,
+                          simetria=simetria, maximo=maximo)
 
-            # Aplicar Forward Checking
-            dominios_fc = forward_checking(csp, asignacion, var, valor)
 
-            if dominios_fc is not None:
-                # Actualizar dominios temporalmente
-                for v in dominios_fc:
-                    csp.dominios[v] = dominios_fc[v]
+def contar_fc(csp, asignacion=None, simetria=None):
+    """Número de soluciones con forward checking, sin construir cada solución."""
+    return contar_busqueda(csp, inferencia='fc', asignacion=asignacion, simetria=simetria)
 
-                # Llamada recursiva
-                resultado = backtracking_con_fc(csp, asignacion)
-                if resultado is not None:
-                    return resultado
 
-                # Restaurar dominios después de la recursión
-                for v in dominios_fc:
-                    csp.dominios[v] = dominios_originales[v]
+def fc_por_copias(variables, dominios, restricciones, asignacion=None):
+    """
+    Versión de referencia de backtracking_con_fc, sin el núcleo común, tal
+    como era antes de él: diccionarios de listas de valores que se copian
+    enteros en cada nodo, MRV por recorrido lineal y comprobación de
+    consistencia recorriendo todas las restricciones. Solo se usa para
+    medir la mejora en comparar_coloreo.
 
-            # Deshacer asignación
-            del asignacion[var]
+    Returns:
+        Solución completa o None si no hay solución
+    """
+    if asignacion is None:
+        asignacion = {}
+    if len(asignacion) == len(variables):
+        return asignacion
 
+    var = min((v for v in variables if v not in asignacion), key=lambda v: len(dominios[v]))
+    for valor in dominios[var]:
+        consistente = all(restriccion(valor, asignacion[v2]) if v1 == var else restriccion(asignacion[v1], valor)
+                          for (v1, v2), restriccion in restricciones.items()
+                          if (v1 == var and v2 in asignacion) or (v2 == var and v1 in asignacion))
+        if not consistente:
+            continue
+        asignacion[var] = valor
+        # Copia de todos los dominios y poda de los vecinos no asignados
+        podados = {v: list(dominios[v]) for v in variables}
+        podados[var] = [valor]
+        vacio = False
+        for (v1, v2), restriccion in restricciones.items():
+            if v1 == var and v2 not in asignacion:
+                podados[v2] = [b for b in podados[v2] if restriccion(valor, b)]
+                vacio = vacio or not podados[v2]
+            elif v2 == var and v1 not in asignacion:
+                podados[v1] = [a for a in podados[v1] if restriccion(a, valor)]
+                vacio = vacio or not podados[v1]
+        if not vacio:
+            resultado = fc_por_copias(variables, podados, restricciones, asignacion)
+            if resultado is not None:
+                return resultado
+        del asignacion[var]
     return None
 
 
-# Ejemplo: Problema de colorear Australia
-variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
-dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
-restricciones = {
-    ('WA', 'NT'): lambda a, b: a != b,
-    ('WA', 'SA'): lambda a, b: a != b,
-    ('NT', 'SA'): lambda a, b: a != b,
-    ('NT', 'Q'): lambda a, b: a != b,
-    ('SA', 'Q'): lambda a, b: a != b,
-    ('SA', 'NSW'): lambda a, b: a != b,
-    ('SA', 'V'): lambda a, b: a != b,
-    ('Q', 'NSW'): lambda a, b: a != b,
-    ('NSW', 'V'): lambda a, b: a != b
-}
-
-# Resolución
-problema = CSP(variables, dominios, restricciones)
-solucion = backtracking_con_fc(problema)
-print("Solución con Forward Checking:", solucion)
\ No newline at end of file
+def comparar_coloreo(tamanos=(100, 200, 400, 800), colores=4, semilla=0):
+    """
+    Benchmark de forward checking en coloreo de grafos aleatorios:
+    restricciones precompiladas en máscaras de soporte (un AND por vecino)
+    frente a evaluar la función de la restricción valor a valor, ambas con
+    el rastro del núcleo, y frente a la versión de referencia que copia
+    los dominios en cada nodo (fc_por_copias).
+    """
+    rng = random.Random(semilla)
+    print(f"Coloreo con {colores} colores (tiempo de backtracking_con_fc):")
+    for n in tamanos:
+        variables, dominios, restricciones = generar_coloreo(n, colores, rng=rng)
+        tiempos = []
+        for compilar in (True, False):
+            csp = CSP(variables, dominios, restricciones, compilar=compilar)
+            inicio = time.perf_counter()
+            solucion = backtracking_con_fc(csp)
+            tiempos.append(time.perf_counter() - inicio)
+            assert solucion is not None and csp.asignacion_consistente(solucion)
+        inicio = time.perf_counter()
+        solucion = fc_por_copias(variables, {v: list(dominios[v]) for v in variables}, restricciones)
+        tiempos.append(time.perf_counter() - inicio)
+        assert solucion is not None and csp.asignacion_consistente(solucion)
+        print(f"  n = {n:4}: máscaras {tiempos[0] * 1000:8.1f} ms | "
+              f"funciones {tiempos[1] * 1000:8.1f} ms | "
+              f"copias {tiempos[2] * 1000:8.1f} ms (x{tiempos[2] / tiempos[0]:.0f})")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: Problema de colorear Australia
+    variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('WA', 'NT'): lambda a, b: a != b,
+        ('WA', 'SA'): lambda a, b: a != b,
+        ('NT', 'SA'): lambda a, b: a != b,
+        ('NT', 'Q'): lambda a, b: a != b,
+        ('SA', 'Q'): lambda a, b: a != b,
+        ('SA', 'NSW'): lambda a, b: a != b,
+        ('SA', 'V'): lambda a, b: a != b,
+        ('Q', 'NSW'): lambda a, b: a != b,
+        ('NSW', 'V'): lambda a, b: a != b
+    }
+
+    # Resolución
+    problema = CSP(variables, dominios, restricciones)
+    solucion = backtracking_con_fc(problema)
+    print("Solución con Forward Checking:", solucion)
+    print("Soluciones con T en rojo:", contar_fc(problema, {'T': 'Rojo'}))
+    print("Otra con T en rojo:", list(fc_soluciones(problema, {'T': 'Rojo'}, maximo=2))[-1])
+
+    # Comparación en grafos de cientos de variables
+    comparar_coloreo()
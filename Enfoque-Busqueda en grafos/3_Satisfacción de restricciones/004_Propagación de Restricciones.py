@@ -1,63 +1,39 @@
-from collections import deque
-
-
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
-
-        Args:
-            variables: Lista de variables (ej: ['A', 'B', 'C'])
-            dominios: Diccionario {variable: lista_de_valores}
-            restricciones: Diccionario {(var1, var2): función_restricción}
-        """
-        self.variables = variables
-        self.dominios = {v: list(dominios[v]) for v in variables}  # Copia los dominios
-        self.restricciones = restricciones
-        self.arcos = self._obtener_arcos()  # Precomputa todos los arcos
-
-    def _obtener_arcos(self):
-        """Genera todos los arcos bidireccionales del grafo de restricciones"""
-        arcos = []
-        for (xi, xj) in self.restricciones:
-            arcos.append((xi, xj))
-            arcos.append((xj, xi))  # Restricciones son bidireccionales
-        return arcos
-
-
-def AC3(csp):
+import random
+import time
+
+import nucleo_csp
+from nucleo_csp import CSP, Dominios, Estadisticas, Solucionador, generar_modelo_b, tension_critica
+
+
+def AC3(csp, estadisticas=None):
     """
     Implementación del algoritmo AC-3 para propagación de restricciones.
+    La propagación la realiza el núcleo común (nucleo_csp) sobre dominios
+    de bits, con cola sin duplicados y soportes residuales (AC-3rm); al
+    terminar, los dominios reducidos se escriben en csp.dominios.
 
     Args:
         csp: Objeto CSP definido previamente
+        estadisticas: Estadisticas donde contar revisiones y comprobaciones
 
     Returns:
         True si se logra consistencia de arcos, False si se detecta inconsistencia
     """
-    cola = deque(csp.arcos)  # Usamos una cola FIFO
-
-    while cola:
-        (xi, xj) = cola.popleft()
-
-        # Paso clave: Revisar y reducir dominios
-        if revisar(csp, xi, xj):
-            if not csp.dominios[xi]:  # Dominio vacío -> inconsistencia
-                return False
-
-            # Agregar arcos (xk, xi) para revisión posterior
-            for (xk, _) in csp.arcos:
-                if xk == xi:
-                    continue
-                cola.append((xk, xi))
-
-    return True  # Consistencia lograda
+    dominios = Dominios(csp)
+    consistente = nucleo_csp.ac3(csp, dominios, estadisticas=estadisticas)
+    dominios.volcar(csp)
+    return consistente
 
 
 def revisar(csp, xi, xj):
     """
     Elimina valores inconsistentes del dominio de xi respecto a xj.
 
+    Trabaja solo con csp.dominios[xi] y csp.dominios[xj] y con los arcos
+    xi -> xj: con la restricción precompilada, cada valor de xi se
+    comprueba con un AND entre su máscara de soportes y la del dominio
+    de xj; si no, se busca un valor de xj compatible.
+
     Args:
         csp: Objeto CSP
         xi: Variable cuyo dominio se revisará
@@ -66,43 +42,128 @@ def revisar(csp, xi, xj):
     Returns:
         True si se modificó el dominio de xi, False en caso contrario
     """
-    modificado = False
-
-    for x in list(csp.dominios[xi]):
-        # Verificar si existe algún valor en xj que satisfaga la restricción
-        satisfacible = any(
-            csp.restricciones.get((xi, xj), lambda a, b: True)(x, y) or
-            csp.restricciones.get((xj, xi), lambda a, b: True)(y, x)
-            for y in csp.dominios[xj]
-        )
-
-        if not satisfacible:
-            csp.dominios[xi].remove(x)
-            modificado = True
-
-    return modificado
-
-
-# Ejemplo: Problema de colorear Australia
-variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
-dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
-restricciones = {
-    ('WA', 'NT'): lambda a, b: a != b,
-    ('WA', 'SA'): lambda a, b: a != b,
-    ('NT', 'SA'): lambda a, b: a != b,
-    ('NT', 'Q'): lambda a, b: a != b,
-    ('SA', 'Q'): lambda a, b: a != b,
-    ('SA', 'NSW'): lambda a, b: a != b,
-    ('SA', 'V'): lambda a, b: a != b,
-    ('Q', 'NSW'): lambda a, b: a != b,
-    ('NSW', 'V'): lambda a, b: a != b
-}
-
-# Crear y resolver CSP
-problema = CSP(variables, dominios, restricciones)
-consistente = AC3(problema)
-
-print("¿Consistencia lograda?", consistente)
-print("Dominios resultantes:")
-for variable, dominio in problema.dominios.items():
-    print(f"{variable}: {dominio}")
\ No newline at end of file
+    i, j = csp.indice[xi], csp.indice[xj]
+    arcos = [arco for arco in csp.arcos[i] if arco.destino == j]
+    id_i, id_j = csp.id_valor[i], csp.id_valor[j]
+    mascara_j = 0
+    for y in csp.dominios[xj]:
+        mascara_j |= 1 << id_j[y]
+
+    def soportado(arco, x):
+        if arco.soportes is not None:
+            return arco.soportes[id_i[x]] & mascara_j
+        return any(csp.satisface(arco, x, y) for y in csp.dominios[xj])
+
+    conservados = [x for x in csp.dominios[xi] if all(soportado(arco, x) for arco in arcos)]
+    if len(conservados) == len(csp.dominios[xi]):
+        return False
+    csp.dominios[xi] = conservados  # Lista nueva: otras variables pueden compartir la anterior
+    return True
+
+
+def backtracking_mac(csp, asignacion=None):
+    """
+    Búsqueda MAC (Maintaining Arc Consistency): tras cada asignación se
+    ejecuta AC-3 incremental, sembrado con los arcos que apuntan a la
+    variable asignada. Las podas se deshacen desde el rastro al volver atrás.
+
+    Args:
+        csp: Objeto CSP
+        asignacion: Asignación parcial inicial (opcional)
+
+    Returns:
+        Solución completa o None si no hay solución
+    """
+    return nucleo_csp.resolver(csp, inferencia='mac', asignacion=asignacion)
+
+
+def comparar_mac_fc(n=30, d=8, p1=0.3, instancias=10, semilla=0):
+    """
+    Benchmark de MAC frente a forward checking (backtracking_con_fc) en CSP
+    aleatorios del modelo B con la tensión de la transición de fase, donde
+    están las instancias más difíciles.
+    """
+    rng = random.Random(semilla)
+    p2 = tension_critica(n, d, p1)
+    print(f"Modelo B <{n}, {d}, {p1}, {p2:.3f}>, {instancias} instancias:")
+    totales = {'fc': [0, 0.0], 'mac': [0, 0.0]}
+    resolubles = 0
+    for _ in range(instancias):
+        variables, dominios, restricciones = generar_modelo_b(n, d, p1, p2, rng)
+        for inferencia in totales:
+            solucionador = Solucionador(CSP(variables, dominios, restricciones), inferencia)
+            inicio = time.perf_counter()
+            solucion = solucionador.resolver()
+            totales[inferencia][0] += solucionador.estadisticas.nodos
+            totales[inferencia][1] += time.perf_counter() - inicio
+        resolubles += solucion is not None
+    print(f"  Resolubles: {resolubles}/{instancias}")
+    for inferencia, (nodos, tiempo) in totales.items():
+        print(f"  {inferencia.upper():3}: {nodos:8} nodos, {tiempo * 1000:8.1f} ms")
+
+
+def menor(a, b):
+    """Restricción de orden: a < b."""
+    return a < b
+
+
+def comparar_ac3(n=1000, d=40, grado_medio=4, semilla=0):
+    """
+    Benchmark de AC-3 en una red grande de restricciones de orden (Xi < Xj).
+    Cada variable recibe un nivel aleatorio y solo se restringen pares de
+    niveles crecientes, así la red es consistente pero la propagación
+    encadena muchas podas. Compara soportes precompilados con residuales.
+    """
+    rng = random.Random(semilla)
+    variables = [f'X{i}' for i in range(n)]
+    nivel = [rng.randrange(d // 2) for _ in range(n)]
+    dominios = {v: list(range(d)) for v in variables}
+    restricciones = {}
+    while len(restricciones) < n * grado_medio // 2:
+        i, j = rng.sample(range(n), 2)
+        if nivel[i] < nivel[j]:
+            restricciones[(variables[i], variables[j])] = menor
+
+    print(f"AC-3 en una red de {n} variables y {len(restricciones)} restricciones:")
+    for nombre, compilar in (("máscaras precompiladas", True), ("soportes residuales", False)):
+        csp = CSP(variables, dominios, restricciones, compilar=compilar)
+        estadisticas = Estadisticas()
+        inicio = time.perf_counter()
+        consistente = AC3(csp, estadisticas)
+        tiempo = time.perf_counter() - inicio
+        print(f"  {nombre:22}: {tiempo * 1000:7.1f} ms, consistente={consistente}, {estadisticas}")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: Problema de colorear Australia
+    variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('WA', 'NT'): lambda a, b: a != b,
+        ('WA', 'SA'): lambda a, b: a != b,
+        ('NT', 'SA'): lambda a, b: a != b,
+        ('NT', 'Q'): lambda a, b: a != b,
+        ('SA', 'Q'): lambda a, b: a != b,
+        ('SA', 'NSW'): lambda a, b: a != b,
+        ('SA', 'V'): lambda a, b: a != b,
+        ('Q', 'NSW'): lambda a, b: a != b,
+        ('NSW', 'V'): lambda a, b: a != b
+    }
+
+    # Crear y resolver CSP
+    problema = CSP(variables, dominios, restricciones)
+    consistente = AC3(problema)
+
+    print("¿Consistencia lograda?", consistente)
+    print("Dominios resultantes:")
+    for variable, dominio in problema.dominios.items():
+        print(f"{variable}: {dominio}")
+
+    # Revisiones y comprobaciones en una red grande
+    comparar_ac3()
+
+    # MAC frente a forward checking cerca de la transición de fase
+    comparar_mac_fc()
@@ -1,110 +1,104 @@
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
-
-        Args:
-            variables: Lista de variables (ej: ['A', 'B', 'C'])
-            dominios: Diccionario {variable: lista_de_valores}
-            restricciones: Diccionario {(var1, var2): función_restricción}
-        """
-        self.variables = variables
-        self.dominios = dominios.copy()
-        self.restricciones = restricciones
-
-    def es_consistente(self, var, valor, asignacion):
-        """Verifica si una asignación es consistente"""
-        for (v1, v2), restriccion in self.restricciones.items():
-            if v1 == var and v2 in asignacion:
-                if not restriccion(valor, asignacion[v2]):
-                    return False
-            elif v2 == var and v1 in asignacion:
-                if not restriccion(asignacion[v1], valor):
-                    return False
-        return True
-
-
-def conflict_directed_backjumping(csp):
+import random
+
+from nucleo_csp import CSP, Solucionador, SolucionadorCBJ, generar_modelo_b, resolver, soluciones, tension_critica
+
+
+def conflict_directed_backjumping(csp, asignacion=None, variables='mrv'):
     """
     Implementación del algoritmo CBJ para CSP.
 
+    Delegado en el núcleo común (SolucionadorCBJ):
+    1. Cada variable guarda la profundidad a la que se asignó (O(1))
+    2. Cada valor rechazado añade a su conjunto de conflicto el nivel de
+       la variable asignada con la que choca
+    3. Al agotar sus valores, la variable devuelve su conjunto de conflicto
+       y la búsqueda salta directamente al nivel más profundo de ese
+       conjunto, fusionándolo con el suyo; los niveles intermedios no
+       vuelven a probar valores
+
     Args:
         csp: Objeto CSP definido previamente
+        asignacion: Asignación parcial inicial (opcional)
+        variables: Orden de variables ('mrv', 'dom/wdeg' u 'orden')
 
     Returns:
         Una solución válida o None si no existe
     """
-    asignacion = {}
-    conflict_set = {v: set() for v in csp.variables}
-    return cbj_recursivo(csp, asignacion, 0, conflict_set)
+    return resolver(csp, inferencia='ninguna', asignacion=asignacion,
+                    variables=variables, retroceso='cbj')
+
+
+def fc_cbj(csp, asignacion=None, variables='mrv'):
+    """
+    FC-CBJ: forward checking con salto atrás. El conjunto de conflicto de
+    una variable incluye además los niveles cuyo forward checking podó su
+    dominio, y un dominio vaciado culpa a los niveles que lo habían podado.
+    """
+    return resolver(csp, inferencia='fc', asignacion=asignacion,
+                    variables=variables, retroceso='cbj')
+
+
+def cbj_soluciones(csp, asignacion=None, inferencia='ninguna', maximo=None, simetria=None):
+    """
+    Generador de todas las soluciones con CBJ (o FC-CBJ). Tras una
+    solución, el conjunto de conflicto incluye todos los niveles: los
+    saltos solo se dan en subárboles sin soluciones.
+
+    Yields:
+        Soluciones completas
+    """
+    yield from soluciones(csp, inferencia=inferencia, asignacion=asignacion, retroceso='cbj',
+                          simetria=simetria, maximo=maximo)
 
 
-def cbj_recursivo(csp, asignacion, nivel, conflict_set):
+def comparar_saltos(n=16, d=6, p1=0.25, instancias=10):
     """
-    Función recursiva principal para CBJ.
+    Nodos visitados con vuelta atrás cronológica y con CBJ (con y sin
+    forward checking) sobre instancias del modelo B en la transición de
+    fase, con orden estático de variables y con MRV.
     """
-    if len(asignacion) == len(csp.variables):
-        return asignacion.copy()
-
-    var = seleccionar_variable(csp, asignacion)
-
-    for valor in ordenar_valores(csp, var, asignacion):
-        if csp.es_consistente(var, valor, asignacion):
-            asignacion[var] = valor
-            resultado = cbj_recursivo(csp, asignacion, nivel + 1, conflict_set)
-            if resultado is not None:
-                return resultado
-            del asignacion[var]
-        else:
-            # Actualizar conjunto de conflictos
-            for v in asignacion:
-                if not csp.es_consistente(var, valor, {v: asignacion[v]}):
-                    conflict_set[var].add(v)
-
-    # Salto atrás dirigido por conflictos
-    if nivel > 0:
-        conflicto_union = set()
-        for v in conflict_set:
-            if v not in asignacion:
-                conflicto_union.update(conflict_set[v])
-
-        if conflicto_union:
-            max_nivel = max([csp.variables.index(v) for v in conflicto_union])
-            # Saltar atrás al nivel del conflicto más reciente
-            vars_a_eliminar = [v for v in asignacion if csp.variables.index(v) >= max_nivel]
-            for v in vars_a_eliminar:
-                del asignacion[v]
-            return None
-
-    return None
-
-
-def seleccionar_variable(csp, asignacion):
-    """Selecciona la próxima variable a asignar (MRV)"""
-    no_asignadas = [v for v in csp.variables if v not in asignacion]
-    return min(no_asignadas, key=lambda v: len(csp.dominios[v]))
-
-
-def ordenar_valores(csp, var, asignacion):
-    """Ordena valores usando heurística LCV"""
-    return csp.dominios[var]
-
-
-# Ejemplo de uso
-variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
-dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
-restricciones = {
-    ('WA', 'NT'): lambda a, b: a != b,
-    ('WA', 'SA'): lambda a, b: a != b,
-    ('NT', 'SA'): lambda a, b: a != b,
-    ('NT', 'Q'): lambda a, b: a != b,
-    ('SA', 'Q'): lambda a, b: a != b,
-    ('SA', 'NSW'): lambda a, b: a != b,
-    ('SA', 'V'): lambda a, b: a != b,
-    ('Q', 'NSW'): lambda a, b: a != b,
-    ('NSW', 'V'): lambda a, b: a != b
-}
-
-problema = CSP(variables, dominios, restricciones)
-solucion = conflict_directed_backjumping(problema)
-print("Solución encontrada:", solucion)
\ No newline at end of file
+    p2 = tension_critica(n, d, p1)
+    problemas = [CSP(*generar_modelo_b(n, d, p1, p2, random.Random(k))) for k in range(instancias)]
+    print(f"\nModelo B: n={n}, d={d}, p1={p1}, p2={p2:.3f} ({instancias} instancias)")
+    print(f"{'Inferencia':<11} {'Orden':<6} {'Cronológico':>12} {'CBJ':>10} {'Ahorro':>8} {'Saltos':>8}")
+    for inferencia in ('ninguna', 'fc'):
+        for variables in ('orden', 'mrv'):
+            nodos_bt = nodos_cbj = saltos = 0
+            for problema in problemas:
+                bt = Solucionador(problema, inferencia, variables)
+                bt.resolver()
+                cbj = SolucionadorCBJ(problema, inferencia, variables)
+                cbj.resolver()
+                nodos_bt += bt.estadisticas.nodos
+                nodos_cbj += cbj.estadisticas.nodos
+                saltos += cbj.estadisticas.saltos
+            ahorro = 1 - nodos_cbj / nodos_bt
+            print(f"{inferencia:<11} {variables:<6} {nodos_bt:>12} {nodos_cbj:>10} {ahorro:>8.0%} {saltos:>8}")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo de uso
+    variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('WA', 'NT'): lambda a, b: a != b,
+        ('WA', 'SA'): lambda a, b: a != b,
+        ('NT', 'SA'): lambda a, b: a != b,
+        ('NT', 'Q'): lambda a, b: a != b,
+        ('SA', 'Q'): lambda a, b: a != b,
+        ('SA', 'NSW'): lambda a, b: a != b,
+        ('SA', 'V'): lambda a, b: a != b,
+        ('Q', 'NSW'): lambda a, b: a != b,
+        ('NSW', 'V'): lambda a, b: a != b
+    }
+
+    problema = CSP(variables, dominios, restricciones)
+    solucion = conflict_directed_backjumping(problema)
+    print("Solución encontrada:", solucion)
+    print("Con FC-CBJ:", fc_cbj(problema))
+    print("Coloreos distintos salvo permutación:", list(cbj_soluciones(problema, simetria='valores')))
+
+    comparar_saltos()
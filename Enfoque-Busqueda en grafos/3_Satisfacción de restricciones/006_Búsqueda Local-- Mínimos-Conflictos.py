@@ -1,93 +1,108 @@
 import random
+import time
 
+from nucleo_csp import CSP, MinimosConflictos, generar_coloreo, reinas
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
 
-        Args:
-            variables: Lista de variables (ej: ['A', 'B', 'C'])
-            dominios: Diccionario {variable: lista_de_valores_posibles}
-            restricciones: Diccionario {(var1, var2): función_restricción}
-        """
-        self.variables = variables
-        self.dominios = dominios
-        self.restricciones = restricciones
-
-    def contar_conflictos(self, variable, valor, asignacion):
-        """Calcula cuántas restricciones viola un valor para una variable"""
-        conflictos = 0
-        for (v1, v2), restriccion in self.restricciones.items():
-            if v1 == variable and v2 in asignacion:
-                if not restriccion(valor, asignacion[v2]):
-                    conflictos += 1
-            elif v2 == variable and v1 in asignacion:
-                if not restriccion(asignacion[v1], valor):
-                    conflictos += 1
-        return conflictos
-
-
-def minimos_conflictos(csp, max_iter=1000):
+def minimos_conflictos(csp, max_iter=1000, tabu=10, paseo=0.02):
     """
     Implementación del algoritmo de mínimos conflictos.
+    La búsqueda la realiza el motor incremental del núcleo común
+    (MinimosConflictos):
+    - Contadores de conflictos por variable y valor que solo se actualizan
+      en los vecinos de la variable movida
+    - Variables conflictivas en un conjunto con muestra aleatoria O(1)
+    - Lista tabú y paseo aleatorio para salir de mesetas
 
     Args:
         csp: Objeto CSP definido previamente
         max_iter: Máximo de iteraciones permitidas
+        tabu: Iteraciones que un valor abandonado queda prohibido
+        paseo: Probabilidad de un movimiento aleatorio
 
     Returns:
         Asignación solución o None si no converge
     """
-    # 1. Inicialización aleatoria
-    asignacion = {var: random.choice(csp.dominios[var]) for var in csp.variables}
-
-    for _ in range(max_iter):
-        # 2. Verificar si es solución
-        conflictos_totales = sum(
-            csp.contar_conflictos(var, asignacion[var], asignacion)
-            for var in csp.variables
-        )
-        if conflictos_totales == 0:
-            return asignacion
-
-        # 3. Seleccionar variable conflictiva aleatoria
-        var_conflictiva = random.choice([
-            var for var in csp.variables
-            if csp.contar_conflictos(var, asignacion[var], asignacion) > 0
-        ])
-
-        # 4. Elegir valor que minimice conflictos
-        mejor_valor = min(
-            csp.dominios[var_conflictiva],
-            key=lambda v: csp.contar_conflictos(var_conflictiva, v, asignacion)
-        )
+    return MinimosConflictos(csp, random, tabu, paseo).resolver(max_iter)
 
-        # 5. Actualizar asignación
-        asignacion[var_conflictiva] = mejor_valor
-
-    return None  # No se encontró solución en max_iter
-
-
-# Ejemplo: Problema de las 8 reinas (adaptado)
-variables = ['R1', 'R2', 'R3', 'R4', 'R5', 'R6', 'R7', 'R8']
-dominios = {r: range(8) for r in variables}  # Columnas (0-7)
 
+def comparar_escala(tamanos=(1000, 10000, 50000)):
+    """
+    Tiempo e iteraciones de mínimos conflictos en coloreos plantados con
+    4 colores de tamaño creciente: cada paso cuesta O(grado), no O(n).
+    """
+    print("\nColoreo plantado (4 colores, grado medio 5):")
+    for n in tamanos:
+        problema = CSP(*generar_coloreo(n, colores=4, grado_medio=5, rng=random.Random(n)))
+        motor = MinimosConflictos(problema, random.Random(1))
+        inicio = time.perf_counter()
+        solucion = motor.resolver(max_iter=10 ** 6)
+        tiempo = time.perf_counter() - inicio
+        estado = 'resuelto' if solucion is not None else 'sin converger'
+        print(f"  n = {n:>6}: {motor.iteracion:>7} iteraciones, {tiempo:6.3f} s ({estado})")
+
+
+def reinas_binarias(n):
+    """
+    Modelo clásico de las n reinas con una restricción binaria por pareja
+    de filas (n²/2 funciones): columnas distintas y fuera de la diagonal.
 
-def restriccion_reinas(a, b):
-    """Verifica que dos reinas no se ataquen"""
-    return a != b  # Simplificado para ejemplo
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
+    """
+    variables = [f'R{i}' for i in range(1, n + 1)]
+    dominios = {r: range(n) for r in variables}  # Columnas (0 .. n-1)
 
+    def restriccion_reinas(distancia):
+        """
+        Dos reinas a 'distancia' filas no se atacan. Con & en lugar de
+        'and' la misma función acepta arrays y la tabla se compila de una vez.
+        """
+        return lambda a, b: (a != b) & (abs(a - b) != distancia)
 
-restricciones = {
-    (f'R{i}', f'R{j}'): restriccion_reinas
-    for i in range(1, 9) for j in range(i + 1, 9)
-}
+    restricciones = {
+        (f'R{i}', f'R{j}'): restriccion_reinas(j - i)
+        for i in range(1, n + 1) for j in range(i + 1, n + 1)
+    }
+    return variables, dominios, restricciones
 
-# Resolver
-problema = CSP(variables, dominios, restricciones)
-solucion = minimos_conflictos(problema, max_iter=10000)
 
-print("Solución encontrada:")
-for reina, columna in sorted(solucion.items()):
-    print(f"{reina}: Columna {columna}")
\ No newline at end of file
+def comparar_reinas(binarias=(20, 50), globales=(1000, 10000, 100000)):
+    """
+    n reinas con restricciones binarias frente al modelo con restricciones
+    globales (reinas: columnas y diagonales como TodosDistintos). El
+    modelo binario crece con n² en memoria y en construcción; el global
+    es O(n) y cada paso de mínimos conflictos cuesta O(1) por restricción.
+    Con n = 10^6 el modelo global se resuelve en menos de un minuto.
+    """
+    print("\nn reinas con mínimos conflictos:")
+    casos = [('binario', n, reinas_binarias) for n in binarias] + \
+            [('global', n, reinas) for n in globales]
+    for modelo, n, generador in casos:
+        inicio = time.perf_counter()
+        problema = CSP(*generador(n))
+        construccion = time.perf_counter() - inicio
+        motor = MinimosConflictos(problema, random.Random(1))
+        inicio = time.perf_counter()
+        solucion = motor.resolver(max_iter=10 ** 6)
+        tiempo = time.perf_counter() - inicio
+        estado = 'resuelto' if solucion is not None else 'sin converger'
+        print(f"  {modelo:<8} n = {n:>6}: CSP en {construccion:6.3f} s, "
+              f"{motor.iteracion:>5} iteraciones, {tiempo:6.3f} s ({estado})")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: Problema de las 8 reinas, con columnas y diagonales como
+    # restricciones globales (reina k en la fila k, valor = columna)
+    problema = CSP(*reinas(8))
+    solucion = minimos_conflictos(problema, max_iter=10000)
+
+    print("Solución encontrada:")
+    for fila, columna in sorted(solucion.items()):
+        print(f"R{fila + 1}: Columna {columna}  " + ' '.join('Q' if c == columna else '.' for c in range(8)))
+
+    comparar_escala()
+    comparar_reinas()
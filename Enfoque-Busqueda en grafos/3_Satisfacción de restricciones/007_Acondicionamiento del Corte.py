@@ -1,133 +1,256 @@
-from collections import defaultdict
 import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from nucleo_csp import (CSP, RestriccionExtensional, Solucionador, acondicionamiento_corte, distintos,
+                        encontrar_corte, preparar_corte, resolver_arbol)
 
-class CSP:
-    def __init__(self, variables, dominios, restricciones):
-        """
-        Inicializa un problema CSP.
 
-        Args:
-            variables: Lista de variables
-            dominios: Diccionario {variable: valores_posibles}
-            restricciones: Diccionario {(var1, var2): función}
-        """
-        self.variables = variables
-        self.dominios = dominios.copy()
-        self.restricciones = restricciones
-        self.grafo = self._construir_grafo()
+def cutset_conditioning(csp, contar=False):
+    """
+    Algoritmo principal de Acondicionamiento del Corte.
 
-    def _construir_grafo(self):
-        """Construye el grafo de restricciones"""
-        grafo = defaultdict(set)
-        for (v1, v2) in self.restricciones:
-            grafo[v1].add(v2)
-            grafo[v2].add(v1)
-        return grafo
+    Delegado en el núcleo común (acondicionamiento_corte):
+    1. Encontrar un conjunto de corte de ciclos pequeño (encontrar_corte)
+    2. Generar todas las posibles asignaciones para el corte
+    3. Para cada asignación del corte, resolver el bosque que queda con
+       consistencia de arco direccional en O(n·d²); su estructura
+       (ArbolCSP) se calcula una sola vez
 
+    Args:
+        csp: Instancia de CSP
+        contar: Si es True, devuelve el número total de soluciones
 
-def encontrar_corte(grafo):
+    Returns:
+        Diccionario {variable: valor}, None si no hay solución o, con
+        contar=True, el número de soluciones.
     """
-    Encuentra un conjunto de corte mínimo (aproximado).
-    Implementación simplificada usando eliminación de nodos de alto grado.
-    """
-    grafo = {k: set(v) for k, v in grafo.items()}
-    corte = set()
+    return acondicionamiento_corte(csp, contar)
 
-    while True:
-        if not grafo:
-            break
 
-        # Seleccionar nodo con mayor grado
-        nodo = max(grafo.keys(), key=lambda x: len(grafo[x]))
-        corte.add(nodo)
+#############################
+# ENUMERACIÓN PARALELA DEL CORTE
+#############################
+# Estado de cada proceso trabajador, fijado una sola vez al crearlo
+_ARBOL = None  # ArbolCSP del bosque residual
+_CORTE = None  # Variables del corte, en orden
+_PARADA = None  # Evento compartido: algún proceso ya encontró solución
 
-        # Eliminar nodo del grafo
-        for vecino in grafo[nodo]:
-            grafo[vecino].remove(nodo)
-        del grafo[nodo]
 
-    return corte
+def _iniciar_trabajador(arbol, corte, parada):
+    global _ARBOL, _CORTE, _PARADA
+    _ARBOL, _CORTE, _PARADA = arbol, corte, parada
 
 
-def cutset_conditioning(csp):
+def _resolver_rama(prefijo, contar):
     """
-    Algoritmo principal de Acondicionamiento del Corte.
+    Recorre las asignaciones del corte que empiezan por los valores de
+    prefijo. Se ejecuta dentro de un proceso trabajador.
+
+    Args:
+        prefijo: Tupla de valores de las primeras variables del corte
+        contar: Contar soluciones en vez de buscar la primera
+
+    Returns:
+        Número de soluciones de la rama (contar=True) o la primera
+        solución encontrada (None si no hay o si otro proceso ya acabó).
+    """
+    resto = [_ARBOL.csp.dominios[v] for v in _CORTE[len(prefijo):]]
+    total = 0
+    for valores in itertools.product(*resto):
+        asignacion = dict(zip(_CORTE, prefijo + valores))
+        if contar:
+            total += _ARBOL.contar(asignacion)
+            continue
+        if _PARADA.is_set():
+            return None
+        solucion = _ARBOL.resolver(asignacion)
+        if solucion is not None:
+            return solucion
+    return total if contar else None
+
+
+def cutset_conditioning_paralelo(csp, procesos=None, contar=False, ramas_por_proceso=4):
     """
-    # 1. Encontrar conjunto de corte
-    corte = encontrar_corte(csp.grafo)
-    variables_arbol = [v for v in csp.variables if v not in corte]
+    Acondicionamiento del corte repartiendo las asignaciones del corte
+    entre procesos. Cada rama fija los valores de las primeras variables
+    del corte (las justas para tener unas ramas_por_proceso ramas por
+    proceso, que equilibran la carga) y recorre el resto en el trabajador.
 
-    # 2. Generar todas las posibles asignaciones para el corte
-    asignaciones_corte = itertools.product(
-        *[csp.dominios[v] for v in corte]
-    )
+    - Búsqueda: en cuanto una rama devuelve solución se activa un evento
+      compartido, que detiene las ramas en curso, y se cancelan las que no
+      han empezado.
+    - Recuento: se suman los recuentos de todas las ramas.
 
-    # 3. Para cada asignación del corte, resolver el subproblema en árbol
-    for asignacion_corte in asignaciones_corte:
-        asignacion_actual = dict(zip(corte, asignacion_corte))
+    Cada trabajador recibe el ArbolCSP una sola vez al arrancar. Con el
+    método de arranque 'spawn' (Windows, macOS) se serializa con pickle,
+    así que las restricciones no pueden ser lambdas (ver
+    RestriccionExtensional) y el programa principal debe ir protegido con
+    if __name__ == "__main__".
 
-        # Verificar consistencia de la asignación del corte
-        if not all(
-                csp.restricciones.get((v1, v2), lambda x, y: True)(asignacion_actual.get(v1), asignacion_actual.get(v2))
-                for v1 in corte for v2 in corte if (v1, v2) in csp.restricciones
-        ):
-            continue
+    Args:
+        csp: Instancia de CSP
+        procesos: Número de procesos (None = todos los núcleos)
+        contar: Si es True, devuelve el número total de soluciones
+        ramas_por_proceso: Ramas mínimas por proceso
+
+    Returns:
+        Diccionario {variable: valor}, None si no hay solución o, con
+        contar=True, el número de soluciones.
+    """
+    corte, arbol = preparar_corte(csp)
+    procesos = procesos or os.cpu_count() or 1
 
-        # Resolver el subproblema en árbol (backtracking simple)
-        resultado = backtracking_arbol(csp, variables_arbol, asignacion_actual)
-        if resultado is not None:
-            return resultado
+    k, ramas = 0, 1
+    while k < len(corte) and ramas < ramas_por_proceso * procesos:
+        ramas *= len(csp.dominios[corte[k]])
+        k += 1
+    prefijos = itertools.product(*[csp.dominios[v] for v in corte[:k]])
 
+    parada = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                             initargs=(arbol, corte, parada)) as executor:
+        futuros = [executor.submit(_resolver_rama, prefijo, contar) for prefijo in prefijos]
+        if contar:
+            return sum(futuro.result() for futuro in futuros)
+        for futuro in as_completed(futuros):
+            solucion = futuro.result()
+            if solucion is not None:
+                parada.set()
+                for pendiente in futuros:
+                    pendiente.cancel()
+                return solucion
     return None
 
 
-def backtracking_arbol(csp, variables, asignacion):
+def arbol_aleatorio(n, d=5, p2=0.4, rng=random):
     """
-    Backtracking para componentes en forma de árbol.
+    CSP con grafo en árbol: cada variable se une a una anterior al azar
+    con una restricción que prohíbe una fracción p2 de los pares de valores.
+
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
     """
-    if len(asignacion) == len(csp.variables):
-        return asignacion
+    variables = [f'X{i}' for i in range(n)]
+    dominios = {v: list(range(d)) for v in variables}
+    pares = [(a, b) for a in range(d) for b in range(d)]
+    restricciones = {}
+    for i in range(1, n):
+        prohibidos = rng.sample(pares, round(p2 * len(pares)))
+        restricciones[(variables[rng.randrange(i)], variables[i])] = RestriccionExtensional(prohibidos)
+    return variables, dominios, restricciones
 
-    var = next(v for v in variables if v not in asignacion)
 
-    for valor in csp.dominios[var]:
-        nueva_asignacion = asignacion.copy()
-        nueva_asignacion[var] = valor
+def comparar_arbol(tamanos=(600, 5000, 50000)):
+    """
+    Tiempo de resolver_arbol en árboles aleatorios: crece linealmente con n.
+    Se compara con backtracking + FC + MRV, que con la pila explícita del
+    núcleo llega también a los árboles de miles de niveles. En orden
+    estático FC puede no terminar en estos mismos árboles: un fallo que
+    solo se detecta muy abajo obliga a recorrer combinaciones de la parte
+    ya asignada.
+    """
+    print("\nCSP en árbol (d=8, p2=0.6):")
+    for n in tamanos:
+        problema = CSP(*arbol_aleatorio(n, d=8, p2=0.6, rng=random.Random(0)))
+        inicio = time.perf_counter()
+        solucion = resolver_arbol(problema)
+        tiempo = time.perf_counter() - inicio
+        linea = f"  n = {n:>6}: árbol {tiempo * 1000:8.1f} ms ({'resuelto' if solucion else 'sin solución'})"
+        solucionador = Solucionador(problema, 'fc', 'mrv')
+        inicio = time.perf_counter()
+        solucionador.resolver()
+        linea += (f" | FC + MRV {(time.perf_counter() - inicio) * 1000:8.1f} ms,"
+                  f" {solucionador.estadisticas.nodos} nodos")
+        print(linea)
 
-        # Verificar consistencia solo con variables ya asignadas
-        consistente = True
-        for (v1, v2), restriccion in csp.restricciones.items():
-            if v1 in nueva_asignacion and v2 in nueva_asignacion:
-                if not restriccion(nueva_asignacion[v1], nueva_asignacion[v2]):
-                    consistente = False
-                    break
 
-        if consistente:
-            resultado = backtracking_arbol(csp, variables, nueva_asignacion)
-            if resultado is not None:
-                return resultado
+def coloreo_casi_arbol(n, extra, colores=3, rng=random):
+    """
+    Coloreo de un árbol aleatorio de n nodos al que se añaden `extra`
+    aristas: pocos ciclos, luego un corte pequeño.
 
-    return None
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
+    """
+    variables = [f'X{i}' for i in range(n)]
+    aristas = {(rng.randrange(i), i) for i in range(1, n)}
+    while len(aristas) < n - 1 + extra:
+        i, j = sorted(rng.sample(range(n), 2))
+        aristas.add((i, j))
+    dominios = {v: list(range(colores)) for v in variables}
+    restricciones = {(variables[i], variables[j]): distintos for i, j in aristas}
+    return variables, dominios, restricciones
+
+
+def comparar_corte(casos=((40, 6), (200, 12), (2000, 15))):
+    """
+    Tamaño del corte voraz y tras la mejora local, y acondicionamiento
+    completo: solo se enumeran las 3^|corte| asignaciones del corte.
+    """
+    print("\nCorte de ciclos en árboles con aristas extra (3 colores):")
+    for n, extra in casos:
+        problema = CSP(*coloreo_casi_arbol(n, extra, rng=random.Random(0)))
+        voraz = encontrar_corte(problema.grafo, mejorar=False)
+        inicio = time.perf_counter()
+        corte = encontrar_corte(problema.grafo)
+        solucion = cutset_conditioning(problema)
+        tiempo = time.perf_counter() - inicio
+        print(f"  n = {n:>5}, +{extra:>2} aristas: corte voraz {len(voraz):>2}, mejorado {len(corte):>2}"
+              f" -> {3 ** len(corte):>4} asignaciones del corte,"
+              f" {'resuelto' if solucion else 'sin solución'} en {tiempo * 1000:7.1f} ms")
+
+
+def comparar_paralelo(n=300, extra=22, procesos=None):
+    """
+    Recuento de coloreos y búsqueda de la primera solución, en serie y
+    repartiendo las ramas del corte entre procesos.
+    """
+    problema = CSP(*coloreo_casi_arbol(n, extra, rng=random.Random(1)))
+    corte, _ = preparar_corte(problema)
+    print(f"\nCorte paralelo (n = {n}, +{extra} aristas, corte de {len(corte)},"
+          f" {os.cpu_count()} núcleos):")
+    for contar in (True, False):
+        for nombre, funcion in (("serie   ", cutset_conditioning),
+                                ("paralelo", lambda csp, contar: cutset_conditioning_paralelo(csp, procesos, contar))):
+            inicio = time.perf_counter()
+            resultado = funcion(problema, contar=contar)
+            tiempo = time.perf_counter() - inicio
+            descripcion = f"{resultado:.6e} coloreos" if contar else ('resuelto' if resultado else 'sin solución')
+            print(f"  {'recuento' if contar else 'búsqueda'} {nombre}: {tiempo * 1000:8.1f} ms, {descripcion}")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: Problema de colorear un grafo en forma de "reloj"
+    variables = ['A', 'B', 'C', 'D', 'E', 'F']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('A', 'B'): lambda a, b: a != b,
+        ('B', 'C'): lambda a, b: a != b,
+        ('C', 'D'): lambda a, b: a != b,
+        ('D', 'E'): lambda a, b: a != b,
+        ('E', 'F'): lambda a, b: a != b,
+        ('F', 'A'): lambda a, b: a != b,
+        ('A', 'D'): lambda a, b: a != b  # Este arco crea un ciclo
+    }
+
+    # Resolver
+    problema = CSP(variables, dominios, restricciones)
+    print(f"Corte: {sorted(encontrar_corte(problema.grafo))}")
+    solucion = cutset_conditioning(problema)
+
+    print("Solución encontrada:")
+    for variable, valor in solucion.items():
+        print(f"{variable}: {valor}")
 
+    print(f"Número de coloreos: {cutset_conditioning(problema, contar=True)}")
 
-# Ejemplo: Problema de colorear un grafo en forma de "reloj"
-variables = ['A', 'B', 'C', 'D', 'E', 'F']
-dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
-restricciones = {
-    ('A', 'B'): lambda a, b: a != b,
-    ('B', 'C'): lambda a, b: a != b,
-    ('C', 'D'): lambda a, b: a != b,
-    ('D', 'E'): lambda a, b: a != b,
-    ('E', 'F'): lambda a, b: a != b,
-    ('F', 'A'): lambda a, b: a != b,
-    ('A', 'D'): lambda a, b: a != b  # Este arco crea un ciclo
-}
-
-# Resolver
-problema = CSP(variables, dominios, restricciones)
-solucion = cutset_conditioning(problema)
-
-print("Solución encontrada:")
-for variable, valor in solucion.items():
-    print(f"{variable}: {valor}")
\ No newline at end of file
+    comparar_corte()
+    comparar_paralelo()
+    comparar_arbol()
@@ -0,0 +1,132 @@
+import random
+import time
+
+from nucleo_csp import CSP, contar_soluciones, descomposicion_arbol, distintos, optimizar
+
+
+def eliminacion_cubos(csp, orden=None):
+    """
+    Cuenta las soluciones de un CSP por eliminación de cubos.
+
+    Delegado en el núcleo común:
+    1. Orden de eliminación min-fill sobre el grafo de restricciones
+    2. Cada restricción es una tabla 0/1 de NumPy que va al cubo de su
+       variable que antes se elimina
+    3. Al eliminar v se multiplican las tablas de su cubo y se suma sobre
+       v; la tabla resultante depende solo de vecinos posteriores de v y
+       pasa al cubo del siguiente de ellos
+
+    El coste es exponencial solo en la anchura de la descomposición en
+    árbol inducida por el orden, no en el número de variables.
+
+    Args:
+        csp: Objeto CSP definido previamente
+        orden: Lista de variables en orden de eliminación (opcional)
+
+    Returns:
+        Número de soluciones
+    """
+    return contar_soluciones(csp, orden)
+
+
+def coloreo_rejilla(filas, columnas, colores=3):
+    """
+    Coloreo de una rejilla filas x columnas: su anchura de árbol es
+    min(filas, columnas), aunque tenga muchos ciclos.
+
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
+    """
+    variables = [f'C{i}_{j}' for i in range(filas) for j in range(columnas)]
+    restricciones = {}
+    for i in range(filas):
+        for j in range(columnas):
+            if i + 1 < filas:
+                restricciones[(f'C{i}_{j}', f'C{i + 1}_{j}')] = distintos
+            if j + 1 < columnas:
+                restricciones[(f'C{i}_{j}', f'C{i}_{j + 1}')] = distintos
+    dominios = {v: range(colores) for v in variables}
+    return variables, dominios, restricciones
+
+
+def comparar_ordenes(filas=5, columnas=30):
+    """
+    Anchura y tiempo del recuento con el orden min-fill, el orden por
+    columnas de la rejilla y un orden aleatorio: el mismo problema puede
+    ser trivial o intratable según el orden de eliminación.
+    """
+    variables, dominios, restricciones = coloreo_rejilla(filas, columnas)
+    problema = CSP(variables, dominios, restricciones)
+    por_columnas = [f'C{i}_{j}' for j in range(columnas) for i in range(filas)]
+    ordenes = {
+        'min-fill': None,
+        'por columnas': por_columnas,
+        'aleatorio': random.Random(0).sample(variables, len(variables)),
+    }
+    print(f"\nColoreos de una rejilla {filas}x{columnas} con 3 colores:")
+    for nombre, orden in ordenes.items():
+        _, _, anchura = descomposicion_arbol(problema, orden)
+        inicio = time.perf_counter()
+        try:
+            resultado = f"{eliminacion_cubos(problema, orden):.6e} coloreos"
+        except ValueError:
+            resultado = "tablas demasiado grandes"
+        tiempo = time.perf_counter() - inicio
+        print(f"  {nombre:<13} anchura {anchura:>3}: {resultado} en {tiempo * 1000:8.1f} ms")
+
+
+def comparar_rejillas(tamanos=((4, 30), (6, 40), (8, 50))):
+    """
+    Recuento y coloreo de coste mínimo (cada color cuesta su número) de
+    rejillas cada vez mayores: el tiempo crece con la anchura.
+    """
+    print("\nRejillas (3 colores, orden min-fill):")
+    for filas, columnas in tamanos:
+        problema = CSP(*coloreo_rejilla(filas, columnas))
+        _, _, anchura = descomposicion_arbol(problema)
+        inicio = time.perf_counter()
+        total = eliminacion_cubos(problema)
+        t_recuento = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        coste, _ = optimizar(problema, {(v,): int for v in problema.variables})
+        t_optimo = time.perf_counter() - inicio
+        print(f"  {filas}x{columnas} (anchura {anchura:>2}): {total:.4e} coloreos en {t_recuento * 1000:7.1f} ms,"
+              f" coste mínimo {coste:.0f} en {t_optimo * 1000:7.1f} ms")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: mapa de Australia
+    variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('WA', 'NT'): lambda a, b: a != b,
+        ('WA', 'SA'): lambda a, b: a != b,
+        ('NT', 'SA'): lambda a, b: a != b,
+        ('NT', 'Q'): lambda a, b: a != b,
+        ('SA', 'Q'): lambda a, b: a != b,
+        ('SA', 'NSW'): lambda a, b: a != b,
+        ('SA', 'V'): lambda a, b: a != b,
+        ('Q', 'NSW'): lambda a, b: a != b,
+        ('NSW', 'V'): lambda a, b: a != b
+    }
+    problema = CSP(variables, dominios, restricciones)
+
+    bolsas, padre, anchura = descomposicion_arbol(problema)
+    print(f"Descomposición en árbol (anchura {anchura}):")
+    for k, bolsa in enumerate(bolsas):
+        print(f"  {k}: {bolsa} -> padre {padre[k]}")
+    print(f"Número de coloreos: {eliminacion_cubos(problema)}")
+
+    # CSP ponderado: la pintura azul cuesta el doble y a WA y Q les
+    # conviene compartir color (penalización si no lo hacen)
+    precio = {'Rojo': 1, 'Verde': 1, 'Azul': 2}
+    costes = {(v,): precio.get for v in variables}
+    costes[('WA', 'Q')] = lambda a, b: 0 if a == b else 3
+    coste, solucion = optimizar(problema, costes)
+    print(f"Coloreo de coste mínimo ({coste:.0f}): {solucion}")
+
+    comparar_ordenes()
+    comparar_rejillas()
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+
+from nucleo_csp import (CSP, ESTRATEGIAS, RegistroPortafolio, generar_coloreo, generar_modelo_b, portafolio,
+                        reinas, tension_critica)
+
+
+def carrera(csp, familia, registro, semillas=(0, 1), plazo=20.0):
+    """
+    Lanza el portafolio sobre una instancia y muestra la estrategia
+    ganadora. Si el registro ya conoce la familia, se lanzan primero
+    (solo) sus estrategias ganadoras; si ninguna termina, todas las demás.
+
+    Args:
+        csp: Instancia de CSP
+        familia: Nombre de la familia de instancias
+        registro: RegistroPortafolio donde se anota el resultado
+        semillas: Semillas de las estrategias aleatorias
+        plazo: Segundos máximos de cada carrera
+
+    Returns:
+        Diccionario devuelto por portafolio.
+    """
+    preferidas = registro.preferidas(familia)
+    resultado = None
+    if preferidas:
+        resultado = portafolio(csp, preferidas, semillas, plazo / 2)
+    if resultado is None or resultado['estrategia'] is None:
+        resultado = portafolio(csp, None, semillas, plazo)
+    registro.anotar(familia, resultado)
+
+    ganadora = resultado['estrategia'] or '-'
+    if resultado['semilla'] is not None:
+        ganadora += f" (semilla {resultado['semilla']})"
+    print(f"  {familia:<18} {resultado['estado']:<14} {resultado['tiempo'] * 1000:8.1f} ms"
+          f"  ganadora: {ganadora}{'  [preferidas: ' + ', '.join(preferidas) + ']' if preferidas else ''}")
+    for nombre, mensaje in resultado['errores'].items():
+        print(f"      {nombre} no admite el problema: {mensaje}")
+    return resultado
+
+
+def familias(rng):
+    """
+    Una instancia nueva de cada familia:
+    - reinas: restricciones globales, fácil para búsqueda local
+    - coloreo plantado: siempre resoluble, grado medio alto
+    - modelo B crítico: en la transición de fase, resoluble o no
+    """
+    n, d, p1 = 35, 6, 0.3
+    return {
+        'reinas': CSP(*reinas(rng.choice((150, 200, 250)))),
+        'coloreo plantado': CSP(*generar_coloreo(300, colores=4, grado_medio=8, rng=rng)),
+        'modelo B crítico': CSP(*generar_modelo_b(n, d, p1, tension_critica(n, d, p1), rng)),
+    }
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Registro junto al programa o en el directorio indicado como primer argumento
+    directorio = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    ruta_registro = os.path.join(directorio, 'portafolio_csp.json')
+    registro = RegistroPortafolio.cargar(ruta_registro)
+    rng = random.Random(0)
+    print(f"Estrategias: {', '.join(ESTRATEGIAS)}")
+    for ronda in range(3):
+        print(f"\nRonda {ronda + 1}:")
+        for familia, problema in familias(rng).items():
+            carrera(problema, familia, registro)
+
+    print("\nEstrategias preferidas por familia:")
+    for familia in ('reinas', 'coloreo plantado', 'modelo B crítico'):
+        print(f"  {familia:<18} {', '.join(registro.preferidas(familia))}")
+    registro.guardar(ruta_registro)  # Persistir para próximas ejecuciones
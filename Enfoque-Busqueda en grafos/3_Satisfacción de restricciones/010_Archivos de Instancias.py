@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import time
+
+from nucleo_csp import (CSP, cargar_instancia, cargar_solucion, escribir_modelo_b, generar_coloreo,
+                        guardar_instancia, guardar_solucion, minimos_conflictos, resolver)
+
+
+def medir(funcion, *args):
+    """Ejecuta funcion(*args) y devuelve (resultado, milisegundos)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def comparar_formatos(directorio, n=100000, colores=4, grado_medio=4):
+    """
+    Escritura y lectura de un coloreo de n nodos en los tres formatos, y
+    resolución con mínimos conflictos de la copia leída de disco.
+    """
+    problema = CSP(*generar_coloreo(n, colores, grado_medio, rng=random.Random(0)))
+    print(f"\nColoreo plantado de {n} nodos y {len(problema.restricciones)} aristas:")
+    leido = None
+    for extension in ('.npz', '.jsonl', '.jsonl.gz'):
+        ruta = os.path.join(directorio, 'coloreo' + extension)
+        _, t_escritura = medir(guardar_instancia, problema, ruta)
+        leido, t_lectura = medir(cargar_instancia, ruta)
+        print(f"  {extension:<10} {os.path.getsize(ruta) / 1e6:6.2f} MB, escritura {t_escritura:7.1f} ms,"
+              f" lectura {t_lectura:7.1f} ms")
+
+    solucion, tiempo = medir(minimos_conflictos, leido, 20 * n, random.Random(0))
+    if solucion is not None:
+        ruta = os.path.join(directorio, 'coloreo.sol.json.gz')
+        guardar_solucion(solucion, ruta)
+        correcta = problema.asignacion_consistente(cargar_solucion(ruta))
+        print(f"  Mínimos conflictos: {tiempo:7.1f} ms, solución guardada"
+              f" ({os.path.getsize(ruta) / 1e3:.0f} kB, {'correcta' if correcta else 'incorrecta'})")
+    else:
+        print(f"  Mínimos conflictos: sin converger en {tiempo:7.1f} ms")
+
+
+def comparar_modelo_b(directorio, n=100000, d=10, grado_medio=3, p2=0.3):
+    """
+    Instancia del modelo B de n variables escrita directamente en disco
+    (p1 elegido para el grado medio pedido) y leída de nuevo.
+    """
+    p1 = grado_medio / (n - 1)
+    ruta = os.path.join(directorio, 'modelo_b.npz')
+    _, t_escritura = medir(escribir_modelo_b, ruta, n, d, p1, p2, 0)
+    problema, t_lectura = medir(cargar_instancia, ruta)
+    print(f"\nModelo B <{n}, {d}, {p1:.1e}, {p2}>: {len(problema.restricciones)} restricciones,"
+          f" {os.path.getsize(ruta) / 1e6:.2f} MB, escritura {t_escritura:7.1f} ms, lectura {t_lectura:7.1f} ms")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    # Ejemplo: mapa de Australia, de ida y vuelta por el formato de texto
+    variables = ['WA', 'NT', 'SA', 'Q', 'NSW', 'V', 'T']
+    dominios = {v: ['Rojo', 'Verde', 'Azul'] for v in variables}
+    restricciones = {
+        ('WA', 'NT'): lambda a, b: a != b,
+        ('WA', 'SA'): lambda a, b: a != b,
+        ('NT', 'SA'): lambda a, b: a != b,
+        ('NT', 'Q'): lambda a, b: a != b,
+        ('SA', 'Q'): lambda a, b: a != b,
+        ('SA', 'NSW'): lambda a, b: a != b,
+        ('SA', 'V'): lambda a, b: a != b,
+        ('Q', 'NSW'): lambda a, b: a != b,
+        ('NSW', 'V'): lambda a, b: a != b
+    }
+    problema = CSP(variables, dominios, restricciones)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'australia.jsonl')
+        guardar_instancia(problema, ruta)
+        print("Archivo de instancia:")
+        with open(ruta, encoding='utf-8') as f:
+            print(f.read(), end='')
+        solucion = resolver(cargar_instancia(ruta))
+        print(f"Solución del problema leído: {solucion}")
+
+        comparar_formatos(directorio)
+        comparar_modelo_b(directorio)
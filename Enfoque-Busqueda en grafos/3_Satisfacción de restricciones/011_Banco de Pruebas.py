@@ -0,0 +1,66 @@
+import os
+import sys
+
+from nucleo_csp import (CSP, SOLUCIONADORES, banco_de_pruebas, generar_coloreo, generar_modelo_b,
+                        guardar_resultados, reinas, tension_critica)
+
+
+def coloreo(n, rng):
+    """Coloreo plantado de n nodos con 4 colores y grado medio 5."""
+    return CSP(*generar_coloreo(n, 4, 5, rng))
+
+
+def n_reinas(n, rng):
+    """n reinas con restricciones globales (no depende de rng)."""
+    return CSP(*reinas(n))
+
+
+def modelo_b(n, rng, d=6, p1=0.5):
+    """Modelo B <n, 6, 0.5, p2> en la transición de fase."""
+    return CSP(*generar_modelo_b(n, d, p1, tension_critica(n, d, p1), rng))
+
+
+FAMILIAS = {
+    'coloreo': (coloreo, (25, 50, 100, 200)),
+    'reinas': (n_reinas, (8, 16, 32, 64)),
+    'modelo B': (modelo_b, (10, 15, 20, 25)),
+}
+
+
+def resumen(filas):
+    """Estrategia más rápida de cada familia y tamaño (entre las que resuelven o demuestran que no hay solución)."""
+    print("\nMás rápida por familia y tamaño:")
+    mejores = {}
+    for fila in filas:
+        if fila['estado'] in ('resuelto', 'sin solución'):
+            clave = (fila['familia'], fila['tamano'])
+            if clave not in mejores or fila['tiempo'] < mejores[clave]['tiempo']:
+                mejores[clave] = fila
+    for (familia, tamano), fila in mejores.items():
+        print(f"  {familia:<9} {tamano:>4}: {fila['solucionador']:<19} {fila['tiempo'] * 1000:8.1f} ms")
+
+
+#############################
+# EJECUCIÓN
+#############################
+if __name__ == "__main__":
+    print(f"Solucionadores: {', '.join(SOLUCIONADORES)}\n")
+    print(f"{'familia':<9} {'n':>4} {'solucionador':<19} {'estado':<15} {'ms':>9} {'nodos':>9}"
+          f" {'retrocesos':>10} {'comprob.':>10} {'vaciados':>9} {'memoria kB':>10}")
+    filas = []
+    for fila in banco_de_pruebas(FAMILIAS, limite=5.0):
+        filas.append(fila)
+        if fila['estado'] in ('omitido', 'tiempo agotado', 'no aplicable', 'error'):
+            detalle = f" ({fila['mensaje']})" if fila['estado'] == 'error' else ''
+            print(f"{fila['familia']:<9} {fila['tamano']:>4} {fila['solucionador']:<19} {fila['estado']}{detalle}")
+            continue
+        memoria = f"{fila['memoria'] / 1024:10.0f}" if fila['memoria'] is not None else f"{'-':>10}"
+        print(f"{fila['familia']:<9} {fila['tamano']:>4} {fila['solucionador']:<19} {fila['estado']:<15}"
+              f" {fila['tiempo'] * 1000:9.1f} {fila['nodos']:>9} {fila['retrocesos']:>10}"
+              f" {fila['comprobaciones']:>10} {fila['vaciados']:>9} {memoria}")
+
+    # Resultados junto al programa o en el directorio indicado como primer argumento
+    directorio = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    guardar_resultados(filas, os.path.join(directorio, 'banco_csp.json'))
+    guardar_resultados(filas, os.path.join(directorio, 'banco_csp.csv'))
+    resumen(filas)
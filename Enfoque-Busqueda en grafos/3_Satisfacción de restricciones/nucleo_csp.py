@@ -0,0 +1,3411 @@
+"""
+NÚCLEO COMÚN DE RESOLUCIÓN DE CSP
+
+Todos los programas de esta carpeta construyen sus problemas con la clase
+CSP de este módulo y delegan la búsqueda en el mismo motor:
+- Variables y valores codificados como enteros (índices)
+- Restricciones binarias compiladas en matrices booleanas de NumPy y en
+  máscaras de soporte, con la función original como respaldo
+- Dominios representados como máscaras de bits (un bit por valor)
+- Pila de deshacer (rastro) que guarda solo los bits eliminados
+- Estrategias de inferencia intercambiables: ninguna, forward checking y MAC
+- Orden de variables MRV o dom/wdeg, con reinicios y nogoods opcionales
+- Vuelta atrás cronológica o salto atrás dirigido por conflictos (CBJ),
+  iterativas con pila explícita (sin límite de profundidad de recursión)
+- Enumeración perezosa de todas las soluciones, recuento y ruptura de la
+  simetría de valores intercambiables
+- Restricciones globales (TodosDistintos, Suma) junto a las binarias
+- Búsqueda local incremental (mínimos conflictos)
+- Resolución directa de árboles y eliminación de cubos sobre una
+  descomposición en árbol (recuento de soluciones y CSP ponderados)
+- Archivos de instancias (líneas JSON o NPZ con tablas extensionales) y
+  de soluciones, con lectura en flujo para problemas de 10^5 variables
+- Portafolio: varias estrategias compiten en procesos separados con un
+  plazo común, y un registro aprende cuál gana en cada familia
+- Banco de pruebas: nodos, retrocesos, comprobaciones, vaciados, tiempo y
+  pico de memoria de cada estrategia, exportables a JSON o CSV
+
+Uso:
+    from nucleo_csp import CSP, resolver
+    solucion = resolver(CSP(variables, dominios, restricciones), inferencia='fc')
+"""
+import csv
+import gzip
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import operator
+import os
+import queue
+import random
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+LIMITE_COMPILACION = 1 << 16  # Máximo de pares (a, b) evaluados uno a uno al compilar una restricción
+LIMITE_VECTORIZADO = 1 << 22  # Máximo de pares si la función se evalúa sobre arrays de NumPy
+MINIMO_VECTORIZADO = 1 << 10  # Por debajo se evalúa par a par: tabla exacta y barata
+MAXIMO_ENTERO_VECTORIZADO = 1 << 31  # Enteros mayores podrían desbordar int64 al operar con arrays
+SONDEO_PROCESOS = 0.1  # Segundos entre comprobaciones de que los procesos hijos siguen vivos
+
+
+#############################
+# MODELO DEL PROBLEMA
+#############################
+class Arco:
+    """
+    Restricción binaria vista desde una de sus variables (origen -> destino).
+
+    Atributos:
+        origen, destino: Índices de las variables
+        restriccion: Función original f(a, b) sobre valores
+        directa: True si origen es el primer argumento de la función
+        inverso: Arco destino -> origen de la misma restricción
+        matriz: Matriz booleana de NumPy M[a, b] (valor a de origen, b de
+                destino) o None si la restricción no se precompiló
+        soportes: Lista {valor a de origen: máscara de valores de destino compatibles}
+                  o None si la restricción no se precompiló (se usa la función)
+        residuos: Último soporte encontrado para cada valor de origen (AC-3rm)
+    """
+    __slots__ = ('origen', 'destino', 'restriccion', 'directa', 'inverso', 'matriz', 'soportes', 'residuos')
+
+    def __init__(self, origen, destino, restriccion, directa):
+        self.origen = origen
+        self.destino = destino
+        self.restriccion = restriccion
+        self.directa = directa
+        self.inverso = None
+        self.matriz = None
+        self.soportes = None
+        self.residuos = None
+
+
+def _como_array(valores):
+    """
+    Array numérico de NumPy de una lista de valores, o None si los valores
+    no son todos números que NumPy representa sin cambiarlos. Un dominio
+    mixto como [0, '0'] se convertiría en texto y 0 == '0' pasaría a ser
+    cierto; los enteros grandes perderían precisión al pasar a float. Los
+    enteros de más de 31 bits se rechazan: a * b podría desbordar int64 sin
+    avisar, mientras que en Python no hay desbordamiento.
+    """
+    if not valores:
+        return None
+    try:
+        array = np.asarray(valores)
+    except (TypeError, ValueError):
+        return None  # Valores de forma irregular, como números y tuplas mezclados
+    if array.ndim != 1 or array.dtype.kind not in 'biuf' or array.tolist() != list(valores):
+        return None
+    if array.dtype.kind in 'iu' and max(abs(int(array.min())), abs(int(array.max()))) >= MAXIMO_ENTERO_VECTORIZADO:
+        return None
+    return array
+
+
+def compilar_tabla(restriccion, vals_i, vals_j):
+    """
+    Matriz booleana M[a, b] = restriccion(vals_i[a], vals_j[b]).
+
+    1. Si la restricción sabe construir su tabla (método tabla), se usa
+    2. Si la tabla tiene al menos MINIMO_VECTORIZADO pares y los dos
+       dominios son numéricos (enteros sin riesgo de desbordamiento), se
+       evalúa una sola vez sobre arrays de NumPy que se combinan por
+       difusión (lambda a, b: a != b funciona tal cual); el resultado se
+       contrasta con llamadas normales en algunos pares
+    3. Si no (tabla pequeña, texto, tuplas, objetos, la función no admite
+       arrays o el contraste falla o lanza una excepción), se evalúa par a
+       par: en las tablas pequeñas equivale a contrastarlas enteras
+
+    Returns:
+        Matriz booleana o None si la tabla supera los límites de compilación
+        o la función lanza una excepción en algún par (entonces no se
+        precompila y la búsqueda la llama solo en los pares que visita,
+        como con compilar=False).
+    """
+    n_i, n_j = len(vals_i), len(vals_j)
+    pares = n_i * n_j
+    if hasattr(restriccion, 'tabla'):
+        return restriccion.tabla(vals_i, vals_j)
+    if MINIMO_VECTORIZADO <= pares <= LIMITE_VECTORIZADO:
+        array_i, array_j = _como_array(vals_i), _como_array(vals_j)
+        matriz = None
+        if array_i is not None and array_j is not None:
+            try:
+                with np.errstate(all='ignore'):
+                    matriz = np.asarray(restriccion(array_i[:, None], array_j[None, :]))
+            except (TypeError, ValueError, ArithmeticError, LookupError, AttributeError):
+                pass  # La función no admite arrays: se evalúa par a par
+        if matriz is not None and matriz.shape == (n_i, n_j) and matriz.dtype.kind in 'biuf':
+            matriz = matriz.astype(bool)
+            # Muestra de pares (esquinas y un barrido) contra la función escalar
+            muestra = {(0, 0), (n_i - 1, n_j - 1), (0, n_j - 1), (n_i - 1, 0)}
+            muestra.update(((7 * k) % n_i, (13 * k + 1) % n_j) for k in range(16))
+            try:
+                if all(bool(restriccion(vals_i[a], vals_j[b])) == matriz[a, b] for a, b in muestra):
+                    return matriz
+            except Exception:
+                pass  # Por ejemplo ZeroDivisionError donde NumPy dio inf o nan: par a par
+    if pares > LIMITE_COMPILACION:
+        return None
+    try:
+        filas = [[bool(restriccion(x, y)) for y in vals_j] for x in vals_i]
+    except Exception:
+        return None
+    return np.array(filas, dtype=bool).reshape(n_i, n_j)
+
+
+def mascaras_filas(matriz):
+    """Máscara de bits de cada fila de una matriz booleana (bit b = columna b)."""
+    if matriz.shape[1] < 63:
+        return (matriz @ (1 << np.arange(matriz.shape[1], dtype=np.int64))).tolist()
+    filas = np.packbits(matriz, axis=1, bitorder='little')
+    return [int.from_bytes(fila.tobytes(), 'little') for fila in filas]
+
+
+class CSP:
+    def __init__(self, variables, dominios, restricciones, globales=(), compilar=True):
+        """
+        Inicializa un problema CSP.
+
+        Args:
+            variables: Lista de variables (ej: ['A', 'B', 'C'])
+            dominios: Diccionario {variable: lista_de_valores}
+            restricciones: Diccionario {(var1, var2): función_restricción}
+            globales: Restricciones n-arias (TodosDistintos, Suma...) que se
+                      propagan sin descomponerlas en restricciones binarias
+            compilar: Precalcular las máscaras de soporte de cada restricción
+        """
+        self.variables = list(variables)
+        # Copia los dominios; las variables que comparten el mismo objeto de
+        # dominio comparten también la copia (n reinas: una sola lista de n valores)
+        copias = {}
+        self.dominios = {}
+        for v in self.variables:
+            dominio = dominios[v]
+            clave = dominio if isinstance(dominio, range) else id(dominio)
+            if clave not in copias:
+                copias[clave] = list(dominio)
+            self.dominios[v] = copias[clave]
+        self.restricciones = restricciones
+        self.vecinos = self._construir_vecinos()  # Índice de restricciones por variable
+        self.grafo = {v: {otra for otra, _, _ in self.vecinos[v]} for v in self.variables}
+
+        # Codificación entera: variable -> índice, valor -> posición en su dominio
+        self.indice = {v: i for i, v in enumerate(self.variables)}
+        self.valores = [self.dominios[v] for v in self.variables]
+        posiciones = {}
+        for vals in self.valores:
+            if id(vals) not in posiciones:
+                posiciones[id(vals)] = {valor: a for a, valor in enumerate(vals)}
+        self.id_valor = [posiciones[id(vals)] for vals in self.valores]
+        self.arcos = self._construir_arcos()
+        if compilar:
+            self._compilar_soportes()
+
+        # Restricciones globales: {índice de variable: [(restricción, posición en su ámbito)]}
+        self.globales = list(globales)
+        self.globales_de = [[] for _ in self.variables]
+        for g in self.globales:
+            g.preparar(self)
+            for k, i in enumerate(g.indices):
+                self.globales_de[i].append((g, k))
+
+    def _construir_vecinos(self):
+        """
+        Indexa las restricciones por variable: {var: [(otra, restriccion, directa)]}.
+        'directa' indica si var es el primer argumento de la restricción.
+        """
+        vecinos = {v: [] for v in self.variables}
+        for (v1, v2), restriccion in self.restricciones.items():
+            vecinos[v1].append((v2, restriccion, True))
+            vecinos[v2].append((v1, restriccion, False))
+        return vecinos
+
+    def _construir_arcos(self):
+        """Lista de arcos salientes de cada variable (por índice)."""
+        arcos = [[] for _ in self.variables]
+        for (v1, v2), restriccion in self.restricciones.items():
+            i, j = self.indice[v1], self.indice[v2]
+            directo = Arco(i, j, restriccion, True)
+            inverso = Arco(j, i, restriccion, False)
+            directo.inverso, inverso.inverso = inverso, directo
+            arcos[i].append(directo)
+            arcos[j].append(inverso)
+        return arcos
+
+    def _compilar_soportes(self):
+        """
+        Compila cada restricción binaria en una matriz booleana de NumPy
+        indexada por posiciones de valor (compilar_tabla) y, a partir de
+        ella, en las máscaras de soporte de cada arco y de su inverso. Así
+        forward checking y revisar se reducen a operaciones AND entre
+        enteros y cada comprobación de un par a una consulta.
+        Las restricciones con la misma función sobre dominios iguales
+        comparten tablas (coloreo: una sola para todo el grafo). Las que no
+        se pueden compilar conservan la función.
+        """
+        # Clase de cada lista de valores según su contenido
+        clases, clase = {}, {}
+        for vals in self.valores:
+            if id(vals) not in clase:
+                clase[id(vals)] = clases.setdefault(tuple(vals), len(clases))
+        compiladas = {}
+        for arcos in self.arcos:
+            for arco in arcos:
+                if not arco.directa or arco.soportes is not None:
+                    continue
+                vals_i = self.valores[arco.origen]
+                vals_j = self.valores[arco.destino]
+                clave = (arco.restriccion, clase[id(vals_i)], clase[id(vals_j)])
+                try:
+                    compilada = compiladas.get(clave)
+                except TypeError:  # Función no hashable: no se comparte
+                    clave, compilada = None, None
+                if compilada is None:
+                    matriz = compilar_tabla(arco.restriccion, vals_i, vals_j)
+                    if matriz is None:
+                        continue  # Demasiado grande: se mantiene la función
+                    compilada = (matriz, mascaras_filas(matriz), matriz.T, mascaras_filas(matriz.T))
+                    if clave is not None:
+                        compiladas[clave] = compilada
+                arco.matriz, arco.soportes, arco.inverso.matriz, arco.inverso.soportes = compilada
+
+    def compatibles(self, arco, a, b):
+        """¿El valor a de arco.origen es compatible con el valor b de arco.destino?"""
+        if arco.soportes is not None:
+            return (arco.soportes[a] >> b) & 1
+        x = self.valores[arco.origen][a]
+        y = self.valores[arco.destino][b]
+        return arco.restriccion(x, y) if arco.directa else arco.restriccion(y, x)
+
+    def satisface(self, arco, x, y):
+        """
+        ¿El valor x de arco.origen es compatible con el valor y de
+        arco.destino? Consulta la tabla compilada si ambos valores están en
+        sus dominios y, si no, llama a la función de la restricción.
+        """
+        if arco.soportes is not None:
+            a = self.id_valor[arco.origen].get(x)
+            b = self.id_valor[arco.destino].get(y)
+            if a is not None and b is not None:
+                return (arco.soportes[a] >> b) & 1
+        return arco.restriccion(x, y) if arco.directa else arco.restriccion(y, x)
+
+    def es_consistente(self, var, valor, asignacion):
+        """Verifica si asignar valor a var es consistente (solo restricciones de var)"""
+        variables = self.variables
+        for arco in self.arcos[self.indice[var]]:
+            otra = variables[arco.destino]
+            if otra in asignacion and not self.satisface(arco, valor, asignacion[otra]):
+                return False
+        if self.globales:
+            i = self.indice[var]
+            extendida = {**asignacion, var: valor}
+            return all(g.satisfecha(extendida) for g, _ in self.globales_de[i])
+        return True
+
+    def contar_conflictos(self, var, valor, asignacion):
+        """Calcula cuántas restricciones viola un valor para una variable"""
+        conflictos = 0
+        variables = self.variables
+        for arco in self.arcos[self.indice[var]]:
+            otra = variables[arco.destino]
+            if otra in asignacion and not self.satisface(arco, valor, asignacion[otra]):
+                conflictos += 1
+        return conflictos
+
+    def asignacion_consistente(self, asignacion):
+        """Verifica si una asignación (parcial o completa) cumple todas las restricciones."""
+        variables = self.variables
+        for arcos in self.arcos:
+            for arco in arcos:
+                if arco.directa:
+                    v1, v2 = variables[arco.origen], variables[arco.destino]
+                    if v1 in asignacion and v2 in asignacion and not self.satisface(arco, asignacion[v1], asignacion[v2]):
+                        return False
+        return all(g.satisfecha(asignacion) for g in self.globales)
+
+    def decodificar(self, asignacion):
+        """Convierte una lista de índices de valor en un diccionario {variable: valor}."""
+        return {v: self.valores[i][a] for i, (v, a) in enumerate(zip(self.variables, asignacion))
+                if a is not None}
+
+
+#############################
+# DOMINIOS COMO MÁSCARAS DE BITS
+#############################
+def bits(mascara):
+    """Itera los índices de los bits activos de una máscara (de menor a mayor)."""
+    while mascara:
+        bajo = mascara & -mascara
+        yield bajo.bit_length() - 1
+        mascara ^= bajo
+
+
+class Dominios:
+    def __init__(self, csp):
+        """
+        Dominios actuales de todas las variables como máscaras de bits.
+        Se inicializan a partir de csp.dominios (que puede estar ya reducido).
+
+        - mascaras: Lista {índice de variable: máscara}
+        - rastro: Pila de (variable, bits eliminados) para deshacer podas
+        - observador: Función f(i) llamada cuando cambia el dominio de i (opcional)
+        - vaciado: Último arco cuya propagación dejó un dominio vacío (para dom/wdeg)
+        """
+        self.mascaras = [sum(1 << csp.id_valor[i][valor] for valor in csp.dominios[v])
+                         for i, v in enumerate(csp.variables)]
+        self.rastro = []
+        self.observador = None
+        self.vaciado = None
+
+    def tamano(self, i):
+        """Número de valores que quedan en el dominio de la variable i."""
+        return self.mascaras[i].bit_count()
+
+    def valores(self, i):
+        """Índices de los valores que quedan en el dominio de la variable i."""
+        return list(bits(self.mascaras[i]))
+
+    def podar(self, i, eliminar):
+        """
+        Elimina del dominio de i los bits de 'eliminar' y guarda en el rastro
+        solo los que realmente estaban presentes.
+
+        Returns:
+            La nueva máscara de i (0 indica dominio vacío).
+        """
+        quitados = self.mascaras[i] & eliminar
+        if quitados:
+            self.mascaras[i] ^= quitados
+            self.rastro.append((i, quitados))
+            if self.observador is not None:
+                self.observador(i)
+        return self.mascaras[i]
+
+    def asignar(self, i, a):
+        """Reduce el dominio de i al único valor a."""
+        self.podar(i, ~(1 << a))
+
+    def marca(self):
+        """Punto del rastro al que se puede volver con deshacer()."""
+        return len(self.rastro)
+
+    def deshacer(self, marca):
+        """Restaura todas las podas posteriores a la marca: O(cambios)."""
+        rastro = self.rastro
+        mascaras = self.mascaras
+        observador = self.observador
+        while len(rastro) > marca:
+            i, quitados = rastro.pop()
+            mascaras[i] |= quitados
+            if observador is not None:
+                observador(i)
+
+    def volcar(self, csp):
+        """Escribe los dominios actuales en csp.dominios como listas de valores."""
+        for i, v in enumerate(csp.variables):
+            csp.dominios[v] = [csp.valores[i][a] for a in bits(self.mascaras[i])]
+
+
+#############################
+# INFERENCIA
+#############################
+class Estadisticas:
+    def __init__(self):
+        """
+        Contadores de esfuerzo de la búsqueda y la propagación.
+        - nodos: Asignaciones probadas
+        - retrocesos: Asignaciones deshechas
+        - revisiones: Arcos revisados
+        - podas: Valores eliminados por la propagación
+        - comprobaciones: Evaluaciones de restricciones (pares de valores)
+        - vaciados: Dominios vaciados por la propagación
+        - reinicios: Reinicios de la búsqueda
+        - saltos: Niveles saltados por el salto atrás (CBJ)
+        """
+        self.nodos = 0
+        self.retrocesos = 0
+        self.revisiones = 0
+        self.podas = 0
+        self.comprobaciones = 0
+        self.vaciados = 0
+        self.reinicios = 0
+        self.saltos = 0
+
+    def __repr__(self):
+        return ', '.join(f'{k}={v}' for k, v in vars(self).items())
+
+
+def revisar(csp, dominios, arco, estadisticas=None):
+    """
+    Elimina de arco.origen los valores sin soporte en arco.destino.
+
+    Los arcos precompilados acumulan con OR los soportes de los valores de
+    destino (normalmente basta con unos pocos). Los demás
+    usan soportes residuales (AC-3rm): se prueba primero el último soporte
+    encontrado para ese valor y, solo si ya no está en el dominio, se
+    busca otro. Los residuos no se restauran al volver atrás porque solo
+    son una pista que siempre se vuelve a verificar.
+
+    Returns:
+        True si se modificó el dominio de arco.origen.
+    """
+    mascara_destino = dominios.mascaras[arco.destino]
+    soportes = arco.soportes
+    eliminar = 0
+    comprobaciones = 0
+    if soportes is not None:
+        # Unión de los soportes que ofrecen los valores de destino; se para
+        # en cuanto cubre todo el dominio de origen
+        inversos = arco.inverso.soportes
+        mascara_origen = dominios.mascaras[arco.origen]
+        soportados = 0
+        for b in bits(mascara_destino):
+            comprobaciones += 1
+            soportados |= inversos[b]
+            if not mascara_origen & ~soportados:
+                break
+        eliminar = mascara_origen & ~soportados
+    else:
+        residuos = arco.residuos
+        if residuos is None:
+            residuos = arco.residuos = [-1] * len(csp.valores[arco.origen])
+        for a in bits(dominios.mascaras[arco.origen]):
+            b = residuos[a]
+            if b >= 0 and (mascara_destino >> b) & 1:
+                continue  # El residuo sigue siendo un soporte válido
+            for b in bits(mascara_destino):
+                comprobaciones += 1
+                if csp.compatibles(arco, a, b):
+                    residuos[a] = b
+                    if arco.inverso.residuos is not None:
+                        arco.inverso.residuos[b] = a  # Soporte bidireccional
+                    break
+            else:
+                eliminar |= 1 << a
+    if estadisticas is not None:
+        estadisticas.revisiones += 1
+        estadisticas.comprobaciones += comprobaciones
+        estadisticas.podas += eliminar.bit_count()
+    if eliminar:
+        dominios.podar(arco.origen, eliminar)
+        return True
+    return False
+
+
+def ac3(csp, dominios, cola=None, estadisticas=None, asignacion=None):
+    """
+    AC-3 sobre dominios de bits. Si no se indica cola, parte de todos los arcos.
+    - Tras reducir el dominio de xi solo se reencolan los arcos (xk, xi) de sus vecinos
+    - Un arco que ya está en la cola no se vuelve a añadir
+    - La revisión usa soportes precompilados o residuales (ver revisar)
+    - Durante la búsqueda (MAC) no se revisan arcos que salen de variables
+      asignadas: sus vecinos ya se filtraron contra su único valor
+
+    Args:
+        csp: Instancia de CSP
+        dominios: Dominios actuales (se podan en el sitio, con rastro)
+        cola: Arcos iniciales a revisar (None = todos)
+        estadisticas: Estadisticas donde acumular contadores (opcional)
+        asignacion: Lista {índice de variable: índice de valor o None} (opcional)
+
+    Returns:
+        False si algún dominio queda vacío, True en otro caso.
+    """
+    if cola is None:
+        cola = deque(arco for arcos in csp.arcos for arco in arcos)
+    en_cola = set(cola)
+    while cola:
+        arco = cola.popleft()
+        en_cola.discard(arco)
+        if revisar(csp, dominios, arco, estadisticas):
+            xi = arco.origen
+            if not dominios.mascaras[xi]:
+                dominios.vaciado = arco
+                if estadisticas is not None:
+                    estadisticas.vaciados += 1
+                return False
+            for vecino in csp.arcos[xi]:
+                entrante = vecino.inverso
+                if asignacion is not None and asignacion[vecino.destino] is not None:
+                    continue
+                if vecino.destino != arco.destino and entrante not in en_cola:
+                    cola.append(entrante)
+                    en_cola.add(entrante)
+    return True
+
+
+def inferencia_ninguna(csp, dominios, asignacion, i, estadisticas=None):
+    """Sin inferencia: la consistencia se comprueba al elegir cada valor."""
+    return True
+
+
+def inferencia_fc(csp, dominios, asignacion, i, estadisticas=None):
+    """
+    Forward checking: elimina de los vecinos no asignados de i los valores
+    incompatibles con el valor recién asignado.
+
+    Args:
+        csp: Instancia de CSP
+        dominios: Dominios actuales (se podan en el sitio, con rastro)
+        asignacion: Lista {índice de variable: índice de valor o None}
+        i: Variable recién asignada
+        estadisticas: Estadisticas donde contar comprobaciones y podas (opcional)
+
+    Returns:
+        False si algún dominio queda vacío.
+    """
+    a = asignacion[i]
+    comprobaciones = 0
+    for arco in csp.arcos[i]:
+        j = arco.destino
+        if asignacion[j] is not None:
+            continue
+        if arco.soportes is not None:
+            # Se conservan solo los valores soportados por a: un AND por
+            # vecino, que cuenta como una comprobación (como en revisar)
+            comprobaciones += 1
+            eliminar = ~arco.soportes[a]
+        else:
+            eliminar = 0
+            for b in bits(dominios.mascaras[j]):
+                comprobaciones += 1
+                if not csp.compatibles(arco, a, b):
+                    eliminar |= 1 << b
+        if eliminar:
+            antes = dominios.mascaras[j]
+            if estadisticas is not None:
+                estadisticas.podas += (antes & eliminar).bit_count()
+            if not dominios.podar(j, eliminar):
+                dominios.vaciado = arco
+                if estadisticas is not None:
+                    estadisticas.vaciados += 1
+                    estadisticas.comprobaciones += comprobaciones
+                return False  # Dominio vacío
+    if estadisticas is not None:
+        estadisticas.comprobaciones += comprobaciones
+    return True
+
+
+def inferencia_mac(csp, dominios, asignacion, i, estadisticas=None):
+    """
+    MAC (Maintaining Arc Consistency): AC-3 incremental sembrado solo con
+    los arcos (xj, xi) de los vecinos no asignados de la variable recién
+    asignada. Reutiliza ac3/revisar (con soportes residuales) y las podas
+    quedan en el rastro de los dominios, así que la vuelta atrás las deshace.
+    """
+    cola = deque(arco.inverso for arco in csp.arcos[i] if asignacion[arco.destino] is None)
+    return ac3(csp, dominios, cola, estadisticas, asignacion)
+
+
+INFERENCIAS = {
+    'ninguna': inferencia_ninguna,
+    'fc': inferencia_fc,
+    'mac': inferencia_mac,
+}
+
+
+#############################
+# RESTRICCIONES GLOBALES
+#############################
+class RestriccionGlobal:
+    """
+    Restricción n-aria sobre una lista de variables, con propagador propio
+    para la búsqueda sistemática y contadores de conflictos para la
+    búsqueda local. Evita descomponerla en O(n²) restricciones binarias.
+
+    Las subclases implementan:
+    - satisfecha(asignacion): Comprueba un diccionario {variable: valor}
+      (parcial o completo)
+    - consistente(csp, asignacion, k, a): ¿Es a compatible para la k-ésima
+      variable del ámbito con las ya asignadas? (lista de índices de valor)
+    - propagar(csp, dominios, asignacion, k): Poda tras asignar la k-ésima
+      variable del ámbito; False si vacía un dominio
+    - reiniciar(csp), coste(k, x, actual), anadir(k, x), quitar(k, x):
+      contadores de la búsqueda local (ver MinimosConflictos)
+    """
+
+    def __init__(self, variables):
+        self.variables = list(variables)
+        self.indices = []  # Índices de las variables del ámbito en el CSP
+
+    def preparar(self, csp):
+        """Traduce el ámbito a índices de variable del CSP."""
+        self.indices = [csp.indice[v] for v in self.variables]
+
+    def sugerir(self, rng):
+        """Valor prometedor para la búsqueda local (None si no hay sugerencia)."""
+        return None
+
+
+class TodosDistintos(RestriccionGlobal):
+    def __init__(self, variables, desplazamientos=None):
+        """
+        Todos los valores x_k + desplazamientos[k] deben ser distintos.
+        Sin desplazamientos es el AllDifferent clásico; con
+        desplazamientos k o -k son las diagonales de las n reinas.
+
+        Contadores de la búsqueda local, O(1) por operación:
+        - cuenta: {clave: variables del ámbito que la ocupan}
+        - xor: {clave: XOR de sus posiciones}; cuando solo queda una
+          variable, el XOR es esa variable
+        - libres: Valores sin usar (solo sin desplazamientos), para proponer
+          candidatos en dominios enormes
+        """
+        super().__init__(variables)
+        self.desplazamientos = list(desplazamientos) if desplazamientos is not None else None
+        self.cuenta = {}
+        self.xor = {}
+        self.libres = None
+
+    def clave(self, k, x):
+        return x + self.desplazamientos[k] if self.desplazamientos is not None else x
+
+    def satisfecha(self, asignacion):
+        claves = [self.clave(k, asignacion[v]) for k, v in enumerate(self.variables) if v in asignacion]
+        return len(claves) == len(set(claves))
+
+    def consistente(self, csp, asignacion, k, a):
+        clave = self.clave(k, csp.valores[self.indices[k]][a])
+        for m, j in enumerate(self.indices):
+            b = asignacion[j]
+            if m != k and b is not None and self.clave(m, csp.valores[j][b]) == clave:
+                return False
+        return True
+
+    def propagar(self, csp, dominios, asignacion, k, estadisticas=None):
+        """
+        Quita a cada variable libre del ámbito el valor que repetiría la
+        clave recién ocupada: O(ámbito), como forward checking sobre la
+        clique de desigualdades pero sin sus n² restricciones.
+        """
+        i = self.indices[k]
+        x = csp.valores[i][asignacion[i]]
+        desplazamientos = self.desplazamientos
+        mascaras = dominios.mascaras
+        for m, j in enumerate(self.indices):
+            if asignacion[j] is not None:
+                continue
+            if estadisticas is not None:
+                estadisticas.comprobaciones += 1
+            y = x if desplazamientos is None else x + desplazamientos[k] - desplazamientos[m]
+            b = csp.id_valor[j].get(y)
+            if b is not None and (mascaras[j] >> b) & 1:
+                if estadisticas is not None:
+                    estadisticas.podas += 1
+                if not dominios.podar(j, 1 << b):
+                    return False
+        return True
+
+    def reiniciar(self, csp):
+        self.cuenta = {}
+        self.xor = {}
+        self.libres = None
+        if self.desplazamientos is None:
+            # Dominios compartidos: cada lista de valores se recorre una vez
+            distintos = {id(csp.valores[i]): csp.valores[i] for i in self.indices}
+            self.libres = ConjuntoAleatorio()
+            for valores in distintos.values():
+                for x in valores:
+                    self.libres.anadir(x)
+
+    def coste(self, k, x, actual):
+        """Otras variables del ámbito con la misma clave que k = x."""
+        c = self.cuenta.get(self.clave(k, x), 0)
+        return c - 1 if x == actual else c
+
+    def anadir(self, k, x):
+        """
+        Registra k = x. Devuelve las posiciones cuyo coste puede haber
+        cambiado además de k: la que ya ocupaba la clave si pasa a estar
+        repetida.
+        """
+        clave = self.clave(k, x)
+        c = self.cuenta.get(clave, 0)
+        otra = self.xor.get(clave, 0)
+        self.cuenta[clave] = c + 1
+        self.xor[clave] = otra ^ k
+        if c == 0 and self.libres is not None:
+            self.libres.quitar(clave)
+        return (otra,) if c == 1 else ()
+
+    def quitar(self, k, x):
+        """Deshace k = x. Devuelve la posición que queda sola en la clave, si la hay."""
+        clave = self.clave(k, x)
+        c = self.cuenta[clave] - 1
+        if c == 0:
+            del self.cuenta[clave]
+            del self.xor[clave]
+            if self.libres is not None:
+                self.libres.anadir(clave)
+            return ()
+        self.cuenta[clave] = c
+        self.xor[clave] ^= k
+        return (self.xor[clave],) if c == 1 else ()
+
+    def sugerir(self, rng):
+        """Un valor que ninguna variable del ámbito usa."""
+        if self.libres:
+            return self.libres.muestra(rng)
+        return None
+
+
+class Suma(RestriccionGlobal):
+    def __init__(self, variables, total, coeficientes=None, relacion='=='):
+        """
+        Restricción lineal sum(coeficientes[k] * x_k) == total (o <= total).
+
+        Propagación por límites: con los mínimos y máximos de los términos
+        libres se acota el valor de cada uno y se podan los que quedan
+        fuera. En la búsqueda local el coste es el exceso (o defecto) de la
+        suma, que se mantiene incrementalmente.
+        """
+        super().__init__(variables)
+        self.total = total
+        self.coeficientes = list(coeficientes) if coeficientes is not None else [1] * len(self.variables)
+        if relacion not in ('==', '<='):
+            raise ValueError("relacion debe ser '==' o '<='")
+        self.relacion = relacion
+        self.suma = 0
+        self.extremos = []
+
+    def preparar(self, csp):
+        super().preparar(csp)
+        # Mínimo y máximo de cada término sobre el dominio inicial
+        self.extremos = []
+        for c, i in zip(self.coeficientes, self.indices):
+            terminos = [c * x for x in csp.valores[i]]
+            self.extremos.append((min(terminos), max(terminos)))
+
+    def _factible(self, fija, minimo, maximo):
+        """¿Puede la suma acabar cumpliendo la relación?"""
+        if fija + minimo > self.total:
+            return False
+        return self.relacion == '<=' or fija + maximo >= self.total
+
+    def satisfecha(self, asignacion):
+        fija = minimo = maximo = 0
+        for k, v in enumerate(self.variables):
+            if v in asignacion:
+                fija += self.coeficientes[k] * asignacion[v]
+            else:
+                minimo += self.extremos[k][0]
+                maximo += self.extremos[k][1]
+        return self._factible(fija, minimo, maximo)
+
+    def consistente(self, csp, asignacion, k, a):
+        fija = self.coeficientes[k] * csp.valores[self.indices[k]][a]
+        minimo = maximo = 0
+        for m, j in enumerate(self.indices):
+            if m == k:
+                continue
+            b = asignacion[j]
+            if b is not None:
+                fija += self.coeficientes[m] * csp.valores[j][b]
+            else:
+                minimo += self.extremos[m][0]
+                maximo += self.extremos[m][1]
+        return self._factible(fija, minimo, maximo)
+
+    def propagar(self, csp, dominios, asignacion, k, estadisticas=None):
+        """Consistencia de límites repetida hasta que no cambia ningún dominio."""
+        mascaras = dominios.mascaras
+        cambiado = True
+        while cambiado:
+            cambiado = False
+            fija, libres = 0, []
+            for m, j in enumerate(self.indices):
+                if asignacion[j] is not None:
+                    fija += self.coeficientes[m] * csp.valores[j][asignacion[j]]
+                else:
+                    terminos = [(self.coeficientes[m] * csp.valores[j][b], b) for b in bits(mascaras[j])]
+                    libres.append((j, terminos, min(terminos)[0], max(terminos)[0]))
+                    if estadisticas is not None:
+                        estadisticas.comprobaciones += len(terminos)
+            minimo = sum(t[2] for t in libres)
+            maximo = sum(t[3] for t in libres)
+            if not self._factible(fija, minimo, maximo):
+                return False
+            for j, terminos, bajo, alto in libres:
+                # Rango del término j dejando a los demás en sus extremos
+                tope = self.total - fija - (minimo - bajo)
+                suelo = self.total - fija - (maximo - alto) if self.relacion == '==' else None
+                eliminar = 0
+                for t, b in terminos:
+                    if t > tope or (suelo is not None and t < suelo):
+                        eliminar |= 1 << b
+                if eliminar:
+                    if estadisticas is not None:
+                        estadisticas.podas += eliminar.bit_count()
+                    if not dominios.podar(j, eliminar):
+                        return False
+                    cambiado = True
+        return True
+
+    def reiniciar(self, csp):
+        self.suma = 0
+
+    def _exceso(self, suma):
+        diferencia = suma - self.total
+        return max(diferencia, 0) if self.relacion == '<=' else abs(diferencia)
+
+    def coste(self, k, x, actual):
+        """Violación de la suma si la k-ésima variable pasa a valer x."""
+        c = self.coeficientes[k]
+        return self._exceso(self.suma + c * x - (c * actual if actual is not None else 0))
+
+    def anadir(self, k, x):
+        self.suma += self.coeficientes[k] * x
+        return range(len(self.indices))  # Cambia el coste de todo el ámbito
+
+    def quitar(self, k, x):
+        self.suma -= self.coeficientes[k] * x
+        return range(len(self.indices))
+
+
+#############################
+# ORDENACIÓN DE VARIABLES Y VALORES
+#############################
+class MonticuloIndexado:
+    def __init__(self, clave):
+        """
+        Montículo mínimo de variables que permite actualizar la prioridad
+        de cualquier elemento en O(log n).
+        - clave: Función f(i) que devuelve la prioridad actual de i
+        - posicion: {i: posición en el montículo}
+        """
+        self.clave = clave
+        self.monticulo = []
+        self.posicion = {}
+
+    def __contains__(self, i):
+        return i in self.posicion
+
+    def __len__(self):
+        return len(self.monticulo)
+
+    def tope(self):
+        """Elemento de menor prioridad (sin extraerlo)."""
+        return self.monticulo[0]
+
+    def insertar(self, i):
+        self.monticulo.append(i)
+        self.posicion[i] = len(self.monticulo) - 1
+        self._subir(len(self.monticulo) - 1)
+
+    def eliminar(self, i):
+        pos = self.posicion.pop(i)
+        ultimo = self.monticulo.pop()
+        if pos < len(self.monticulo):
+            self.monticulo[pos] = ultimo
+            self.posicion[ultimo] = pos
+            self._subir(pos)
+            self._bajar(self.posicion[ultimo])
+
+    def actualizar(self, i):
+        """Recoloca i tras un cambio en su prioridad (si está en el montículo)."""
+        pos = self.posicion.get(i)
+        if pos is not None:
+            self._subir(pos)
+            self._bajar(self.posicion[i])
+
+    def _subir(self, pos):
+        monticulo, posicion, clave = self.monticulo, self.posicion, self.clave
+        elemento = monticulo[pos]
+        k = clave(elemento)
+        while pos > 0:
+            padre = (pos - 1) >> 1
+            if clave(monticulo[padre]) <= k:
+                break
+            monticulo[pos] = monticulo[padre]
+            posicion[monticulo[pos]] = pos
+            pos = padre
+        monticulo[pos] = elemento
+        posicion[elemento] = pos
+
+    def _bajar(self, pos):
+        monticulo, posicion, clave = self.monticulo, self.posicion, self.clave
+        n = len(monticulo)
+        elemento = monticulo[pos]
+        k = clave(elemento)
+        while True:
+            hijo = 2 * pos + 1
+            if hijo >= n:
+                break
+            k_hijo = clave(monticulo[hijo])
+            if hijo + 1 < n:
+                k_derecho = clave(monticulo[hijo + 1])
+                if k_derecho < k_hijo:
+                    hijo, k_hijo = hijo + 1, k_derecho
+            if k <= k_hijo:
+                break
+            monticulo[pos] = monticulo[hijo]
+            posicion[monticulo[pos]] = pos
+            pos = hijo
+        monticulo[pos] = elemento
+        posicion[elemento] = pos
+
+
+def luby(k):
+    """
+    Término k-ésimo (desde 0) de la secuencia de Luby: 1 1 2 1 1 2 4 1 1 2 ...
+    Es la política universal de reinicios: su coste esperado está a un
+    factor logarítmico del de la mejor política fija desconocida.
+    """
+    k += 1
+    while True:
+        potencia = 1 << (k.bit_length() - 1)
+        if k == 2 * potencia - 1:
+            return potencia
+        k -= potencia - 1
+
+
+REINICIOS = {
+    'luby': luby,
+    'geometrico': lambda k: 1.5 ** k,
+}
+
+
+class _Reinicio(Exception):
+    """Se agotó el límite de retrocesos de la ejecución actual."""
+
+
+#############################
+# BÚSQUEDA CON VUELTA ATRÁS
+#############################
+class Solucionador:
+    def __init__(self, csp, inferencia='fc', variables='mrv', valores='natural',
+                 reinicios=None, unidad_reinicio=100, semilla=None):
+        """
+        Motor de backtracking sobre la representación entera del CSP.
+
+        Args:
+            csp: Instancia de CSP
+            inferencia: 'ninguna', 'fc' o 'mac'
+            variables: Orden de variables: 'mrv' (menos valores legales,
+                       desempate por grado), 'dom/wdeg' (valores legales
+                       entre el peso de sus restricciones con variables libres)
+                       u 'orden' (orden de csp.variables)
+            valores: Orden de valores: 'natural' o 'lcv' (el que menos poda)
+            reinicios: None, 'luby' o 'geometrico' (ver REINICIOS)
+            unidad_reinicio: Retrocesos de la primera ejecución; la i-ésima
+                             tiene unidad_reinicio * secuencia(i)
+            semilla: Semilla del desempate aleatorio entre variables empatadas
+        """
+        self.csp = csp
+        self.inferir = INFERENCIAS[inferencia]
+        # Con inferencia los dominios ya solo contienen valores compatibles
+        self.comprobar = inferencia == 'ninguna'
+        self.dominios = Dominios(csp)
+        n = len(csp.variables)
+        self.asignacion = [None] * n  # Índice de valor o None
+        self.num_asignadas = 0
+        self.estadisticas = Estadisticas()
+        self.lcv = valores == 'lcv'
+        self.variables = variables
+        self.grado = [len(arcos) + sum(len(g.indices) - 1 for g, _ in globales)
+                      for arcos, globales in zip(csp.arcos, csp.globales_de)]
+
+        # Desempate aleatorio: solo si se pide semilla o reinicios, para que
+        # la búsqueda por defecto siga siendo determinista
+        self.rng = random.Random(semilla)
+        aleatorio = semilla is not None or reinicios is not None
+        self.azar = [self.rng.random() if aleatorio else 0.0 for _ in range(n)]
+
+        # dom/wdeg: cada restricción empieza con peso 1 y suma 1 cada vez que
+        # provoca un fallo. wdeg[i] es la suma de los pesos de las
+        # restricciones de i con variables no asignadas (se mantiene al
+        # asignar y desasignar, también para las variables asignadas)
+        self.pesos = None
+        self.wdeg = None
+        if variables == 'dom/wdeg':
+            self.pesos = {arco: 1 for arcos in csp.arcos for arco in arcos if arco.directa}
+            self.wdeg = [len(arcos) for arcos in csp.arcos]
+
+        # Reinicios: límite de retrocesos por ejecución, camino de decisiones
+        # actual y nogoods aprendidos en los reinicios anteriores
+        self.reinicios = REINICIOS[reinicios] if reinicios else None
+        self.unidad_reinicio = unidad_reinicio
+        self.limite = None
+        self.camino = []     # [variable, valor actual, valores refutados] por nivel
+        self.nogoods = {}    # {(i, a): [nogood que contiene el literal (i, a)]}
+        self.unitarios = []  # Literales (i, a) imposibles desde la raíz
+
+        self.uso = None  # Ruptura de simetría de valores (ver enumerar)
+
+        # MRV y dom/wdeg sin inferencia: los dominios no se podan, así que se
+        # cuentan aparte los valores legales (compatibles con los vecinos
+        # asignados) filtrando con forward checking una copia que solo
+        # ordena variables
+        self.legales = Dominios(csp) if self.comprobar and self.variables != 'orden' else None
+        self.marcas_legales = []  # Marca de self.legales antes de cada asignación
+
+        self.monticulo = None
+        self._preparar_monticulo()
+
+    def _preparar_monticulo(self):
+        """
+        Montículo indexado de variables no asignadas cuya prioridad se
+        recoloca cada vez que cambia su dominio (o su wdeg).
+        """
+        # El índice cierra los empates: el orden no depende de la historia del montículo
+        dominios = self.legales or self.dominios
+        mascaras, grado, wdeg, azar = dominios.mascaras, self.grado, self.wdeg, self.azar
+        if self.variables == 'mrv':
+            def clave(i):
+                return (mascaras[i].bit_count(), -grado[i], azar[i], i)
+        elif self.variables == 'dom/wdeg':
+            def clave(i):
+                peso = wdeg[i]
+                return (mascaras[i].bit_count() / peso if peso else float('inf'), azar[i], i)
+        else:
+            return
+        self.monticulo = MonticuloIndexado(clave)
+        for i, a in enumerate(self.asignacion):
+            if a is None:
+                self.monticulo.insertar(i)
+        dominios.observador = self.monticulo.actualizar
+
+    def peso(self, arco):
+        """Peso dom/wdeg de la restricción del arco (compartido con su inverso)."""
+        return self.pesos[arco if arco.directa else arco.inverso]
+
+    def _penalizar(self, arco):
+        """Suma 1 al peso de la restricción que ha provocado un fallo."""
+        if self.pesos is None or arco is None:
+            return
+        self.pesos[arco if arco.directa else arco.inverso] += 1
+        i, j = arco.origen, arco.destino
+        if self.asignacion[j] is None:
+            self.wdeg[i] += 1
+            self.monticulo.actualizar(i)
+        if self.asignacion[i] is None:
+            self.wdeg[j] += 1
+            self.monticulo.actualizar(j)
+
+    def _ajustar_wdeg(self, i, signo):
+        """Resta (al asignar) o suma (al desasignar) las restricciones de i en el wdeg de sus vecinos."""
+        wdeg, monticulo = self.wdeg, self.monticulo
+        for arco in self.csp.arcos[i]:
+            j = arco.destino
+            wdeg[j] += signo * self.peso(arco)
+            monticulo.actualizar(j)
+
+    def consistente(self, i, a):
+        """Comprueba el valor a de i contra las variables vecinas ya asignadas."""
+        asignacion = self.asignacion
+        for arco in self.csp.arcos[i]:
+            b = asignacion[arco.destino]
+            if b is not None:
+                self.estadisticas.comprobaciones += 1
+                if not self.csp.compatibles(arco, a, b):
+                    self._penalizar(arco)
+                    return False
+        for g, k in self.csp.globales_de[i]:
+            self.estadisticas.comprobaciones += 1
+            if not g.consistente(self.csp, asignacion, k, a):
+                return False
+        return True
+
+    def seleccionar_variable(self):
+        """
+        MRV o dom/wdeg sobre los dominios actuales (ya podados por la
+        inferencia, o los valores legales si no hay inferencia): el tope
+        del montículo, O(1). Las actualizaciones
+        cuestan O(log n) cada vez que cambia un dominio o un peso.
+        Con variables='orden', primera variable no asignada.
+        """
+        if self.monticulo is not None:
+            return self.monticulo.tope()
+        return self.asignacion.index(None)
+
+    def ordenar_valores(self, i):
+        """
+        Valores actuales de i. Con LCV se ordenan por el número de valores
+        que eliminarían de los dominios actuales (o valores legales) de sus
+        vecinos no asignados.
+        """
+        valores = self.dominios.valores(i)
+        if not self.lcv or len(valores) < 2:
+            return valores
+        csp, mascaras, asignacion = self.csp, (self.legales or self.dominios).mascaras, self.asignacion
+        arcos = [arco for arco in csp.arcos[i] if asignacion[arco.destino] is None]
+
+        def eliminados(a):
+            total = 0
+            for arco in arcos:
+                mascara = mascaras[arco.destino]
+                if arco.soportes is not None:
+                    total += (mascara & ~arco.soportes[a]).bit_count()
+                else:
+                    total += sum(1 for b in bits(mascara) if not csp.compatibles(arco, a, b))
+            return total
+
+        return sorted(valores, key=eliminados)
+
+    def asignar(self, i, a):
+        """Asigna a a la variable i y aplica la inferencia; False si falla."""
+        self.asignacion[i] = a
+        self.num_asignadas += 1
+        self.estadisticas.nodos += 1
+        if self.monticulo is not None:
+            self.monticulo.eliminar(i)
+        if self.legales is not None:
+            # Si vacía un dominio el filtrado se corta, pero esa variable
+            # (0 valores legales) es la siguiente en elegirse y falla
+            self.marcas_legales.append(self.legales.marca())
+            inferencia_fc(self.csp, self.legales, self.asignacion, i)
+        if self.wdeg is not None:
+            self._ajustar_wdeg(i, -1)
+        self.dominios.asignar(i, a)
+        self.dominios.vaciado = None
+        if not self.inferir(self.csp, self.dominios, self.asignacion, i, self.estadisticas):
+            self._penalizar(self.dominios.vaciado)
+            return False
+        if self.csp.globales_de[i] and not self._propagar_globales(i):
+            return False
+        return not self.nogoods or self._propagar_nogoods(i, a)
+
+    def _propagar_globales(self, i):
+        """
+        Propagadores de las restricciones globales de i. Con MAC, las podas
+        que hacen se vuelven a propagar por los arcos binarios.
+        """
+        if self.comprobar:
+            return True  # Sin inferencia se comprueban al elegir el valor
+        csp, dominios, asignacion = self.csp, self.dominios, self.asignacion
+        inicio = len(dominios.rastro)
+        for g, k in csp.globales_de[i]:
+            if not g.propagar(csp, dominios, asignacion, k, self.estadisticas):
+                self.estadisticas.vaciados += 1
+                return False
+        if self.inferir is inferencia_mac and len(dominios.rastro) > inicio:
+            podadas = {j for j, _ in dominios.rastro[inicio:]}
+            cola = deque(arco.inverso for j in podadas for arco in csp.arcos[j]
+                         if asignacion[arco.destino] is None)
+            return ac3(csp, dominios, cola, self.estadisticas, asignacion)
+        return True
+
+    def desasignar(self, i, marca):
+        """Deshace la asignación de i y todas las podas posteriores a la marca."""
+        self.asignacion[i] = None
+        self.num_asignadas -= 1
+        self.estadisticas.retrocesos += 1
+        self.dominios.deshacer(marca)
+        if self.legales is not None:
+            self.legales.deshacer(self.marcas_legales.pop())
+        if self.wdeg is not None:
+            self._ajustar_wdeg(i, 1)
+        if self.monticulo is not None:
+            self.monticulo.insertar(i)
+
+    def buscar(self):
+        """
+        Primera solución del recorrido (ver _explorar). True si completa
+        la asignación. Lanza _Reinicio cuando se supera el límite de retrocesos.
+        """
+        return next(self._explorar(), False)
+
+    def _explorar(self):
+        """
+        Backtracking iterativo con pila explícita: self.camino guarda por
+        nivel [variable, valor actual, valores refutados, valores por
+        probar, marca del rastro antes de asignar]. Genera True cada vez
+        que completa la asignación (self.asignacion es entonces la
+        solución) y, al reanudarse, sigue con el siguiente valor. Como no
+        hay recursión, la profundidad no depende del límite de la pila de
+        Python (CSP de decenas de miles de variables).
+        """
+        camino = self.camino
+        n = len(self.asignacion)
+        while True:
+            if self.num_asignadas == n:
+                yield True
+            else:
+                i = self.seleccionar_variable()
+                camino.append([i, None, [], iter(self._valores_enumeracion(i)), None])
+            # Siguiente valor del nivel más profundo; los niveles agotados
+            # se desapilan y se refuta el valor de su padre
+            while camino:
+                nivel = camino[-1]
+                i = nivel[0]
+                if nivel[1] is not None:
+                    self._refutar(nivel)
+                for a in nivel[3]:
+                    if self.comprobar and not self.consistente(i, a):
+                        continue
+                    nivel[1], nivel[4] = a, self.dominios.marca()
+                    if self.uso is not None:
+                        self.uso[a] += 1
+                    if self.asignar(i, a):
+                        break
+                    self._refutar(nivel)
+                else:
+                    camino.pop()
+                    continue
+                break  # Valor asignado: se abre el nivel siguiente
+            else:
+                return
+
+    def _refutar(self, nivel):
+        """Deshace el valor actual de un nivel del camino y lo anota como refutado."""
+        i, a, refutados, _, marca = nivel
+        self.desasignar(i, marca)
+        if self.uso is not None:
+            self.uso[a] -= 1
+        refutados.append(a)
+        if self.limite is not None and self.estadisticas.retrocesos >= self.limite:
+            raise _Reinicio
+        nivel[1] = None
+
+    #############################
+    # REINICIOS Y NOGOODS
+    #############################
+    def _propagar_nogoods(self, i, a):
+        """
+        Revisa los nogoods que contienen el literal (i, a) recién asignado:
+        si todos sus literales se cumplen hay conflicto, y si solo falta uno
+        su valor se poda (se deshace con el resto del rastro).
+
+        Returns:
+            False si un nogood se viola o vacía un dominio.
+        """
+        asignacion, mascaras = self.asignacion, self.dominios.mascaras
+        for nogood in self.nogoods.get((i, a), ()):
+            pendiente = None
+            for j, b in nogood:
+                c = asignacion[j]
+                if c == b:
+                    continue
+                if c is None and pendiente is None and (mascaras[j] >> b) & 1:
+                    pendiente = (j, b)
+                    continue
+                break  # Literal falso o dos sin decidir: el nogood no dispara
+            else:
+                if pendiente is None:
+                    return False
+                j, b = pendiente
+                self.estadisticas.podas += 1
+                if not self.dominios.podar(j, 1 << b):
+                    return False
+        return True
+
+    def _registrar_nogoods(self):
+        """
+        Nogoods del camino interrumpido por un reinicio (nld-nogoods): en el
+        nivel k, las decisiones positivas de los niveles anteriores junto
+        con cada valor ya refutado en k no pueden extenderse a una solución,
+        porque ese subárbol se exploró entero.
+        """
+        positivas = ()
+        for i, a, refutados, _, _ in self.camino:
+            for r in refutados:
+                if not positivas:
+                    self.unitarios.append((i, r))
+                    continue
+                nogood = positivas + ((i, r),)
+                for literal in nogood:
+                    self.nogoods.setdefault(literal, []).append(nogood)
+            positivas += ((i, a),)
+
+    def _reiniciar(self, raiz, fijas):
+        """
+        Vuelve a la raíz conservando pesos y nogoods, aplica los nogoods
+        unitarios y sortea de nuevo los desempates.
+
+        Returns:
+            False si los nogoods unitarios vacían algún dominio.
+        """
+        self.camino = []
+        self.asignacion[:] = fijas
+        self.num_asignadas = sum(a is not None for a in fijas)
+        self.dominios.observador = None
+        self.dominios.deshacer(raiz)
+        if self.legales is not None:
+            # Las primeras marcas son las de la asignación fija
+            self.legales.observador = None
+            if len(self.marcas_legales) > self.num_asignadas:
+                self.legales.deshacer(self.marcas_legales[self.num_asignadas])
+                del self.marcas_legales[self.num_asignadas:]
+        for i, r in self.unitarios:
+            if not self.dominios.podar(i, 1 << r):
+                return False
+        if self.wdeg is not None:
+            arcos, asignacion = self.csp.arcos, self.asignacion
+            for i in range(len(asignacion)):
+                self.wdeg[i] = sum(self.peso(arco) for arco in arcos[i]
+                                   if asignacion[arco.destino] is None)
+        self.azar[:] = [self.rng.random() for _ in self.azar]
+        self._preparar_monticulo()
+        return True
+
+    def resolver(self, asignacion=None):
+        """
+        Resuelve el CSP partiendo opcionalmente de una asignación parcial fija.
+        Con reinicios, cada ejecución se corta al agotar su cuota de
+        retrocesos; la secuencia de cuotas crece sin límite, así que la
+        búsqueda sigue siendo completa.
+
+        Returns:
+            Diccionario {variable: valor} o None si no hay solución.
+        """
+        if not self._fijar(asignacion):
+            return None
+        if self.reinicios is None:
+            encontrada = self.buscar()
+        else:
+            raiz = self.dominios.marca()
+            fijas = list(self.asignacion)
+            k = 0
+            while True:
+                cuota = max(1, int(self.unidad_reinicio * self.reinicios(k)))
+                self.limite = self.estadisticas.retrocesos + cuota
+                try:
+                    encontrada = self.buscar()
+                    break
+                except _Reinicio:
+                    self.estadisticas.reinicios += 1
+                    self._registrar_nogoods()
+                    if not self._reiniciar(raiz, fijas):
+                        encontrada = False
+                        break
+                    k += 1
+            self.limite = None
+        if not encontrada:
+            return None
+        return self.csp.decodificar(self.asignacion)
+
+    def _fijar(self, asignacion):
+        """Asigna (con inferencia) la asignación parcial inicial; False si es inconsistente."""
+        for var, valor in (asignacion or {}).items():
+            i = self.csp.indice[var]
+            a = self.csp.id_valor[i].get(valor)
+            if a is None or not (self.dominios.mascaras[i] >> a) & 1 or not self.consistente(i, a):
+                return False
+            if not self.asignar(i, a):
+                return False
+        return True
+
+    #############################
+    # ENUMERACIÓN DE SOLUCIONES
+    #############################
+    def _preparar_simetria(self):
+        """
+        Comprueba que los valores son intercambiables: todas las variables
+        tienen el mismo dominio y cada restricción solo depende de si los
+        dos valores son iguales (su matriz es constante en la diagonal y
+        fuera de ella), como en el coloreo de mapas. Entonces cualquier
+        permutación de valores lleva soluciones a soluciones.
+
+        Raises:
+            ValueError: Si los valores no son intercambiables
+        """
+        csp = self.csp
+        if csp.globales or self.nogoods:
+            raise ValueError("La ruptura de simetría solo admite restricciones binarias")
+        if any(vals != csp.valores[0] for vals in csp.valores):
+            raise ValueError("La ruptura de simetría exige el mismo dominio en todas las variables")
+        fuera = ~np.eye(len(csp.valores[0]), dtype=bool)
+        for arcos in csp.arcos:
+            for arco in arcos:
+                if arco.directa:
+                    matriz = matriz_compatibilidad(csp, arco)
+                    if np.unique(matriz.diagonal()).size > 1 or np.unique(matriz[fuera]).size > 1:
+                        raise ValueError("Los valores no son intercambiables en todas las restricciones")
+        self.uso = [0] * len(csp.valores[0])  # Variables asignadas con cada valor
+        for a in self.asignacion:
+            if a is not None:
+                self.uso[a] += 1
+
+    def _valores_enumeracion(self, i):
+        """
+        Valores de i a probar. Con ruptura de simetría, de los valores que
+        aún no usa ninguna variable solo se prueba el primero: los demás
+        darían las mismas soluciones con los valores permutados.
+        """
+        valores = self.ordenar_valores(i)
+        if self.uso is None:
+            return valores
+        uso, primero = self.uso, True
+        elegidos = []
+        for a in valores:
+            if uso[a]:
+                elegidos.append(a)
+            elif primero:
+                elegidos.append(a)
+                primero = False
+        return elegidos
+
+    def _preparar_enumeracion(self, asignacion, simetria):
+        if self.reinicios is not None:
+            raise ValueError("La enumeración de soluciones no admite reinicios")
+        if simetria not in (None, 'valores'):
+            raise ValueError(f"Simetría desconocida: {simetria}")
+        self.uso = None
+        if not self._fijar(asignacion):
+            return False
+        if simetria == 'valores':
+            self._preparar_simetria()
+        return True
+
+    def enumerar(self, asignacion=None, simetria=None, maximo=None):
+        """
+        Genera las soluciones una a una, sin guardarlas: la búsqueda se
+        suspende en cada solución y continúa cuando se pide la siguiente.
+
+        Args:
+            asignacion: Asignación parcial fija
+            simetria: None o 'valores' (valores intercambiables, p. ej.
+                      colores): solo una solución de cada clase de
+                      soluciones equivalentes por permutación de valores
+            maximo: Número máximo de soluciones (None = todas)
+
+        Yields:
+            Diccionarios {variable: valor}
+        """
+        if not self._preparar_enumeracion(asignacion, simetria) or maximo == 0:
+            return
+        for k, _ in enumerate(self._explorar(), 1):
+            yield self.csp.decodificar(self.asignacion)
+            if k == maximo:
+                return
+
+    def contar(self, asignacion=None, simetria=None):
+        """
+        Número de soluciones (o de clases de soluciones con simetria=
+        'valores') recorriendo el árbol de búsqueda sin construir los
+        diccionarios de las soluciones.
+        """
+        if not self._preparar_enumeracion(asignacion, simetria):
+            return 0
+        return sum(1 for _ in self._explorar())
+
+
+class SolucionadorCBJ(Solucionador):
+    def __init__(self, csp, inferencia='fc', variables='mrv', valores='natural', semilla=None):
+        """
+        Salto atrás dirigido por conflictos (CBJ de Prosser) y, con
+        inferencia='fc', FC-CBJ.
+
+        Cada nivel devuelve a su padre el conjunto de conflicto que explica
+        su fallo. Si el padre no está en él, la asignación del padre no
+        tiene culpa y se salta (sin probar sus demás valores) hasta el
+        nivel más profundo del conjunto, que lo fusiona con el suyo.
+
+        - nivel: {variable: profundidad a la que se asignó, -1 si libre}
+        - podadores: {variable: máscara de niveles cuyo FC podó su dominio}
+        Los conjuntos de conflicto son máscaras de bits sobre niveles: el
+        destino del salto es el bit más alto y la fusión es un OR.
+        """
+        if inferencia not in ('ninguna', 'fc'):
+            raise ValueError("CBJ solo admite inferencia 'ninguna' o 'fc'")
+        if csp.globales:
+            # Las podas de una restricción global dependen de varias
+            # variables a la vez: un solo nivel no las explica
+            raise ValueError("CBJ solo admite restricciones binarias")
+        super().__init__(csp, inferencia, variables, valores, semilla=semilla)
+        self.nivel = [-1] * len(csp.variables)
+        self.podadores = [0] * len(csp.variables)
+
+    def conflicto_valor(self, i, a):
+        """
+        Comprueba el valor a de i contra las variables asignadas.
+
+        Returns:
+            None si es consistente; si no, la máscara del nivel en conflicto
+            más bajo (permite saltos más largos), o 0 si choca con una
+            variable de la asignación inicial, que nunca cambia.
+        """
+        asignacion, nivel = self.asignacion, self.nivel
+        culpable = None
+        for arco in self.csp.arcos[i]:
+            j = arco.destino
+            b = asignacion[j]
+            if b is None:
+                continue
+            self.estadisticas.comprobaciones += 1
+            if not self.csp.compatibles(arco, a, b):
+                if culpable is None or nivel[j] < nivel[culpable.destino]:
+                    culpable = arco
+        if culpable is None:
+            return None
+        self._penalizar(culpable)
+        k = nivel[culpable.destino]
+        return 1 << k if k >= 0 else 0
+
+    def _anotar_podas(self, marca, i, bit, activar):
+        """Marca (o desmarca) el nivel de i en las variables que podó su FC."""
+        podadores = self.podadores
+        rastro = self.dominios.rastro
+        for pos in range(marca, len(rastro)):
+            j = rastro[pos][0]
+            if j != i:
+                if activar:
+                    podadores[j] |= bit
+                else:
+                    podadores[j] &= ~bit
+
+    def _explorar(self):
+        """
+        CBJ iterativo con pila explícita de niveles [variable, bit del
+        nivel, conjunto de conflicto, valores por probar, valor actual,
+        marca del rastro]. Genera True en cada solución (resolver se queda
+        con la primera; enumerar y contar siguen).
+
+        Cuando un subárbol falla, su conjunto de conflicto sube al nivel
+        padre: si el padre no está en él, se deshace sin probar sus demás
+        valores y el conjunto sigue subiendo (salto); si está, se fusiona
+        con el del padre, que prueba su siguiente valor. Una solución
+        depende de todos los niveles, así que un subárbol con soluciones
+        nunca provoca un salto por encima de sus antecesores.
+        """
+        pila = []
+        n = len(self.asignacion)
+        uso = self.uso
+        while True:
+            if self.num_asignadas == n:
+                yield True
+                resultado = (1 << len(pila)) - 1
+            else:
+                i = self.seleccionar_variable()
+                # Los valores que el FC quitó a i también forman parte del conflicto
+                pila.append([i, 1 << len(pila), self.podadores[i], iter(self._valores_enumeracion(i)), None, None])
+                resultado = None
+            while pila:
+                nivel = pila[-1]
+                i, bit = nivel[0], nivel[1]
+                if resultado is not None:
+                    # Vuelve el subárbol de i = valor actual con su conflicto
+                    a, marca = nivel[4], nivel[5]
+                    self._anotar_podas(marca, i, bit, False)
+                    self.desasignar(i, marca)
+                    self.nivel[i] = -1
+                    if uso is not None:
+                        uso[a] -= 1
+                    if not resultado & bit:
+                        # El fallo no depende de i: salto por encima de este nivel
+                        self.estadisticas.saltos += 1
+                        pila.pop()
+                        continue
+                    nivel[2] |= resultado ^ bit
+                    resultado = None
+                for a in nivel[3]:
+                    if self.comprobar:
+                        c = self.conflicto_valor(i, a)
+                        if c is not None:
+                            nivel[2] |= c
+                            continue
+                    marca = self.dominios.marca()
+                    self.nivel[i] = len(pila) - 1
+                    if uso is not None:
+                        uso[a] += 1
+                    if self.asignar(i, a):
+                        self._anotar_podas(marca, i, bit, True)
+                        nivel[4], nivel[5] = a, marca
+                        break
+                    if self.dominios.vaciado is not None:
+                        # FC vació el dominio de j: le culpan los niveles que ya lo habían podado
+                        nivel[2] |= self.podadores[self.dominios.vaciado.destino]
+                    self.desasignar(i, marca)
+                    self.nivel[i] = -1
+                    if uso is not None:
+                        uso[a] -= 1
+                else:
+                    # Nivel agotado: su conflicto sube al padre
+                    resultado = nivel[2]
+                    pila.pop()
+                    continue
+                break  # Valor asignado: se abre el nivel siguiente
+            else:
+                return
+
+
+def resolver(csp, inferencia='fc', asignacion=None, variables='mrv', valores='natural',
+             reinicios=None, semilla=None, retroceso='cronologico'):
+    """
+    Punto de entrada común: backtracking con la inferencia indicada.
+
+    Args:
+        csp: Instancia de CSP
+        inferencia: 'ninguna', 'fc' o 'mac'
+        asignacion: Asignación parcial inicial que debe respetarse
+        variables: Orden de variables ('mrv', 'dom/wdeg' u 'orden')
+        valores: Orden de valores ('natural' o 'lcv')
+        reinicios: Política de reinicios (None, 'luby' o 'geometrico')
+        semilla: Semilla del desempate aleatorio
+        retroceso: 'cronologico' o 'cbj' (salto atrás dirigido por
+                   conflictos; solo con inferencia 'ninguna' o 'fc' y sin reinicios)
+
+    Returns:
+        Diccionario {variable: valor} o None si no hay solución.
+    """
+    if retroceso == 'cbj':
+        return SolucionadorCBJ(csp, inferencia, variables, valores, semilla=semilla).resolver(asignacion)
+    return Solucionador(csp, inferencia, variables, valores,
+                        reinicios=reinicios, semilla=semilla).resolver(asignacion)
+
+
+def soluciones(csp, inferencia='fc', asignacion=None, variables='mrv', valores='natural',
+               retroceso='cronologico', simetria=None, maximo=None):
+    """
+    Generador de todas las soluciones (o de las 'maximo' primeras) con el
+    mismo motor que resolver. Los argumentos son los de resolver más
+    simetria y maximo (ver Solucionador.enumerar).
+
+    Yields:
+        Diccionarios {variable: valor}
+    """
+    clase = SolucionadorCBJ if retroceso == 'cbj' else Solucionador
+    yield from clase(csp, inferencia, variables, valores).enumerar(asignacion, simetria, maximo)
+
+
+def contar_busqueda(csp, inferencia='fc', asignacion=None, variables='mrv', valores='natural',
+                    retroceso='cronologico', simetria=None):
+    """
+    Número de soluciones contadas con el motor de búsqueda (sin construir
+    diccionarios). Con simetria='valores' cuenta clases de soluciones.
+    """
+    clase = SolucionadorCBJ if retroceso == 'cbj' else Solucionador
+    return clase(csp, inferencia, variables, valores).contar(asignacion, simetria)
+
+
+#############################
+# CSP CON ESTRUCTURA DE ÁRBOL
+#############################
+class ArbolCSP:
+    def __init__(self, csp, corte=(), estadisticas=None):
+        """
+        Resolución en O(n·d²) de un CSP cuyas variables libres (las que no
+        están en el corte) forman un bosque de restricciones binarias.
+        La estructura depende solo del corte, así que se calcula una vez y
+        se reutiliza para cada asignación del corte.
+
+        - orden: Variables libres en orden topológico (cada una tras su padre)
+        - padre: {variable: padre en su árbol o None si es raíz}
+        - arcos_padre: {variable: [arcos padre -> variable]} (todas las
+          restricciones entre ambas se tratan como una sola arista)
+        - arcos_corte: Restricciones entre variables del corte
+        - frontera: {variable libre: [arcos corte -> variable]}
+        - estadisticas: Contadores acumulados de todas las llamadas (nodos:
+          asignaciones del corte probadas, retrocesos: las que no tienen
+          solución, comprobaciones: consultas de soporte, vaciados:
+          dominios que se quedan sin valores)
+
+        Raises:
+            ValueError: Si las variables libres contienen un ciclo o el CSP
+                        tiene restricciones globales
+        """
+        if csp.globales:
+            raise ValueError("ArbolCSP solo admite restricciones binarias")
+        self.csp = csp
+        self.estadisticas = estadisticas if estadisticas is not None else Estadisticas()
+        n = len(csp.variables)
+        self.corte = [csp.indice[v] for v in corte]
+        en_corte = [False] * n
+        for i in self.corte:
+            en_corte[i] = True
+        self.arcos_corte = [arco for i in self.corte for arco in csp.arcos[i]
+                            if arco.directa and en_corte[arco.destino]]
+        self.frontera = {}
+        for i in self.corte:
+            for arco in csp.arcos[i]:
+                if not en_corte[arco.destino]:
+                    self.frontera.setdefault(arco.destino, []).append(arco)
+
+        # Recorrido en anchura de cada componente libre: una arista hacia un
+        # vértice ya visitado (que no sea el padre) cierra un ciclo
+        self.orden = []
+        self.padre = [None] * n
+        self.arcos_padre = [[] for _ in range(n)]
+        visitado = list(en_corte)
+        for raiz in range(n):
+            if visitado[raiz]:
+                continue
+            visitado[raiz] = True
+            self.orden.append(raiz)
+            cola = deque([raiz])
+            while cola:
+                u = cola.popleft()
+                hijos = {}
+                for arco in csp.arcos[u]:
+                    w = arco.destino
+                    if not en_corte[w] and w != self.padre[u]:
+                        hijos.setdefault(w, []).append(arco)
+                for w, arcos in hijos.items():
+                    if visitado[w]:
+                        raise ValueError(f"Las variables libres no forman un bosque: "
+                                         f"ciclo por {csp.variables[u]} - {csp.variables[w]}")
+                    visitado[w] = True
+                    self.padre[w] = u
+                    self.arcos_padre[w] = arcos
+                    self.orden.append(w)
+                    cola.append(w)
+        self.iniciales = Dominios(csp).mascaras
+
+    def soportes(self, arco, a):
+        """Máscara de valores de arco.destino compatibles con el valor a de arco.origen."""
+        self.estadisticas.comprobaciones += 1
+        if arco.soportes is not None:
+            return arco.soportes[a]
+        return sum(1 << b for b in range(len(self.csp.valores[arco.destino]))
+                   if self.csp.compatibles(arco, a, b))
+
+    def _condicionar(self, asignacion_corte):
+        """
+        Fija el corte, comprueba sus restricciones internas y poda los
+        dominios de la frontera según sus valores.
+
+        Returns:
+            Tupla (mascaras, asignacion) o None si ya hay un conflicto.
+        """
+        csp = self.csp
+        estadisticas = self.estadisticas
+        estadisticas.nodos += 1
+        mascaras = list(self.iniciales)
+        asignacion = [None] * len(csp.variables)
+        for var, valor in (asignacion_corte or {}).items():
+            i = csp.indice[var]
+            a = csp.id_valor[i].get(valor)
+            if a is None or not (mascaras[i] >> a) & 1:
+                estadisticas.retrocesos += 1
+                return None
+            asignacion[i] = a
+        if any(asignacion[i] is None for i in self.corte):
+            raise ValueError("Falta el valor de alguna variable del corte")
+        for arco in self.arcos_corte:
+            estadisticas.comprobaciones += 1
+            if not csp.compatibles(arco, asignacion[arco.origen], asignacion[arco.destino]):
+                estadisticas.retrocesos += 1
+                return None
+
+        for j, arcos in self.frontera.items():
+            for arco in arcos:
+                mascaras[j] &= self.soportes(arco, asignacion[arco.origen])
+            if not mascaras[j]:
+                estadisticas.vaciados += 1
+                estadisticas.retrocesos += 1
+                return None
+        return mascaras, asignacion
+
+    def _soporte_conjunto(self, j, a, mascara):
+        """
+        Valores de mascara (dominio del hijo j) compatibles con el valor a
+        de su padre en todas las restricciones entre ambos.
+        """
+        for arco in self.arcos_padre[j]:
+            mascara &= self.soportes(arco, a)
+        return mascara
+
+    def resolver(self, asignacion_corte=None):
+        """
+        1. Fija el corte y comprueba sus restricciones internas
+        2. Condiciona los dominios de la frontera al valor del corte
+        3. Consistencia de arco direccional de las hojas a la raíz: cada
+           padre conserva solo los valores con soporte en el hijo
+        4. Asigna de la raíz a las hojas: cada variable toma un valor
+           compatible con su padre, que existe gracias al paso 3
+
+        Args:
+            asignacion_corte: Diccionario {variable del corte: valor}
+
+        Returns:
+            Diccionario {variable: valor} o None si no hay solución.
+        """
+        condicionado = self._condicionar(asignacion_corte)
+        if condicionado is None:
+            return None
+        mascaras, asignacion = condicionado
+
+        for j in reversed(self.orden):
+            p = self.padre[j]
+            if p is None:
+                continue
+            # Soporte conjunto: el valor del padre debe ser compatible con
+            # un mismo valor del hijo en todas las restricciones entre ambos
+            eliminar = 0
+            for a in bits(mascaras[p]):
+                if not self._soporte_conjunto(j, a, mascaras[j]):
+                    eliminar |= 1 << a
+            mascaras[p] &= ~eliminar
+            if not mascaras[p]:
+                self.estadisticas.vaciados += 1
+                self.estadisticas.retrocesos += 1
+                return None
+
+        for j in self.orden:
+            p = self.padre[j]
+            candidatos = mascaras[j]
+            if p is not None:
+                candidatos = self._soporte_conjunto(j, asignacion[p], candidatos)
+            asignacion[j] = (candidatos & -candidatos).bit_length() - 1
+        return self.csp.decodificar(asignacion)
+
+    def contar(self, asignacion_corte=None):
+        """
+        Número de soluciones que extienden la asignación del corte, por
+        programación dinámica de las hojas a la raíz en O(n·d²):
+        cuenta[j][a] = producto, para cada hijo h de j, de la suma de
+        cuenta[h][b] sobre los valores b de h compatibles con a.
+
+        Args:
+            asignacion_corte: Diccionario {variable del corte: valor}
+
+        Returns:
+            Entero con el número de soluciones (0 si no hay ninguna).
+        """
+        condicionado = self._condicionar(asignacion_corte)
+        if condicionado is None:
+            return 0
+        mascaras, _ = condicionado
+        cuenta = {j: {a: 1 for a in bits(mascaras[j])} for j in self.orden}
+        total = 1
+        for j in reversed(self.orden):
+            p = self.padre[j]
+            if p is None:
+                total *= sum(cuenta[j].values())
+                if not total:
+                    return 0
+                continue
+            hijo = cuenta[j]
+            for a in cuenta[p]:
+                cuenta[p][a] *= sum(hijo[b] for b in bits(self._soporte_conjunto(j, a, mascaras[j])))
+        return total
+
+
+def resolver_arbol(csp, asignacion=None):
+    """
+    Resuelve un CSP cuyo grafo de restricciones, quitando las variables de
+    'asignacion', es un bosque (ver ArbolCSP).
+
+    Returns:
+        Diccionario {variable: valor} o None si no hay solución.
+    """
+    asignacion = asignacion or {}
+    return ArbolCSP(csp, list(asignacion)).resolver(asignacion)
+
+
+def nucleo_ciclico(grafo, nodos):
+    """
+    2-núcleo del subgrafo inducido por nodos: lo que queda tras quitar
+    repetidamente los nodos de grado 0 o 1, que no pueden estar en ningún
+    ciclo. El subgrafo es un bosque si y solo si el resultado está vacío.
+
+    Args:
+        grafo: Diccionario {nodo: conjunto de vecinos}
+        nodos: Conjunto de nodos del subgrafo
+
+    Returns:
+        Diccionario {nodo: grado dentro del núcleo}
+    """
+    grado = {v: sum(1 for w in grafo[v] if w in nodos) for v in nodos}
+    hojas = [v for v, g in grado.items() if g <= 1]
+    while hojas:
+        v = hojas.pop()
+        if v not in grado:
+            continue
+        del grado[v]
+        for w in grafo[v]:
+            if w in grado:
+                grado[w] -= 1
+                if grado[w] == 1:
+                    hojas.append(w)
+    return grado
+
+
+def es_bosque(grafo, corte):
+    """Comprueba que quitar el corte deja un grafo sin ciclos."""
+    return not nucleo_ciclico(grafo, set(grafo) - set(corte))
+
+
+def _quitar_redundantes(grafo, nodos, corte):
+    """
+    Devuelve a nodos - corte los nodos del corte que no cierran ningún
+    ciclo con el bosque restante, empezando por los de menor grado.
+    """
+    corte = set(corte)
+    for v in sorted(corte, key=lambda x: (len(grafo[x]), str(x))):
+        resto = nodos - corte
+        resto.add(v)
+        if not nucleo_ciclico(grafo, resto):
+            corte.discard(v)
+    return corte
+
+
+def encontrar_corte(grafo, mejorar=True):
+    """
+    Conjunto de corte de ciclos pequeño (aproximado): al quitarlo, el grafo
+    que queda es un bosque y se resuelve sin backtracking.
+
+    1. Voraz: mientras el 2-núcleo no esté vacío, se pasa al corte el nodo
+       de mayor grado dentro del núcleo. Las hojas y los nodos fuera de
+       ciclos nunca entran.
+    2. Mejora local: se eliminan los nodos redundantes y se prueban
+       intercambios de un nodo del corte por otro de los ciclos que abre;
+       se acepta el intercambio si permite quitar algún nodo más.
+
+    Args:
+        grafo: Diccionario {nodo: conjunto de vecinos}
+        mejorar: Aplicar la mejora local tras el voraz
+
+    Returns:
+        Conjunto de nodos del corte
+    """
+    orden = {v: k for k, v in enumerate(grafo)}  # Desempate determinista
+    corte = set()
+    nucleo = nucleo_ciclico(grafo, set(grafo))
+    # Los nodos fuera del 2-núcleo inicial no están en ningún ciclo: toda
+    # la búsqueda se hace dentro de él
+    ciclicos = set(nucleo)
+    while nucleo:
+        nodo = max(nucleo, key=lambda v: (nucleo[v], -orden[v]))
+        corte.add(nodo)
+        # Quitar nodos solo encoge el núcleo: basta recalcularlo dentro de él
+        restantes = set(nucleo)
+        restantes.discard(nodo)
+        nucleo = nucleo_ciclico(grafo, restantes)
+
+    if not mejorar:
+        return corte
+
+    corte = _quitar_redundantes(grafo, ciclicos, corte)
+    mejorado = True
+    while mejorado:
+        mejorado = False
+        for c in sorted(corte, key=orden.get):
+            # Nodos de los ciclos que reaparecen al liberar c
+            resto = ciclicos - corte
+            resto.add(c)
+            for u in sorted(nucleo_ciclico(grafo, resto), key=orden.get):
+                if u == c:
+                    continue
+                candidato = (corte - {c}) | {u}
+                if nucleo_ciclico(grafo, ciclicos - candidato):
+                    continue
+                candidato = _quitar_redundantes(grafo, ciclicos, candidato)
+                if len(candidato) < len(corte):
+                    corte, mejorado = candidato, True
+                    break
+            if mejorado:
+                break
+    return corte
+
+
+def preparar_corte(csp, estadisticas=None):
+    """
+    Corte de ciclos en el orden de csp.variables y el ArbolCSP del
+    bosque que queda al quitarlo (con las estadisticas indicadas).
+    """
+    en_corte = encontrar_corte(csp.grafo)
+    corte = [v for v in csp.variables if v in en_corte]
+    return corte, ArbolCSP(csp, corte, estadisticas)
+
+
+def acondicionamiento_corte(csp, contar=False, estadisticas=None):
+    """
+    Acondicionamiento del corte: recorre las asignaciones de un corte de
+    ciclos (preparar_corte) y resuelve o cuenta el bosque que queda para
+    cada una con el mismo ArbolCSP.
+
+    Args:
+        csp: Instancia de CSP
+        contar: Si es True, devuelve el número total de soluciones
+        estadisticas: Estadisticas donde acumular el esfuerzo (opcional)
+
+    Returns:
+        Diccionario {variable: valor}, None si no hay solución o, con
+        contar=True, el número de soluciones.
+    """
+    corte, arbol = preparar_corte(csp, estadisticas)
+    asignaciones_corte = itertools.product(*[csp.dominios[v] for v in corte])
+    if contar:
+        return sum(arbol.contar(dict(zip(corte, valores))) for valores in asignaciones_corte)
+    for valores in asignaciones_corte:
+        resultado = arbol.resolver(dict(zip(corte, valores)))
+        if resultado is not None:
+            return resultado
+    return None
+
+
+#############################
+# DESCOMPOSICIÓN EN ÁRBOL Y ELIMINACIÓN DE CUBOS
+#############################
+LIMITE_TABLA = 1 << 24  # Máximo de celdas de una tabla intermedia
+
+
+def grafo_interaccion(csp, ambitos=()):
+    """
+    Grafo primal por índices: dos variables son vecinas si comparten una
+    restricción o uno de los ámbitos extra (funciones de coste).
+
+    Returns:
+        Lista {índice: conjunto de índices vecinos}
+    """
+    vecinos = [{arco.destino for arco in arcos} for arcos in csp.arcos]
+    for ambito in ambitos:
+        for i in ambito:
+            vecinos[i].update(j for j in ambito if j != i)
+    return vecinos
+
+
+def orden_min_fill(grafo):
+    """
+    Orden de eliminación voraz min-fill: en cada paso se elimina la
+    variable cuya eliminación añade menos aristas entre sus vecinos
+    (desempate por grado y por índice). Solo cambia el relleno de los
+    vecinos de la eliminada y de los vecinos de estos, así que el resto
+    se queda en el montículo con su clave.
+
+    Args:
+        grafo: Lista {índice: conjunto de vecinos}
+
+    Returns:
+        Lista de índices en orden de eliminación.
+    """
+    vecinos = [set(v) for v in grafo]
+
+    def clave(v):
+        lista = list(vecinos[v])
+        relleno = sum(1 for k, x in enumerate(lista) for y in lista[k + 1:] if y not in vecinos[x])
+        return relleno, len(lista), v
+
+    actual = [clave(v) for v in range(len(vecinos))]
+    monticulo = list(actual)
+    heapq.heapify(monticulo)
+    eliminado = [False] * len(vecinos)
+    orden = []
+    while monticulo:
+        entrada = heapq.heappop(monticulo)
+        v = entrada[2]
+        if eliminado[v] or entrada != actual[v]:
+            continue  # Entrada obsoleta
+        eliminado[v] = True
+        orden.append(v)
+        vs = vecinos[v]
+        afectados = set(vs)
+        for x in vs:
+            vecinos[x].discard(v)
+            vecinos[x].update(y for y in vs if y != x)
+        for x in vs:
+            afectados |= vecinos[x]
+        for w in afectados:
+            nueva = clave(w)
+            if nueva != actual[w]:
+                actual[w] = nueva
+                heapq.heappush(monticulo, nueva)
+    return orden
+
+
+def descomposicion_arbol(csp, orden=None):
+    """
+    Descomposición en árbol inducida por un orden de eliminación (min-fill
+    por defecto): la bolsa de cada variable v es v más sus vecinos al
+    eliminarla en el grafo triangulado, y su padre es la bolsa de la
+    primera de esos vecinos que se elimina. La anchura (mayor bolsa menos
+    uno) acota el coste de la eliminación de cubos: O(n·d^(anchura+1)).
+
+    Returns:
+        Tupla (bolsas, padre, anchura): bolsas es una lista de tuplas de
+        variables (la primera es la eliminada), padre la posición de la
+        bolsa padre (None en las raíces).
+    """
+    grafo = grafo_interaccion(csp)
+    orden = orden_min_fill(grafo) if orden is None else [csp.indice[v] for v in orden]
+    posicion = {v: k for k, v in enumerate(orden)}
+    vecinos = [set(v) for v in grafo]
+    bolsas, padre = [], []
+    for v in orden:
+        posteriores = sorted(vecinos[v], key=posicion.__getitem__)
+        for x in posteriores:
+            vecinos[x].discard(v)
+            vecinos[x].update(y for y in posteriores if y != x)
+        bolsas.append(tuple(csp.variables[i] for i in [v] + posteriores))
+        padre.append(posicion[posteriores[0]] if posteriores else None)
+    anchura = max((len(b) for b in bolsas), default=1) - 1
+    return bolsas, padre, anchura
+
+
+class Factor:
+    """
+    Función sobre un subconjunto de variables guardada como tabla NumPy,
+    con un eje por variable en el orden de 'variables' (índices del CSP).
+    """
+    __slots__ = ('variables', 'tabla')
+
+    def __init__(self, variables, tabla):
+        self.variables = tuple(variables)
+        self.tabla = tabla
+
+    def alinear(self, ambito, posicion):
+        """
+        Vista de la tabla con un eje por variable de ambito, de tamaño 1 en
+        las que no usa, para combinarla con otras por difusión (broadcasting).
+        """
+        propias = sorted(range(len(self.variables)), key=lambda k: posicion[self.variables[k]])
+        tabla = self.tabla.transpose(propias)
+        forma = [1] * len(ambito)
+        for k, tam in zip(propias, tabla.shape):
+            forma[posicion[self.variables[k]]] = tam
+        return tabla.reshape(forma)
+
+
+def matriz_compatibilidad(csp, arco):
+    """Matriz booleana M[a, b]: ¿el valor a de arco.origen es compatible con el b de arco.destino?"""
+    if arco.matriz is not None:
+        return arco.matriz
+    n_i, n_j = len(csp.valores[arco.origen]), len(csp.valores[arco.destino])
+    return np.array([[bool(csp.compatibles(arco, a, b)) for b in range(n_j)] for a in range(n_i)],
+                    dtype=bool).reshape(n_i, n_j)
+
+
+def _tabla_coste(csp, indices, funcion):
+    """Tabla de una función de coste f(*valores) sobre las variables indicadas."""
+    dominios = [csp.valores[i] for i in indices]
+    valores = (funcion(*t) for t in itertools.product(*dominios))
+    return np.fromiter(valores, dtype=float, count=math.prod(map(len, dominios))).reshape(
+        [len(d) for d in dominios])
+
+
+def _eliminar_cubos(csp, factores, orden, combinar, marginar, neutro, dtype, guardar=False,
+                    estadisticas=None):
+    """
+    Eliminación de cubos genérica sobre un semianillo (combinar, marginar):
+    cada factor va al cubo de su variable que antes se elimina; al procesar
+    el cubo de v se combinan sus factores en una tabla sobre v y sus
+    vecinos posteriores (la bolsa de v) y se margina v, lo que deja un
+    mensaje para el cubo de la siguiente variable de su ámbito.
+
+    Args:
+        factores: Lista de Factor
+        orden: Lista de índices en orden de eliminación (todas las variables)
+        combinar: Operación (tabla, tabla) -> tabla (operator.mul, operator.add);
+                  con operadores de Python los escalares enteros no se desbordan
+        marginar: Reducción sobre un eje (np.sum, np.min, np.max)
+        neutro: Elemento neutro de combinar
+        dtype: Tipo de las tablas
+        guardar: Conservar la tabla de cada cubo para reconstruir el óptimo
+        estadisticas: Estadisticas donde contar como comprobaciones las
+                      celdas de las tablas combinadas (opcional)
+
+    Returns:
+        Tupla (valor, cubos guardados [(v, ámbito, tabla)]).
+
+    Raises:
+        ValueError: Si una tabla supera LIMITE_TABLA celdas
+    """
+    posicion = {v: k for k, v in enumerate(orden)}
+    cubos = [[] for _ in csp.variables]
+    constante = neutro
+    for factor in factores:
+        cubos[min(factor.variables, key=posicion.__getitem__)].append(factor)
+
+    guardados = []
+    for v in orden:
+        ambito = sorted({v}.union(*(f.variables for f in cubos[v])), key=posicion.__getitem__)
+        forma = [len(csp.valores[u]) for u in ambito]
+        if math.prod(forma) > LIMITE_TABLA:
+            raise ValueError(f"La tabla de {csp.variables[v]} tiene {math.prod(forma)} celdas: "
+                             f"anchura del orden demasiado grande")
+        local = {u: k for k, u in enumerate(ambito)}
+        tabla = np.full(forma, neutro, dtype=dtype)
+        for factor in cubos[v]:
+            tabla = combinar(tabla, factor.alinear(ambito, local))
+        if estadisticas is not None:
+            estadisticas.comprobaciones += tabla.size * len(cubos[v])
+        cubos[v] = None
+        if guardar:
+            guardados.append((v, ambito, tabla))
+        mensaje = marginar(tabla, axis=0)
+        if len(ambito) > 1:
+            cubos[ambito[1]].append(Factor(ambito[1:], mensaje))
+        else:
+            constante = combinar(constante, mensaje)
+    return constante, guardados
+
+
+def _factores_restricciones(csp, si, no, dtype):
+    """Un factor por restricción binaria: si en los pares compatibles, no en el resto."""
+    if csp.globales:
+        raise ValueError("La eliminación de cubos solo admite restricciones binarias")
+    factores = []
+    for arcos in csp.arcos:
+        for arco in arcos:
+            if arco.directa:
+                tabla = np.where(matriz_compatibilidad(csp, arco), si, no).astype(dtype)
+                factores.append(Factor((arco.origen, arco.destino), tabla))
+    return factores
+
+
+def contar_soluciones(csp, orden=None, estadisticas=None):
+    """
+    Número exacto de soluciones por eliminación de cubos con el semianillo
+    (+, ×) sobre tablas 0/1. Coste O(n·d^(anchura+1)) con la anchura del
+    orden de eliminación (min-fill por defecto).
+    Las tablas usan int64 si el producto de los tamaños de los dominios
+    cabe (ningún recuento parcial puede superarlo) y enteros de Python en
+    caso contrario.
+
+    Args:
+        csp: Instancia de CSP (solo restricciones binarias)
+        orden: Lista de variables en orden de eliminación (opcional)
+        estadisticas: Estadisticas donde contar el esfuerzo (opcional)
+
+    Returns:
+        Entero con el número de soluciones.
+    """
+    orden = orden_min_fill(grafo_interaccion(csp)) if orden is None else [csp.indice[v] for v in orden]
+    dtype = np.int64 if math.prod(len(vals) for vals in csp.valores) < 1 << 63 else object
+    factores = _factores_restricciones(csp, 1, 0, dtype)
+    total, _ = _eliminar_cubos(csp, factores, orden, operator.mul, np.sum, 1, dtype, estadisticas=estadisticas)
+    return int(total)
+
+
+def optimizar(csp, costes=None, orden=None, maximizar=False, estadisticas=None):
+    """
+    Asignación óptima de un CSP ponderado por eliminación de cubos con el
+    semianillo (min, +): minimiza la suma de las funciones de coste sobre
+    las asignaciones que cumplen las restricciones del CSP (coste infinito).
+    Tras la eliminación, se recorre el orden al revés eligiendo para cada
+    variable el valor óptimo de su cubo dados los valores ya fijados.
+
+    Args:
+        csp: Instancia de CSP (solo restricciones binarias)
+        costes: Diccionario {(var1, ..., vark): f(valor1, ..., valork) -> número}
+        orden: Lista de variables en orden de eliminación (opcional)
+        maximizar: Maximizar la suma (pesos) en lugar de minimizarla
+        estadisticas: Estadisticas donde contar el esfuerzo (opcional)
+
+    Returns:
+        Tupla (valor óptimo, asignación {variable: valor}); si no hay
+        solución, (inf, None) al minimizar o (-inf, None) al maximizar.
+    """
+    costes = costes or {}
+    ambitos = [tuple(csp.indice[v] for v in ambito) for ambito in costes]
+    if orden is None:
+        orden = orden_min_fill(grafo_interaccion(csp, ambitos))
+    else:
+        orden = [csp.indice[v] for v in orden]
+    peor = -np.inf if maximizar else np.inf
+    factores = _factores_restricciones(csp, 0.0, peor, float)
+    factores += [Factor(indices, _tabla_coste(csp, indices, funcion))
+                 for indices, funcion in zip(ambitos, costes.values())]
+    marginar = np.max if maximizar else np.min
+    optimo, cubos = _eliminar_cubos(csp, factores, orden, operator.add, marginar, 0.0, float, guardar=True,
+                                    estadisticas=estadisticas)
+    if np.isinf(optimo):
+        return float(optimo), None
+
+    elegir = np.argmax if maximizar else np.argmin
+    asignacion = [None] * len(csp.variables)
+    for v, ambito, tabla in reversed(cubos):
+        fijos = tuple(asignacion[u] for u in ambito[1:])
+        asignacion[v] = int(elegir(tabla[(slice(None),) + fijos]))
+    return float(optimo), csp.decodificar(asignacion)
+
+
+#############################
+# GENERADORES DE INSTANCIAS
+#############################
+class RestriccionExtensional:
+    """
+    Restricción binaria dada por su tabla de pares prohibidos.
+    A diferencia de una lambda, se puede serializar (pickle) para
+    enviarla a otros procesos.
+    """
+
+    def __init__(self, prohibidos):
+        self.prohibidos = frozenset(prohibidos)
+
+    def __call__(self, a, b):
+        return (a, b) not in self.prohibidos
+
+    def tabla(self, vals_i, vals_j):
+        """Matriz de compatibilidad construida solo a partir de los pares prohibidos."""
+        pos_i = dict(zip(vals_i, range(len(vals_i))))
+        pos_j = dict(zip(vals_j, range(len(vals_j))))
+        if len(pos_i) < len(vals_i) or len(pos_j) < len(vals_j):  # Valores repetidos
+            return np.array([[self(x, y) for y in vals_j] for x in vals_i], dtype=bool).reshape(
+                len(vals_i), len(vals_j))
+        matriz = np.ones((len(vals_i), len(vals_j)), dtype=bool)
+        pares = [(pos_i[x], pos_j[y]) for x, y in self.prohibidos if x in pos_i and y in pos_j]
+        if pares:
+            filas, columnas = zip(*pares)
+            matriz[filas, columnas] = False
+        return matriz
+
+
+def tension_critica(n, d, p1):
+    """
+    Tensión p2 en la transición de fase del modelo B (kappa = 1):
+    p2 = 1 - d ** (-2 / (p1 * (n - 1))). Cerca de ella están las
+    instancias más difíciles.
+    """
+    return 1 - d ** (-2 / (p1 * (n - 1)))
+
+
+def generar_modelo_b(n, d, p1, p2, rng=random):
+    """
+    CSP binario aleatorio del modelo B <n, d, p1, p2>: exactamente
+    round(p1 * n(n-1)/2) restricciones, cada una con round(p2 * d²)
+    pares de valores prohibidos elegidos al azar.
+
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
+    """
+    variables = [f'X{i}' for i in range(n)]
+    pares = [(i, j) for i in range(n) for j in range(i + 1, n)]
+    todos = [(a, b) for a in range(d) for b in range(d)]
+    restricciones = {}
+    for i, j in rng.sample(pares, round(p1 * len(pares))):
+        prohibidos = rng.sample(todos, round(p2 * d * d))
+        restricciones[(variables[i], variables[j])] = RestriccionExtensional(prohibidos)
+    dominios = {v: list(range(d)) for v in variables}
+    return variables, dominios, restricciones
+
+
+def distintos(a, b):
+    """Restricción de coloreo: dos vecinos no comparten color."""
+    return a != b
+
+
+def generar_coloreo(n, colores=4, grado_medio=6, rng=random):
+    """
+    Coloreo de un grafo aleatorio de n nodos con una solución plantada:
+    se reparte un color oculto a cada nodo y solo se añaden aristas entre
+    nodos de distinto color, de modo que el problema siempre es resoluble.
+
+    Returns:
+        Tupla (variables, dominios, restricciones) para construir un CSP.
+    """
+    variables = [f'N{i}' for i in range(n)]
+    oculto = [rng.randrange(colores) for _ in range(n)]
+    restricciones = {}
+    while len(restricciones) < n * grado_medio // 2:
+        i, j = rng.sample(range(n), 2)
+        if oculto[i] != oculto[j] and (variables[j], variables[i]) not in restricciones:
+            restricciones[(variables[i], variables[j])] = distintos
+    dominios = {v: list(range(colores)) for v in variables}
+    return variables, dominios, restricciones
+
+
+def reinas(n):
+    """
+    n reinas con restricciones globales: la reina de la fila k está en la
+    columna x_k, las columnas son todas distintas y también lo son las
+    diagonales x_k + k y x_k - k. Todas las variables comparten el mismo
+    dominio, así que el modelo ocupa O(n) memoria.
+
+    Returns:
+        Tupla (variables, dominios, restricciones, globales) para construir un CSP.
+    """
+    variables = list(range(n))
+    dominios = dict.fromkeys(variables, range(n))
+    globales = [
+        TodosDistintos(variables),
+        TodosDistintos(variables, desplazamientos=range(n)),
+        TodosDistintos(variables, desplazamientos=range(0, -n, -1)),
+    ]
+    return variables, dominios, {}, globales
+
+
+#############################
+# ARCHIVOS DE INSTANCIAS
+#############################
+# Formato de texto: una línea JSON por registro (comprimido con gzip si la
+# ruta acaba en .gz). Cada registro solo usa identificadores de líneas
+# anteriores, así que el archivo se lee de principio a fin sin cargarlo:
+#   {"dominio": 0, "valores": ["Rojo", "Verde", "Azul"]}
+#   {"variables": ["WA", "NT", "SA"], "dominio": 0}
+#   {"relacion": 0, "dominios": [0, 0], "prohibidos": [[0, 0], [1, 1], [2, 2]]}
+#   {"restricciones": [["WA", "NT"], ["WA", "SA"]], "relacion": 0}
+# Una relación es una tabla sobre las posiciones de los valores en los
+# dominios de su ámbito (con "prohibidos" o "permitidos", la lista más
+# corta) y la comparten todas las restricciones que la usan.
+# Formato binario (.npz): los mismos datos como arrays de NumPy
+# (ver _escribir_npz).
+BLOQUE_ARCHIVO = 10000  # Variables o restricciones por línea del formato de texto
+
+
+class RestriccionTabla:
+    """
+    Restricción binaria dada por su matriz de compatibilidad M[a, b] sobre
+    las posiciones de dos listas de valores (los dominios de su ámbito).
+    La matriz pasa tal cual a la compilación del CSP y, como
+    RestriccionExtensional, se puede serializar.
+    """
+
+    def __init__(self, matriz, vals_i, vals_j):
+        self.matriz = np.asarray(matriz, dtype=bool)
+        self.vals_i = vals_i
+        self.vals_j = vals_j
+        self.posiciones = None  # Se construyen en la primera llamada
+
+    def __call__(self, x, y):
+        if self.posiciones is None:
+            self.posiciones = ({valor: a for a, valor in enumerate(self.vals_i)},
+                               {valor: b for b, valor in enumerate(self.vals_j)})
+        a, b = self.posiciones[0].get(x), self.posiciones[1].get(y)
+        return a is not None and b is not None and bool(self.matriz[a, b])
+
+    def tabla(self, vals_i, vals_j):
+        """La propia matriz si los dominios coinciden con los de la relación."""
+        if list(vals_i) == list(self.vals_i) and list(vals_j) == list(self.vals_j):
+            return self.matriz
+        return np.array([[self(x, y) for y in vals_j] for x in vals_i], dtype=bool).reshape(
+            len(vals_i), len(vals_j))
+
+
+def _abrir(ruta, modo):
+    """Abre un archivo de texto UTF-8, comprimido con gzip si la ruta acaba en .gz."""
+    if ruta.endswith('.gz'):
+        # Nivel 6: casi la misma compresión que el 9 por defecto en mucho menos tiempo
+        return gzip.open(ruta, modo + 't', compresslevel=6, encoding='utf-8')
+    return open(ruta, modo, encoding='utf-8')
+
+
+def _comprobar_escalares(valores, que):
+    """Los nombres y valores del archivo deben ser enteros, reales o texto."""
+    for valor in valores:
+        if not isinstance(valor, (int, float, str)):
+            raise ValueError(f"{que} no representable en el archivo: {valor!r}")
+
+
+def _describir_csp(csp):
+    """
+    Descripción tabular de un CSP binario (la que se escribe en disco):
+    - variables: Lista de nombres
+    - dominios: Listas de valores distintas
+    - dominio_de: Índice del dominio de cada variable
+    - tablas: Lista de (dominio_i, dominio_j, matriz booleana) sin repetir
+    - ambitos: Array (m, 2) de índices de variable de cada restricción
+    - relacion_de: Índice de la tabla de cada restricción
+
+    Raises:
+        ValueError: Si hay restricciones globales, restricciones que no se
+                    pueden compilar o nombres/valores no representables
+    """
+    if csp.globales:
+        raise ValueError("El formato de archivo solo admite restricciones binarias")
+    _comprobar_escalares(csp.variables, "Variable")
+    dominios, dominio_de, por_contenido, por_lista = [], [], {}, {}
+    for vals in csp.valores:
+        if id(vals) not in por_lista:
+            clave = tuple(vals)
+            if clave not in por_contenido:
+                _comprobar_escalares(vals, "Valor")
+                por_contenido[clave] = len(dominios)
+                dominios.append(list(vals))
+            por_lista[id(vals)] = por_contenido[clave]
+        dominio_de.append(por_lista[id(vals)])
+
+    tablas, por_matriz, por_tabla = [], {}, {}
+    ambitos, relacion_de = [], []
+    for arcos in csp.arcos:
+        for arco in arcos:
+            if not arco.directa:
+                continue
+            i, j = arco.origen, arco.destino
+            matriz = arco.matriz
+            if matriz is None:
+                matriz = compilar_tabla(arco.restriccion, csp.valores[i], csp.valores[j])
+                if matriz is None:
+                    raise ValueError(f"La restricción {csp.variables[i]} - {csp.variables[j]} "
+                                     f"es demasiado grande para escribirla como tabla")
+            # Las tablas compiladas ya se comparten: basta comparar el
+            # contenido una vez por matriz distinta
+            if id(matriz) not in por_matriz:
+                clave = (dominio_de[i], dominio_de[j], matriz.tobytes())
+                if clave not in por_tabla:
+                    por_tabla[clave] = len(tablas)
+                    tablas.append((dominio_de[i], dominio_de[j], matriz))
+                por_matriz[id(matriz)] = (por_tabla[clave], matriz)  # La referencia evita reusar el id
+            ambitos.append((i, j))
+            relacion_de.append(por_matriz[id(matriz)][0])
+    return {'variables': csp.variables, 'dominios': dominios, 'dominio_de': dominio_de, 'tablas': tablas,
+            'ambitos': np.array(ambitos, dtype=np.int64).reshape(-1, 2),
+            'relacion_de': np.array(relacion_de, dtype=np.int64)}
+
+
+def _escribir_lineas(instancia, f):
+    """Escribe una instancia (ver _describir_csp) en el formato de texto."""
+    def escribir(registro):
+        f.write(json.dumps(registro, ensure_ascii=False, separators=(',', ':')))
+        f.write('\n')
+
+    variables = instancia['variables']
+    for k, vals in enumerate(instancia['dominios']):
+        escribir({'dominio': k, 'valores': vals})
+    # Tramos consecutivos de variables con el mismo dominio, en bloques
+    inicio = 0
+    for fin in range(1, len(variables) + 1):
+        if (fin == len(variables) or fin - inicio == BLOQUE_ARCHIVO
+                or instancia['dominio_de'][fin] != instancia['dominio_de'][inicio]):
+            escribir({'variables': variables[inicio:fin], 'dominio': instancia['dominio_de'][inicio]})
+            inicio = fin
+
+    for r, (d_i, d_j, matriz) in enumerate(instancia['tablas']):
+        registro = {'relacion': r, 'dominios': [d_i, d_j]}
+        prohibidos = np.argwhere(~matriz)
+        if 2 * len(prohibidos) <= matriz.size:
+            registro['prohibidos'] = prohibidos.tolist()
+        else:
+            registro['permitidos'] = np.argwhere(matriz).tolist()
+        escribir(registro)
+
+    # Restricciones agrupadas por relación, en bloques
+    orden = np.argsort(instancia['relacion_de'], kind='stable')
+    relacion_de = instancia['relacion_de'][orden]
+    ambitos = instancia['ambitos'][orden]
+    cortes = np.flatnonzero(np.diff(relacion_de)) + 1
+    for tramo in np.split(np.arange(len(orden)), cortes):
+        for inicio in range(0, len(tramo), BLOQUE_ARCHIVO):
+            bloque = tramo[inicio:inicio + BLOQUE_ARCHIVO]
+            escribir({'restricciones': [[variables[i], variables[j]] for i, j in ambitos[bloque].tolist()],
+                      'relacion': int(relacion_de[bloque[0]])})
+
+
+def _escribir_npz(instancia, ruta):
+    """
+    Escribe una instancia en un .npz comprimido con los arrays:
+    - variables: Nombres de las variables
+    - dominio_de: Índice del dominio de cada variable
+    - valores, dominio_inicio: Valores de todos los dominios seguidos y
+      dónde empieza cada uno (dominio k = valores[inicio[k]:inicio[k+1]])
+    - tabla_dominios: Par de dominios (i, j) de cada tabla
+    - tablas: Todas las matrices aplanadas y seguidas (la forma sale de
+      los tamaños de sus dominios)
+    - ambitos, relacion_de: Índices de variable y tabla de cada restricción
+    """
+    def array(valores, que):
+        resultado = np.asarray(valores)
+        if resultado.dtype.kind not in 'biufU' or resultado.tolist() != list(valores):
+            raise ValueError(f"{que} de tipos mezclados: use el formato de texto")
+        return resultado
+
+    dominios = instancia['dominios']
+    valores = [valor for vals in dominios for valor in vals]
+    tablas = instancia['tablas']
+    np.savez_compressed(
+        ruta,
+        variables=array(instancia['variables'], "Variables"),
+        dominio_de=np.asarray(instancia['dominio_de'], dtype=np.int64),
+        valores=array(valores, "Valores") if valores else np.empty(0, dtype=np.int64),
+        dominio_inicio=np.cumsum([0] + [len(vals) for vals in dominios], dtype=np.int64),
+        tabla_dominios=np.array([(d_i, d_j) for d_i, d_j, _ in tablas], dtype=np.int64).reshape(-1, 2),
+        tablas=(np.concatenate([np.ravel(matriz) for _, _, matriz in tablas]) if tablas
+                else np.empty(0, dtype=bool)),
+        ambitos=instancia['ambitos'],
+        relacion_de=instancia['relacion_de'],
+    )
+
+
+def _anadir_restriccion(restricciones, ambito, relacion):
+    """Añade una restricción; si el ámbito ya tiene una, se quedan los pares que cumplen ambas."""
+    previa = restricciones.get(ambito)
+    if previa is not None:
+        relacion = RestriccionTabla(previa.matriz & relacion.matriz, relacion.vals_i, relacion.vals_j)
+    restricciones[ambito] = relacion
+
+
+def _leer_lineas(f, compilar):
+    """Construye un CSP leyendo el formato de texto línea a línea."""
+    dominios, relaciones, dominio_de = [], [], {}
+    variables, restricciones = [], {}
+    for numero, linea in enumerate(f, 1):
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+            if 'valores' in registro:
+                if registro['dominio'] != len(dominios):
+                    raise ValueError("dominios fuera de orden")
+                dominios.append(registro['valores'])
+            elif 'variables' in registro:
+                dominio = registro['dominio']
+                for v in registro['variables']:
+                    dominio_de[v] = dominio
+                    variables.append(v)
+            elif 'relacion' in registro and 'dominios' in registro:
+                if registro['relacion'] != len(relaciones):
+                    raise ValueError("relaciones fuera de orden")
+                d_i, d_j = registro['dominios']
+                vals_i, vals_j = dominios[d_i], dominios[d_j]
+                permitidos = 'permitidos' in registro
+                matriz = np.full((len(vals_i), len(vals_j)), not permitidos)
+                pares = np.array(registro['permitidos' if permitidos else 'prohibidos'], dtype=np.int64)
+                if pares.size:
+                    matriz[pares[:, 0], pares[:, 1]] = permitidos
+                relaciones.append((d_i, d_j, RestriccionTabla(matriz, vals_i, vals_j)))
+            elif 'restricciones' in registro:
+                d_i, d_j, relacion = relaciones[registro['relacion']]
+                for v1, v2 in registro['restricciones']:
+                    if dominio_de[v1] != d_i or dominio_de[v2] != d_j:
+                        raise ValueError(f"los dominios de {v1} y {v2} no son los de la relación")
+                    _anadir_restriccion(restricciones, (v1, v2), relacion)
+            else:
+                raise ValueError("registro desconocido")
+        except (KeyError, IndexError, TypeError, ValueError) as error:
+            raise ValueError(f"Línea {numero} no válida: {error!r}") from error
+    return CSP(variables, {v: dominios[dominio_de[v]] for v in variables}, restricciones, compilar=compilar)
+
+
+def _leer_npz(ruta, compilar):
+    """Construye un CSP a partir de un .npz escrito por _escribir_npz."""
+    with np.load(ruta, allow_pickle=False) as datos:
+        variables = datos['variables'].tolist()
+        valores, inicio = datos['valores'].tolist(), datos['dominio_inicio'].tolist()
+        dominios = [valores[inicio[k]:inicio[k + 1]] for k in range(len(inicio) - 1)]
+        dominio_de = datos['dominio_de'].tolist()
+        relaciones, desde, planas = [], 0, datos['tablas']
+        for d_i, d_j in datos['tabla_dominios'].tolist():
+            forma = (len(dominios[d_i]), len(dominios[d_j]))
+            matriz = planas[desde:desde + forma[0] * forma[1]].reshape(forma)
+            desde += matriz.size
+            relaciones.append(RestriccionTabla(matriz, dominios[d_i], dominios[d_j]))
+        restricciones = {}
+        for (i, j), r in zip(datos['ambitos'].tolist(), datos['relacion_de'].tolist()):
+            _anadir_restriccion(restricciones, (variables[i], variables[j]), relaciones[r])
+    return CSP(variables, {v: dominios[d] for v, d in zip(variables, dominio_de)}, restricciones,
+               compilar=compilar)
+
+
+def guardar_instancia(csp, ruta):
+    """
+    Guarda un CSP binario en disco: formato binario si la ruta acaba en
+    .npz y de texto (líneas JSON, .gz para comprimir) en otro caso. Cada
+    restricción se escribe como su tabla compilada.
+
+    Raises:
+        ValueError: Si el CSP no se puede representar (ver _describir_csp)
+    """
+    instancia = _describir_csp(csp)
+    if ruta.endswith('.npz'):
+        _escribir_npz(instancia, ruta)
+        return
+    with _abrir(ruta, 'w') as f:
+        _escribir_lineas(instancia, f)
+
+
+def cargar_instancia(ruta, compilar=True):
+    """
+    Lee un CSP guardado con guardar_instancia (o escrito por otro programa
+    en el mismo formato). El de texto se procesa línea a línea; en ambos
+    las restricciones son RestriccionTabla cuyas matrices se usan
+    directamente como tablas compiladas.
+
+    Args:
+        ruta: Archivo .npz, de líneas JSON o de líneas JSON con gzip (.gz)
+        compilar: Precalcular las máscaras de soporte (ver CSP)
+
+    Returns:
+        Instancia de CSP.
+
+    Raises:
+        ValueError: Si el archivo de texto tiene una línea no válida
+    """
+    if ruta.endswith('.npz'):
+        return _leer_npz(ruta, compilar)
+    with _abrir(ruta, 'r') as f:
+        return _leer_lineas(f, compilar)
+
+
+def guardar_solucion(solucion, ruta):
+    """
+    Guarda una solución {variable: valor} como JSON compacto (.gz para
+    comprimir): dos listas paralelas, para que las variables puedan ser
+    enteros.
+    """
+    with _abrir(ruta, 'w') as f:
+        json.dump({'variables': list(solucion), 'valores': list(solucion.values())}, f,
+                  ensure_ascii=False, separators=(',', ':'))
+
+
+def cargar_solucion(ruta):
+    """Lee una solución guardada con guardar_solucion."""
+    with _abrir(ruta, 'r') as f:
+        datos = json.load(f)
+    return dict(zip(datos['variables'], datos['valores']))
+
+
+def escribir_modelo_b(ruta, n, d, p1, p2, semilla=None):
+    """
+    Escribe en disco una instancia del modelo B <n, d, p1, p2> (ver
+    generar_modelo_b) sin construir el CSP: las parejas de variables y las
+    tablas se generan con NumPy, por bloques, así que sirve para instancias
+    de 10^5 variables con p1 pequeño. No reproduce las instancias de
+    generar_modelo_b con la misma semilla.
+
+    Args:
+        ruta: Archivo de destino (.npz o de texto, ver guardar_instancia)
+        n, d, p1, p2: Parámetros del modelo B
+        semilla: Semilla del generador de NumPy
+    """
+    rng = np.random.default_rng(semilla)
+    total = n * (n - 1) // 2
+    m = round(p1 * total)
+    k = round(p2 * d * d)
+
+    # Parejas i < j numeradas por filas: la fila i empieza en
+    # i·(2n - i - 1)/2; se invierte con la fórmula cuadrática y se corrige
+    # el redondeo
+    pares = np.sort(rng.choice(total, size=m, replace=False))
+    i = ((2 * n - 1 - np.sqrt((2 * n - 1) ** 2 - 8 * pares.astype(np.float64))) // 2).astype(np.int64)
+    i = np.clip(i, 0, max(n - 2, 0))
+    inicio_fila = lambda fila: fila * (2 * n - fila - 1) // 2
+    i -= inicio_fila(i) > pares
+    i += inicio_fila(i + 1) <= pares
+    j = pares - inicio_fila(i) + i + 1
+
+    # Cada restricción prohíbe k pares al azar: los k primeros de una
+    # permutación aleatoria de las d² posiciones
+    tablas = np.ones((m, d * d), dtype=bool)
+    for desde in range(0, m, BLOQUE_ARCHIVO):
+        bloque = tablas[desde:desde + BLOQUE_ARCHIVO]
+        prohibidos = np.argsort(rng.random(bloque.shape), axis=1)[:, :k]
+        np.put_along_axis(bloque, prohibidos, False, axis=1)
+    tablas = tablas.reshape(m, d, d)
+
+    instancia = {'variables': [f'X{v}' for v in range(n)], 'dominios': [list(range(d))],
+                 'dominio_de': [0] * n, 'tablas': [(0, 0, tabla) for tabla in tablas],
+                 'ambitos': np.stack([i, j], axis=1), 'relacion_de': np.arange(m, dtype=np.int64)}
+    if ruta.endswith('.npz'):
+        _escribir_npz(instancia, ruta)
+        return
+    with _abrir(ruta, 'w') as f:
+        _escribir_lineas(instancia, f)
+
+
+#############################
+# BÚSQUEDA LOCAL
+#############################
+class ConjuntoAleatorio:
+    """
+    Conjunto de enteros con inserción, borrado y muestra uniforme en O(1):
+    lista de elementos más un índice {elemento: posición}. Para borrar se
+    mueve el último elemento al hueco.
+    """
+
+    def __init__(self):
+        self.elementos = []
+        self.posicion = {}
+
+    def __contains__(self, x):
+        return x in self.posicion
+
+    def __len__(self):
+        return len(self.elementos)
+
+    def anadir(self, x):
+        if x not in self.posicion:
+            self.posicion[x] = len(self.elementos)
+            self.elementos.append(x)
+
+    def quitar(self, x):
+        pos = self.posicion.pop(x, None)
+        if pos is not None:
+            ultimo = self.elementos.pop()
+            if pos < len(self.elementos):
+                self.elementos[pos] = ultimo
+                self.posicion[ultimo] = pos
+
+    def muestra(self, rng=random):
+        return self.elementos[rng.randrange(len(self.elementos))]
+
+
+class MinimosConflictos:
+    def __init__(self, csp, rng=random, tabu=10, paseo=0.02, muestra=200):
+        """
+        Motor incremental de mínimos conflictos.
+
+        - conflictos: {variable: [número de vecinos incompatibles con cada valor]}
+          según los valores actuales de los vecinos (None si la variable no
+          tiene restricciones binarias). Al mover una variable solo se
+          actualizan los valores incompatibles de sus vecinos (con soportes
+          precompilados, los bits de ~soportes[b]).
+        - Las restricciones globales llevan sus propios contadores O(1)
+          (ver RestriccionGlobal) y se suman al coste de cada valor.
+        - conflictivas: Variables cuyo valor actual tiene conflictos, en un
+          ConjuntoAleatorio para elegir una al azar en O(1)
+        - violadas: Restricciones binarias violadas por la asignación actual
+        - estadisticas: nodos (cambios de valor), comprobaciones (arcos y
+          restricciones globales cuyos contadores se actualizan al mover)
+
+        Args:
+            csp: Instancia de CSP
+            rng: Generador aleatorio
+            tabu: Iteraciones durante las que una variable no puede volver
+                  al valor que acaba de abandonar (salvo que no tenga conflictos)
+            paseo: Probabilidad de mover la variable a un valor aleatorio
+                   (paseo aleatorio para salir de mesetas)
+            muestra: En dominios mayores solo se evalúan este número de
+                     valores candidatos (al azar o sugeridos por las
+                     restricciones globales) en cada paso
+        """
+        self.csp = csp
+        self.rng = rng
+        self.tabu = tabu
+        self.paseo = paseo
+        self.muestra = muestra
+        n = len(csp.variables)
+        self.asignacion = [None] * n
+        self.conflictos = [[0] * len(csp.valores[i]) if csp.arcos[i] else None for i in range(n)]
+        self.conflictivas = ConjuntoAleatorio()
+        self.violadas = 0
+        self.prohibido_hasta = {}  # {(variable, valor): iteración en que deja de ser tabú}
+        self.iteracion = 0
+        self._incompatibles = {}
+        self.estadisticas = Estadisticas()
+        for g in csp.globales:
+            g.reiniciar(csp)
+
+    def incompatibles(self, arco, b):
+        """
+        Valores de arco.destino incompatibles con el valor b de arco.origen.
+        Se memorizan por máscara si el arco está compilado (muchas
+        restricciones comparten las mismas, p. ej. las de desigualdad) y
+        por (arco, b) si no.
+        """
+        if arco.soportes is not None:
+            clave = ~arco.soportes[b] & ((1 << len(self.csp.valores[arco.destino])) - 1)
+        else:
+            clave = (arco, b)
+        valores = self._incompatibles.get(clave)
+        if valores is None:
+            if arco.soportes is not None:
+                valores = list(bits(clave))
+            else:
+                valores = [a for a in range(len(self.csp.valores[arco.destino]))
+                           if not self.csp.compatibles(arco, b, a)]
+            self._incompatibles[clave] = valores
+        return valores
+
+    def coste(self, i, a):
+        """Conflictos de la variable i con el valor a frente a los valores actuales."""
+        contadores = self.conflictos[i]
+        c = contadores[a] if contadores is not None else 0
+        globales = self.csp.globales_de[i]
+        if globales:
+            valores = self.csp.valores[i]
+            actual = self.asignacion[i]
+            x, x_actual = valores[a], (valores[actual] if actual is not None else None)
+            for g, k in globales:
+                c += g.coste(k, x, x_actual)
+        return c
+
+    def _actualizar(self, i):
+        """Mete o saca a i de las conflictivas según el coste de su valor actual."""
+        if self.coste(i, self.asignacion[i]):
+            self.conflictivas.anadir(i)
+        else:
+            self.conflictivas.quitar(i)
+
+    def _propagar(self, j, b, signo):
+        """Suma (o resta) en los contadores de los vecinos de j el efecto de j = b."""
+        asignacion, conflictos, globales_de = self.asignacion, self.conflictos, self.csp.globales_de
+        self.estadisticas.comprobaciones += len(self.csp.arcos[j])
+        for arco in self.csp.arcos[j]:
+            i = arco.destino
+            contadores = conflictos[i]
+            actual = asignacion[i]
+            for a in self.incompatibles(arco, b):
+                contadores[a] += signo
+                if a == actual:
+                    self.violadas += signo
+                    if globales_de[i]:
+                        self._actualizar(i)
+                    elif contadores[a]:
+                        self.conflictivas.anadir(i)
+                    else:
+                        self.conflictivas.quitar(i)
+
+    def mover(self, i, a):
+        """Cambia el valor de i a a actualizando contadores y conflictivas."""
+        anterior = self.asignacion[i]
+        if anterior == a:
+            return
+        self.estadisticas.nodos += 1
+        if anterior is not None:
+            self._propagar(i, anterior, -1)
+        self.asignacion[i] = a
+        self._propagar(i, a, 1)
+        valores, asignacion = self.csp.valores[i], self.asignacion
+        self.estadisticas.comprobaciones += len(self.csp.globales_de[i])
+        for g, k in self.csp.globales_de[i]:
+            afectadas = g.quitar(k, valores[anterior]) if anterior is not None else ()
+            for m in (*afectadas, *g.anadir(k, valores[a])):
+                j = g.indices[m]
+                if j != i and asignacion[j] is not None:
+                    self._actualizar(j)
+        self._actualizar(i)
+
+    def iniciar(self, voraz=True):
+        """
+        Asignación inicial en orden aleatorio. Con voraz=True cada variable
+        toma el valor con menos conflictos respecto a las ya colocadas
+        (desempate aleatorio); si no, un valor al azar.
+        """
+        rng = self.rng
+        orden = list(range(len(self.asignacion)))
+        rng.shuffle(orden)
+        for i in orden:
+            if voraz:
+                a = self._mejor_valor(i, permitir_tabu=True)
+            else:
+                a = rng.randrange(len(self.csp.valores[i]))
+            self.mover(i, a)
+
+    def _candidato(self, i):
+        """Valor al azar para i; la mitad de las veces, uno sugerido por sus restricciones globales."""
+        rng = self.rng
+        if rng.random() < 0.5:
+            for g, _ in self.csp.globales_de[i]:
+                x = g.sugerir(rng)
+                if x is not None:
+                    a = self.csp.id_valor[i].get(x)
+                    if a is not None:
+                        return a
+        return rng.randrange(len(self.csp.valores[i]))
+
+    def _mejor_valor(self, i, permitir_tabu=False):
+        """
+        Valor de i con menos conflictos (no tabú), con desempate aleatorio.
+        En dominios mayores que 'muestra' se evalúan solo candidatos
+        sorteados y se acepta el primero sin conflictos.
+        """
+        d = len(self.csp.valores[i])
+        prohibido_hasta, iteracion = self.prohibido_hasta, self.iteracion
+        muestreo = d > self.muestra
+        if muestreo:
+            candidatos_valor = (self._candidato(i) for _ in range(self.muestra))
+        elif self.csp.globales_de[i] or self.conflictos[i] is None:
+            candidatos_valor = range(d)
+        else:
+            candidatos_valor = None  # Solo restricciones binarias: se leen los contadores
+        mejor, candidatos = None, []
+        iterable = enumerate(self.conflictos[i]) if candidatos_valor is None else \
+            ((a, self.coste(i, a)) for a in candidatos_valor)
+        for a, c in iterable:
+            if mejor is not None and c > mejor:
+                continue
+            if (not permitir_tabu and c and
+                    prohibido_hasta.get((i, a), 0) > iteracion):
+                continue
+            if muestreo and c == 0:
+                return a
+            if mejor is None or c < mejor:
+                mejor, candidatos = c, [a]
+            else:
+                candidatos.append(a)
+        if not candidatos:
+            return self.rng.randrange(d)
+        return candidatos[0] if len(candidatos) == 1 else self.rng.choice(candidatos)
+
+    def paso(self):
+        """Mueve una variable conflictiva elegida al azar."""
+        self.iteracion += 1
+        i = self.conflictivas.muestra(self.rng)
+        anterior = self.asignacion[i]
+        if self.rng.random() < self.paseo:
+            a = self.rng.randrange(len(self.csp.valores[i]))
+        else:
+            a = self._mejor_valor(i)
+        if a != anterior:
+            self.prohibido_hasta[(i, anterior)] = self.iteracion + self.tabu
+            self.mover(i, a)
+
+    def resolver(self, max_iter=1000, voraz=True):
+        """
+        Returns:
+            Diccionario {variable: valor} o None si no converge en max_iter.
+        """
+        self.iniciar(voraz)
+        for _ in range(max_iter):
+            if not self.conflictivas:
+                return self.csp.decodificar(self.asignacion)
+            self.paso()
+        if not self.conflictivas:
+            return self.csp.decodificar(self.asignacion)
+        return None
+
+
+def minimos_conflictos(csp, max_iter=1000, rng=random, tabu=10, paseo=0.02, voraz=True):
+    """
+    Mínimos conflictos sobre la representación entera del CSP
+    (ver MinimosConflictos).
+
+    Returns:
+        Diccionario {variable: valor} o None si no converge en max_iter.
+    """
+    return MinimosConflictos(csp, rng, tabu, paseo).resolver(max_iter, voraz)
+
+
+#############################
+# PORTAFOLIO DE SOLUCIONADORES
+#############################
+def _minimos_conflictos_reiniciado(csp, semilla):
+    """
+    Mínimos conflictos con reinicios aleatorios hasta converger: nunca
+    demuestra que no hay solución, así que solo termina al encontrarla (o
+    cuando el portafolio lo detiene al vencer el plazo).
+    """
+    rng = random.Random(semilla)
+    max_iter = max(1000, 20 * len(csp.variables))
+    while True:
+        solucion = minimos_conflictos(csp, max_iter, rng)
+        if solucion is not None:
+            return solucion
+
+
+# Estrategias del portafolio: nombre -> (función(csp, semilla), completa,
+# usa la semilla). Una estrategia completa que devuelve None demuestra que
+# no hay solución; las que no usan la semilla se lanzan una sola vez.
+ESTRATEGIAS = {
+    'fc': (lambda csp, semilla: resolver(csp, 'fc', semilla=semilla), True, True),
+    'mac-wdeg': (lambda csp, semilla: resolver(csp, 'mac', variables='dom/wdeg', reinicios='luby',
+                                               semilla=semilla), True, True),
+    'cbj': (lambda csp, semilla: resolver(csp, 'fc', semilla=semilla, retroceso='cbj'), True, True),
+    'minimos-conflictos': (_minimos_conflictos_reiniciado, False, True),
+    'corte': (lambda csp, semilla: acondicionamiento_corte(csp), True, False),
+}
+
+
+def _ejecutar_estrategia(csp, nombre, semilla, cola):
+    """
+    Cuerpo de cada proceso del portafolio: ejecuta una estrategia y deja
+    en la cola (nombre, semilla, estado, solución, segundos). Las
+    estrategias que no admiten el CSP (p. ej. CBJ con restricciones
+    globales) o que fallan con cualquier otra excepción devuelven estado
+    'error' con el mensaje en lugar de solución.
+    """
+    inicio = time.perf_counter()
+    try:
+        solucion = ESTRATEGIAS[nombre][0](csp, semilla)
+        estado = 'resuelto' if solucion is not None else 'sin solución'
+    except (ValueError, RecursionError) as error:
+        solucion, estado = str(error), 'error'
+    except Exception as error:
+        solucion, estado = f'{type(error).__name__}: {error}', 'error'
+    cola.put((nombre, semilla, estado, solucion, time.perf_counter() - inicio))
+
+
+def portafolio(csp, estrategias=None, semillas=(0,), plazo=60.0, registro=None, familia=None):
+    """
+    Lanza varias estrategias (y semillas) en procesos separados sobre el
+    mismo CSP con un plazo común. Gana la primera que encuentra solución
+    o, si es completa, la que demuestra que no la hay; los demás procesos
+    se detienen en ese momento o al vencer el plazo.
+
+    Con el método de arranque 'spawn' (Windows, macOS) el CSP se serializa
+    con pickle: las restricciones no pueden ser lambdas (ver
+    RestriccionExtensional) y el programa principal debe ir protegido con
+    if __name__ == "__main__".
+
+    Args:
+        csp: Instancia de CSP
+        estrategias: Nombres de ESTRATEGIAS (None = todas), p. ej. las
+                     registro.preferidas(familia) de ejecuciones anteriores
+        semillas: Semillas de las estrategias aleatorias (una ejecución
+                  por estrategia y semilla)
+        plazo: Segundos máximos para toda la carrera
+        registro: RegistroPortafolio opcional donde anotar el resultado
+        familia: Nombre de la familia de instancias para el registro
+
+    Returns:
+        Diccionario con:
+        - estado: 'resuelto', 'sin solución', 'plazo agotado' o 'sin
+          resultado' (todas terminaron sin ganar: errores o estrategias
+          incompletas que se rinden)
+        - solucion: Diccionario {variable: valor} o None
+        - estrategia, semilla: Ganadora (None si nadie terminó)
+        - tiempo: Segundos de reloj desde el lanzamiento hasta que se
+          detienen todos los procesos
+        - errores: {estrategia: mensaje} de las que no admiten el CSP,
+          fallan con una excepción o cuyo proceso muere sin informar
+    """
+    estrategias = list(estrategias or ESTRATEGIAS)
+    cola = multiprocessing.Queue()
+    procesos = {}  # (estrategia, semilla) -> proceso
+    for nombre in estrategias:
+        _, _, aleatoria = ESTRATEGIAS[nombre]
+        for semilla in (semillas if aleatoria else (None,)):
+            procesos[nombre, semilla] = multiprocessing.Process(target=_ejecutar_estrategia,
+                                                                args=(csp, nombre, semilla, cola), daemon=True)
+
+    resultado = {'estado': 'sin resultado', 'solucion': None, 'estrategia': None,
+                 'semilla': None, 'tiempo': None, 'errores': {}}
+    inicio = time.perf_counter()
+    for proceso in procesos.values():
+        proceso.start()
+    pendientes = dict(procesos)
+    terminados = set()  # Pendientes ya muertos en el sondeo anterior
+    try:
+        while pendientes:
+            restante = plazo - (time.perf_counter() - inicio)
+            if restante <= 0:
+                resultado['estado'] = 'plazo agotado'
+                break
+            try:
+                nombre, semilla, estado, solucion, _ = cola.get(timeout=min(restante, SONDEO_PROCESOS))
+            except queue.Empty:
+                # Un proceso que murió sin informar (y sin mensaje en
+                # tránsito tras un sondeo más) cuenta como error
+                for clave in terminados & pendientes.keys():
+                    resultado['errores'][clave[0]] = (f'el proceso terminó sin informar'
+                                                      f' (código {pendientes.pop(clave).exitcode})')
+                terminados = {clave for clave, proceso in pendientes.items() if not proceso.is_alive()}
+                continue
+            pendientes.pop((nombre, semilla), None)
+            if estado == 'error':
+                resultado['errores'][nombre] = solucion
+                continue
+            if estado == 'sin solución' and not ESTRATEGIAS[nombre][1]:
+                continue  # Una estrategia incompleta que se rinde no prueba nada
+            resultado.update(estado=estado, solucion=solucion, estrategia=nombre, semilla=semilla)
+            break
+    finally:
+        # Cancelar el resto: terminate() mata el proceso aunque esté en
+        # mitad de la búsqueda (la cola ya no se vuelve a leer)
+        for proceso in procesos.values():
+            if proceso.is_alive():
+                proceso.terminate()
+        for proceso in procesos.values():
+            proceso.join()
+        cola.close()
+    resultado['tiempo'] = time.perf_counter() - inicio
+
+    if registro is not None:
+        registro.anotar(familia, resultado)
+    return resultado
+
+
+class RegistroPortafolio:
+    def __init__(self, entradas=None):
+        """
+        Historial de carreras del portafolio para aprender qué estrategia
+        conviene lanzar (o lanzar primero) en cada familia de instancias.
+        - entradas: Lista de diccionarios {familia, estrategia, semilla,
+          estado, tiempo}, uno por carrera
+        """
+        self.entradas = list(entradas) if entradas else []
+
+    def anotar(self, familia, resultado):
+        """Añade el resultado de una carrera de portafolio."""
+        self.entradas.append({'familia': familia, 'estrategia': resultado['estrategia'],
+                              'semilla': resultado['semilla'], 'estado': resultado['estado'],
+                              'tiempo': round(resultado['tiempo'], 6)})
+
+    def preferidas(self, familia):
+        """
+        Estrategias que han ganado alguna carrera de la familia, de más a
+        menos victorias (a igualdad, menor tiempo medio primero).
+        """
+        victorias = {}
+        for entrada in self.entradas:
+            if entrada['familia'] == familia and entrada['estrategia'] is not None:
+                victorias.setdefault(entrada['estrategia'], []).append(entrada['tiempo'])
+        return sorted(victorias, key=lambda e: (-len(victorias[e]), sum(victorias[e]) / len(victorias[e])))
+
+    def guardar(self, ruta):
+        """Guarda el historial en un archivo JSON compacto."""
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga un historial guardado previamente (vacío si el archivo no existe)."""
+        if not os.path.exists(ruta):
+            return cls()
+        with open(ruta, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+
+#############################
+# BANCO DE PRUEBAS
+#############################
+def _con_estadisticas(solucionador):
+    """Resuelve con un Solucionador y devuelve (solución, estadísticas)."""
+    return solucionador.resolver(), solucionador.estadisticas
+
+
+def _minimos_conflictos_banco(csp):
+    """Mínimos conflictos con semilla fija y 100 pasos por variable."""
+    motor = MinimosConflictos(csp, random.Random(0))
+    return motor.resolver(max(1000, 100 * len(csp.variables))), motor.estadisticas
+
+
+def _corte_banco(csp):
+    """Acondicionamiento del corte con sus estadísticas."""
+    estadisticas = Estadisticas()
+    return acondicionamiento_corte(csp, estadisticas=estadisticas), estadisticas
+
+
+def _cubos_banco(csp):
+    """Una solución cualquiera (coste nulo) por eliminación de cubos."""
+    estadisticas = Estadisticas()
+    _, solucion = optimizar(csp, estadisticas=estadisticas)
+    return solucion, estadisticas
+
+
+# Solucionadores del banco: nombre -> (función(csp) -> (solución,
+# Estadisticas), completo). Uno por estrategia de los programas de la carpeta.
+SOLUCIONADORES = {
+    'backtracking': (lambda csp: _con_estadisticas(Solucionador(csp, 'ninguna', 'orden')), True),
+    'fc': (lambda csp: _con_estadisticas(Solucionador(csp, 'fc', 'mrv')), True),
+    'mac': (lambda csp: _con_estadisticas(Solucionador(csp, 'mac', 'mrv')), True),
+    'cbj': (lambda csp: _con_estadisticas(SolucionadorCBJ(csp, 'fc', 'mrv')), True),
+    'minimos-conflictos': (_minimos_conflictos_banco, False),
+    'corte': (_corte_banco, True),
+    'cubos': (_cubos_banco, True),
+}
+
+
+def _medir_solucionador(csp, nombre, memoria, cola):
+    """
+    Cuerpo del proceso de cada medida: una ejecución cronometrada, cuyo
+    resultado se envía en cuanto termina, y, con memoria=True, otra igual
+    bajo tracemalloc (que la ralentiza) para el pico de memoria.
+    """
+    funcion, completo = SOLUCIONADORES[nombre]
+    fila = {}
+    inicio = time.perf_counter()
+    try:
+        solucion, estadisticas = funcion(csp)
+    except (ValueError, RecursionError) as error:
+        cola.put({'estado': 'no aplicable', 'mensaje': f'{type(error).__name__}: {error}'})
+        return
+    except Exception as error:
+        cola.put({'estado': 'error', 'mensaje': f'{type(error).__name__}: {error}'})
+        return
+    fila['tiempo'] = time.perf_counter() - inicio
+    if solucion is None:
+        fila['estado'] = 'sin solución' if completo else 'sin converger'
+    elif len(solucion) == len(csp.variables) and csp.asignacion_consistente(solucion):
+        fila['estado'] = 'resuelto'
+    else:
+        fila['estado'] = 'solución incorrecta'
+    fila.update(vars(estadisticas))
+    cola.put(fila)
+    if memoria:
+        tracemalloc.start()
+        try:
+            funcion(csp)
+            cola.put({'memoria': tracemalloc.get_traced_memory()[1]})
+        except Exception:
+            cola.put({'memoria': None})
+        finally:
+            tracemalloc.stop()
+
+
+def _recibir(cola, proceso, limite):
+    """
+    Espera un mensaje de un proceso hijo durante como mucho `limite`
+    segundos. Devuelve None si se agota el plazo o si el proceso termina
+    sin enviarlo (se comprueba cada SONDEO_PROCESOS segundos, con una
+    espera más para los mensajes que aún estén en tránsito).
+    """
+    fin = time.perf_counter() + limite
+    terminado = False
+    while True:
+        restante = fin - time.perf_counter()
+        if restante <= 0:
+            return None
+        try:
+            return cola.get(timeout=min(restante, SONDEO_PROCESOS))
+        except queue.Empty:
+            if terminado:
+                return None
+            terminado = not proceso.is_alive()
+
+
+def medir(csp, nombre, limite=10.0, memoria=True):
+    """
+    Ejecuta un solucionador de SOLUCIONADORES en un proceso aparte, que se
+    detiene si supera el límite de tiempo (el pico de memoria se mide en
+    una segunda ejecución con hasta 5 veces el límite).
+
+    Con el método de arranque 'spawn' (Windows, macOS) el CSP se serializa
+    con pickle: las restricciones no pueden ser lambdas.
+
+    Returns:
+        Diccionario con estado ('resuelto', 'sin solución', 'sin converger',
+        'tiempo agotado', 'no aplicable', 'error' o 'solución incorrecta'),
+        tiempo en segundos, los contadores de Estadisticas y memoria (pico
+        en bytes reservados durante la resolución, None si no se midió).
+        Con 'no aplicable' y 'error' se añade el mensaje de la excepción o
+        el código de salida del proceso.
+    """
+    cola = multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=_medir_solucionador, args=(csp, nombre, memoria, cola), daemon=True)
+    fila = {'estado': 'tiempo agotado', 'tiempo': None, 'memoria': None}
+    proceso.start()
+    try:
+        mensaje = _recibir(cola, proceso, limite)
+        if mensaje is None and proceso.exitcode is not None:
+            mensaje = {'estado': 'error', 'mensaje': f'el proceso terminó sin informar (código {proceso.exitcode})'}
+        if mensaje is not None:
+            fila.update(mensaje)
+        if memoria and fila['tiempo'] is not None:
+            fila.update(_recibir(cola, proceso, 5 * limite) or {})
+    finally:
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+        cola.close()
+    return fila
+
+
+def banco_de_pruebas(familias, solucionadores=None, limite=10.0, memoria=True, instancias=1):
+    """
+    Ejecuta cada solucionador sobre instancias de tamaño creciente de cada
+    familia. Cuando un solucionador agota el tiempo en un tamaño, se
+    omiten los tamaños siguientes de esa familia para él.
+
+    Args:
+        familias: Diccionario {nombre: (generador(tamaño, rng) -> CSP, tamaños)}
+        solucionadores: Nombres de SOLUCIONADORES (None = todos)
+        limite: Segundos máximos de cada ejecución
+        memoria: Medir también el pico de memoria (segunda ejecución)
+        instancias: Instancias por tamaño (semillas 0, 1, ...)
+
+    Yields:
+        Una fila por medida: familia, tamano, instancia, solucionador y
+        los campos de medir.
+    """
+    solucionadores = list(solucionadores or SOLUCIONADORES)
+    for familia, (generador, tamanos) in familias.items():
+        agotados = set()
+        for tamano in tamanos:
+            for instancia in range(instancias):
+                csp = generador(tamano, random.Random(instancia))
+                for nombre in solucionadores:
+                    fila = {'familia': familia, 'tamano': tamano, 'instancia': instancia, 'solucionador': nombre}
+                    if nombre in agotados:
+                        fila['estado'] = 'omitido'
+                    else:
+                        fila.update(medir(csp, nombre, limite, memoria))
+                        if fila['estado'] == 'tiempo agotado':
+                            agotados.add(nombre)
+                    yield fila
+
+
+def guardar_resultados(filas, ruta):
+    """
+    Guarda las filas del banco de pruebas en CSV (si la ruta acaba en
+    .csv) o JSON. Las columnas son la unión de los campos, en orden de
+    aparición; los que faltan en una fila quedan vacíos. Admite cualquier
+    iterable de filas, como el propio generador banco_de_pruebas.
+    """
+    filas = list(filas)
+    if ruta.endswith('.csv'):
+        columnas = list(dict.fromkeys(campo for fila in filas for campo in fila))
+        with open(ruta, 'w', encoding='utf-8', newline='') as f:
+            escritor = csv.DictWriter(f, columnas)
+            escritor.writeheader()
+            escritor.writerows(filas)
+        return
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(filas, f, ensure_ascii=False, indent=1)